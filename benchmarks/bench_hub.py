@@ -0,0 +1,273 @@
+from argparse import ArgumentParser
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import time
+
+import zmq
+
+from stream_hub.ingestion.stream_manager import StreamManager
+from stream_hub.network.proxy import ZmqHubProxy
+from stream_hub.network.wire import FRAME_TOPIC, STATS_TOPIC, decode_message
+
+# End-to-end hub benchmark driven by synthetic:// sources: real proxy, real
+# workers, N local consumer processes.  Results are written as JSON so runs
+# can be compared across commits.
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+
+def consumer_entry(hub_endpoint: str, measuring, finished, results):
+    sub = zmq.Context.instance().socket(zmq.SUB)
+    sub.setsockopt(zmq.RCVHWM, 1000)
+    sub.setsockopt_string(zmq.SUBSCRIBE, f"{FRAME_TOPIC}/")
+    sub.setsockopt_string(zmq.SUBSCRIBE, f"{STATS_TOPIC}/")
+    sub.connect(hub_endpoint)
+    sub.RCVTIMEO = 200
+
+    # A worker's stats and frames leave the same socket in order, so the
+    # frames received between two of its stats snapshots are exactly the
+    # frames it published in between: the window opens at the first snapshot
+    # after `measuring` is set and closes at the last one before `finished`.
+    windows = {}
+    latencies_ms = []
+    while not finished.is_set():
+        try:
+            frames = sub.recv_multipart(copy=False)
+        except zmq.Again:
+            continue
+        now = time.time()
+
+        topic, metadata, _ = decode_message(frames)
+        if metadata.get("replayed"):
+            continue
+        sid = metadata["stream_id"]
+        window = windows.get(sid)
+        if topic.startswith(f"{STATS_TOPIC}/"):
+            published = metadata["counters"].get("frames_published", 0)
+            if window is not None:
+                window["published"] = published - window["base"]
+                window["received"] = dict(window["running"])
+            elif measuring.is_set():
+                windows[sid] = {"base": published, "published": 0, "received": {}, "running": {}}
+            continue
+        if window is None:
+            continue
+
+        rendition = metadata.get("rendition")
+        window["running"][rendition] = window["running"].get(rendition, 0) + 1
+        latencies_ms.append((now - metadata["timestamp"]) * 1000)
+
+    sub.close()
+    results.put({
+        "windows": {sid: {"published": w["published"], "received": w["received"]} for sid, w in windows.items()},
+        "latencies_ms": latencies_ms,
+    })
+
+
+class ProcSampler:
+    """CPU seconds and RSS of worker processes, read from /proc (Linux only)."""
+
+    def __init__(self, pids):
+        self.__pids = pids
+        self.__ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def cpu_seconds(self):
+        result = {}
+        for sid, pid in self.__pids.items():
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                result[sid] = (int(fields[11]) + int(fields[12])) / self.__ticks
+            except (OSError, IndexError):
+                result[sid] = None
+        return result
+
+    def rss_mb(self):
+        result = {}
+        for sid, pid in self.__pids.items():
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    line = next(l for l in f if l.startswith("VmRSS:"))
+                result[sid] = round(int(line.split()[1]) / 1024, 1)
+            except (OSError, StopIteration):
+                result[sid] = None
+        return result
+
+
+def collect_stats(sub, timeout: float):
+    snapshots = {}
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            _, snapshot, _ = decode_message(sub.recv_multipart(zmq.NOBLOCK, copy=False))
+            snapshots[snapshot["stream_id"]] = snapshot
+        except zmq.Again:
+            time.sleep(0.05)
+    return snapshots
+
+
+def run_scenario(n_streams: int, resolution: str, args):
+    hub_endpoint = f"tcp://127.0.0.1:{free_port()}"
+    proxy_endpoint = f"tcp://127.0.0.1:{free_port()}"
+
+    proxy = ZmqHubProxy(pub_port=hub_endpoint, sub_port=proxy_endpoint)
+    proxy.start()
+    if not proxy.wait_ready(timeout=5):
+        raise RuntimeError(f"Proxy did not bind {hub_endpoint} / {proxy_endpoint}")
+
+    stats_sub = zmq.Context.instance().socket(zmq.SUB)
+    stats_sub.setsockopt_string(zmq.SUBSCRIBE, f"{STATS_TOPIC}/")
+    stats_sub.connect(hub_endpoint)
+
+    streams_cfg = [
+        {
+            "id": f"bench{i:03d}",
+            "source": f"synthetic://{resolution}@{args.source_fps}",
+            "fps": args.fps,
+            "capture": {"mode": args.capture_mode},
+            "renditions": args.renditions.split(","),
+        }
+        for i in range(n_streams)
+    ]
+    manager = StreamManager(
+        streams_cfg=streams_cfg,
+        proxy=proxy_endpoint,
+        feedback=None,
+        fps=args.fps,
+        encoder={"backend": args.backend},
+        metrics={"interval_sec": 1},
+        pool={"enabled": args.pool_workers > 0, "workers": args.pool_workers},
+    )
+
+    results = multiprocessing.Queue()
+    measuring, finished = multiprocessing.Event(), multiprocessing.Event()
+    consumers = [
+        multiprocessing.Process(target=consumer_entry, args=(hub_endpoint, measuring, finished, results))
+        for _ in range(args.consumers)
+    ]
+    for c in consumers:
+        c.start()
+    started_at = time.monotonic()
+    manager.start(started_at=started_at)
+    # Warm-up counts from the moment every stream delivers frames, not from spawn.
+    all_live = manager.wait_live(timeout=60)
+    time_to_live = time.monotonic() - started_at
+
+    time.sleep(args.warmup)
+    measuring.set()
+    sampler = ProcSampler(manager.get_pids())
+    cpu_start = sampler.cpu_seconds()
+    stats_start = collect_stats(stats_sub, 1.5)
+    t_start = time.time()
+
+    time.sleep(max(0.0, args.duration - 1.5))
+
+    cpu_end = sampler.cpu_seconds()
+    rss = sampler.rss_mb()
+    stats_end = collect_stats(stats_sub, 1.5)
+    elapsed = time.time() - t_start
+
+    finished.set()
+    consumer_results = [results.get(timeout=30) for _ in consumers]
+    for c in consumers:
+        c.join(timeout=5)
+    manager.stop()
+    stats_sub.close()
+    proxy.stop()
+
+    published = {
+        sid: stats_end[sid]["counters"].get("frames_published", 0)
+        - stats_start.get(sid, {}).get("counters", {}).get("frames_published", 0)
+        for sid in stats_end
+    }
+    hwm_drops = sum(s["counters"].get("hwm_drops", 0) for s in stats_end.values())
+    latencies = [l for r in consumer_results for l in r["latencies_ms"]]
+    # Every published frame is sent once per rendition, and each consumer
+    # subscribes to all of them.
+    renditions = len(args.renditions.split(","))
+    windows = [w for r in consumer_results for w in r["windows"].values()]
+    expected = sum(w["published"] for w in windows) * renditions
+    received = sum(sum(w["received"].values()) for w in windows)
+    # Workers are per stream or per pool process, so CPU is normalised by the
+    # number of streams rather than by the number of processes.
+    cpu = [
+        (cpu_end[pid] - cpu_start[pid]) / elapsed
+        for pid in cpu_start
+        if cpu_start[pid] is not None and cpu_end.get(pid) is not None
+    ]
+    total_published = sum(published.values())
+
+    return {
+        "streams": n_streams,
+        "resolution": resolution,
+        "target_fps": args.fps,
+        "consumers": args.consumers,
+        "sustained_fps_per_stream": round(total_published / elapsed / max(1, n_streams), 2),
+        "latency_ms": {"p50": percentile(latencies, 0.5), "p99": percentile(latencies, 0.99)},
+        "cpu_per_stream": round(sum(cpu) / max(1, n_streams), 3) if cpu else None,
+        "rss_mb_per_stream": round(sum(v for v in rss.values() if v) / max(1, n_streams), 1),
+        "drop_rate": round(1 - received / expected, 4) if expected else None,
+        "hwm_drops": hwm_drops,
+        "time_to_live_s": round(time_to_live, 3) if all_live else None,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.time(),
+    }
+
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method("spawn", force=True)
+
+    arg_parser = ArgumentParser(description="End-to-end Stream Hub benchmark with synthetic sources")
+    arg_parser.add_argument("--streams", type=str, default="1,4,16", help="Comma-separated stream counts")
+    arg_parser.add_argument("--resolutions", type=str, default="640x360,1920x1080", help="Comma-separated WxH list")
+    arg_parser.add_argument("--fps", type=int, default=30, help="Output fps per stream")
+    arg_parser.add_argument("--source_fps", type=int, default=30, help="Synthetic camera fps")
+    arg_parser.add_argument("--duration", type=float, default=10, help="Measured seconds per scenario")
+    arg_parser.add_argument("--warmup", type=float, default=3, help="Seconds discarded before measuring")
+    arg_parser.add_argument("--consumers", type=int, default=1, help="Consumer processes subscribed to all streams")
+    arg_parser.add_argument("--renditions", type=str, default="full@85")
+    arg_parser.add_argument("--capture_mode", type=str, default="grab")
+    arg_parser.add_argument("--backend", type=str, default="opencv")
+    arg_parser.add_argument("--pool_workers", type=int, default=0, help="Run streams in N pool processes (0 = one process per stream)")
+    arg_parser.add_argument("--output", type=str, default=None, help="Write JSON results to this path")
+    args = arg_parser.parse_args()
+
+    report = {"environment": environment(), "config": vars(args), "results": []}
+    for resolution in args.resolutions.split(","):
+        for n_streams in (int(n) for n in args.streams.split(",")):
+            print(f"[bench] {n_streams} stream(s) @ {resolution} ...")
+            result = run_scenario(n_streams, resolution, args)
+            report["results"].append(result)
+            print(f"[bench] {json.dumps(result)}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[bench] Results written to {args.output}")
@@ -0,0 +1,107 @@
+from argparse import ArgumentParser
+import json
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+from stream_hub.ingestion.jpeg_backends import BACKENDS, SCALES, create_backend
+
+
+def synthetic_frame(width: int, height: int) -> np.ndarray:
+    # Smooth gradients plus a little noise compress roughly like a real camera
+    # scene; pure noise would make every backend look equally slow.
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    noise = np.random.default_rng(0).normal(0, 8, frame.shape)
+    frame = np.clip(frame + noise, 0, 255).astype(np.uint8)
+    cv2.putText(frame, "stream-hub", (width // 8, height // 2), cv2.FONT_HERSHEY_SIMPLEX,
+                height / 200, (255, 255, 255), max(1, height // 120))
+    return frame
+
+
+def timed(fn, iterations: int):
+    samples = []
+    result = None
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }, result
+
+
+def run(resolutions, backends, quality: int, iterations: int, options):
+    results = []
+    for width, height in resolutions:
+        frame = synthetic_frame(width, height)
+
+        for name in backends:
+            try:
+                backend = create_backend(name, **options)
+            except (ImportError, RuntimeError, OSError) as e:
+                print(f"[bench] {name}: skipped ({e})")
+                continue
+
+            backend.encode(frame, quality)  # warm-up
+            encode_stats, jpeg = timed(lambda: backend.encode(frame, quality), iterations)
+            entry = {
+                "backend": name,
+                "resolution": f"{width}x{height}",
+                "quality": quality,
+                "bytes": len(jpeg),
+                "encode": encode_stats,
+                "decode": {},
+            }
+            for scale in SCALES:
+                decode_stats, _ = timed(lambda: backend.decode(jpeg, scale), iterations)
+                entry["decode"][f"1/{scale}"] = decode_stats
+
+            results.append(entry)
+            print(
+                f"[bench] {name:<10} {width}x{height:<5} "
+                f"encode p50={encode_stats['p50_ms']:7.3f} ms  "
+                f"decode p50={entry['decode']['1/1']['p50_ms']:7.3f} ms "
+                f"(1/4: {entry['decode']['1/4']['p50_ms']:.3f} ms)  "
+                f"size={len(jpeg) / 1024:.1f} KiB"
+            )
+    return results
+
+
+def parse_resolution(value: str):
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+if __name__ == "__main__":
+    arg_parser = ArgumentParser(description="Compare JPEG backends on hub resolutions")
+    arg_parser.add_argument(
+        "--resolutions", type=str, default="640x360,1280x720,1920x1080", help="Comma-separated WxH list"
+    )
+    arg_parser.add_argument(
+        "--backends", type=str, default=",".join(BACKENDS), help="Comma-separated backend names"
+    )
+    arg_parser.add_argument("--quality", type=int, default=85)
+    arg_parser.add_argument("--iterations", type=int, default=50)
+    arg_parser.add_argument("--subsampling", type=str, default="420")
+    arg_parser.add_argument("--fast_dct", action="store_true")
+    arg_parser.add_argument("--output", type=str, default=None, help="Write JSON results to this path")
+    args = arg_parser.parse_args()
+
+    results = run(
+        [parse_resolution(r) for r in args.resolutions.split(",")],
+        args.backends.split(","),
+        args.quality,
+        args.iterations,
+        {"subsampling": args.subsampling, "fast_dct": args.fast_dct},
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"[bench] Results written to {args.output}")
@@ -1,20 +1,137 @@
+import os
 import cv2
 import time
 import logging
-from threading import Thread
+from threading import Condition, Thread
 from collections import deque
-from stream_hub.utils.latency_logger import measure_latency
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from stream_hub.ingestion.frame_pacer import FramePacer
+from stream_hub.ingestion.synthetic_source import open_local_source
+from stream_hub.utils.metrics import StreamMetrics
+
+CAPTURE_MODES = ("read", "grab")
+
+JPEG_CODEC = "jpeg"
+# FOURCC (lower-case) → codec name published with passthrough packets.
+_PASSTHROUGH_CODECS = {
+    "mjpg": JPEG_CODEC,
+    "jpeg": JPEG_CODEC,
+    "h264": "h264",
+    "avc1": "h264",
+    "x264": "h264",
+    "hevc": "hevc",
+    "hev1": "hevc",
+    "hvc1": "hevc",
+    "h265": "hevc",
+}
+# Inter-coded packets cannot be skipped, so they are queued instead of
+# keeping only the newest one; a longer backlog is dropped as a gap.
+VIDEO_QUEUE_SIZE = 64
+
+# OpenCV reads FFmpeg demuxer options from this variable when a capture is
+# opened, so opens with different per-stream options must not interleave.
+_FFMPEG_OPTIONS_ENV = "OPENCV_FFMPEG_CAPTURE_OPTIONS"
+
+
+class _FfmpegOptionsGate:
+    """Serialises capture opens only when their FFmpeg options differ.
+
+    Opens that need the same options (the usual case: one ``capture`` block
+    for every camera) run concurrently, so a pool process does not connect
+    to its RTSP sources one after another.
+    """
+
+    def __init__(self):
+        self.__cond = Condition()
+        self.__options: Optional[str] = None
+        self.__previous: Optional[str] = None
+        self.__active = 0
+
+    @contextmanager
+    def use(self, options: str):
+        with self.__cond:
+            self.__cond.wait_for(lambda: self.__active == 0 or self.__options == options)
+            if self.__active == 0:
+                self.__options = options
+                self.__previous = os.environ.get(_FFMPEG_OPTIONS_ENV)
+                if options:
+                    os.environ[_FFMPEG_OPTIONS_ENV] = options
+            self.__active += 1
+        try:
+            yield
+        finally:
+            with self.__cond:
+                self.__active -= 1
+                if self.__active == 0:
+                    if self.__previous is None:
+                        os.environ.pop(_FFMPEG_OPTIONS_ENV, None)
+                    else:
+                        os.environ[_FFMPEG_OPTIONS_ENV] = self.__previous
+                    self.__cond.notify_all()
+
+
+_open_gate = _FfmpegOptionsGate()
+
+
+def build_ffmpeg_options(capture_cfg: Dict[str, Any]) -> str:
+    options: Dict[str, Any] = {}
+    if capture_cfg.get("rtsp_transport"):
+        options["rtsp_transport"] = capture_cfg["rtsp_transport"]
+    if capture_cfg.get("low_delay"):
+        options["fflags"] = "nobuffer"
+        options["flags"] = "low_delay"
+    options.update(capture_cfg.get("ffmpeg_options") or {})
+    return "|".join(f"{key};{value}" for key, value in options.items())
+
+
+class EncodedPacket:
+    """A compressed frame read with ``CAP_PROP_FORMAT = -1`` (no decode)."""
+
+    __slots__ = ("data", "codec", "keyframe", "width", "height", "extradata")
+
+    def __init__(self, data, codec: str, keyframe: bool, width: int, height: int,
+                 extradata: Optional[bytes] = None):
+        self.data = data
+        self.codec = codec
+        self.keyframe = keyframe
+        self.width = width
+        self.height = height
+        # Codec configuration (H.264/H.265 SPS/PPS/VPS) a decoder needs
+        # before the first keyframe; None for JPEG.
+        self.extradata = extradata
+
+    @property
+    def is_jpeg(self) -> bool:
+        return self.codec == JPEG_CODEC
+
 
 class CaptureWorker:
-    def __init__(self, stream_id: str, url: str, fps: int = 15):
+    def __init__(self, stream_id: str, url: str, fps: int = 15, capture_cfg: Optional[Dict[str, Any]] = None,
+                 metrics: Optional[StreamMetrics] = None, passthrough: bool = False):
         self.__stream_id = stream_id
         self.__url = url
         self.__fps = fps
 
+        capture_cfg = capture_cfg or {}
+        self.__mode = capture_cfg.get("mode", "read")
+        if self.__mode not in CAPTURE_MODES:
+            raise ValueError(f"[{stream_id}] Unknown capture mode '{self.__mode}', expected one of {CAPTURE_MODES}")
+        self.__buffer_size = capture_cfg.get("buffer_size")
+        self.__threads = capture_cfg.get("threads")
+        self.__ffmpeg_options = build_ffmpeg_options(capture_cfg)
+        self.__pacer = FramePacer(fps)
+        self.__metrics = metrics
+        self.__passthrough = passthrough
+        self.__codec: Optional[str] = None
+        self.__size = (0, 0)
+        self.__extradata: Optional[bytes] = None
+
         self.__cap = None
         self.__frame_id = 0
         self.__stop_signal = False
         self.__frame_queue = deque(maxlen=1)
+        self.__frame_cond = Condition()
 
         self.__init_logger()
         self.__stream_thread = Thread(target=self.__start_stream, daemon=True)
@@ -25,17 +142,44 @@ class CaptureWorker:
             return None, None, None
         return self.__frame_queue[-1]
 
+    def wait_frame(self, last_frame_id: int = 0, timeout: float = None):
+        # Block until a frame newer than `last_frame_id` is captured, so the
+        # publisher wakes on arrival and never sees the same frame twice.
+        with self.__frame_cond:
+            self.__frame_cond.wait_for(
+                lambda: self.__frame_id > last_frame_id or self.__stop_signal,
+                timeout,
+            )
+            if self.__frame_id <= last_frame_id or len(self.__frame_queue) == 0:
+                return None, None, None
+            return self.__frame_queue[-1]
+
+    def set_fps(self, fps: float):
+        # Called from the publisher thread by the rate controller; grab mode
+        # then skips retrieve() for the frames the lower rate will not publish.
+        self.__fps = fps
+        self.__pacer.set_fps(fps)
+
+    def packets_since(self, last_frame_id: int):
+        # Video passthrough: every queued access unit newer than last_frame_id.
+        with self.__frame_cond:
+            return [item for item in self.__frame_queue if item[1] > last_frame_id]
+
     def get_stream_info(self):
         return {
             "stream_id": self.__stream_id,
             "url": self.__url,
             "fps": self.__fps,
+            "mode": self.__mode,
+            "codec": self.__codec if self.__passthrough else None,
         }
 
     def close(self):
         if self.__stream_thread.is_alive():
             self.__stop_signal = True
             print(f"[{self.__stream_id}] Closing stream.")
+            with self.__frame_cond:
+                self.__frame_cond.notify_all()
 
             if self.__cap is not None:
                 self.__cap.release()
@@ -50,30 +194,153 @@ class CaptureWorker:
     def __start_stream(self):
         print(f"[{self.__stream_id}] Opening stream: {self.__url}")
 
-        self.__cap = cv2.VideoCapture(self.__url, cv2.CAP_FFMPEG)
+        self.__cap = self.__open_capture()
         while not self.__stop_signal:
             if not self.__cap.isOpened():
                 print(f"[{self.__stream_id}] Stream not opened. Retrying...")
+                if self.__metrics:
+                    self.__metrics.inc("capture_reopens")
                 time.sleep(1)
-                self.__cap.open(self.__url, cv2.CAP_FFMPEG)
+                self.__cap.release()
+                self.__cap = self.__open_capture()
+            elif self.__passthrough:
+                self.__read_packet()
+            elif self.__mode == "grab":
+                self.__grab_frame()
             else:
                 self.__read_frame()
- 
-    @measure_latency
+
+    def __open_capture(self):
+        self.__pacer.reset()
+        cap = self.__create_capture()
+        if self.__passthrough and cap.isOpened():
+            self.__codec = self.__enable_passthrough(cap)
+            if self.__codec is None:
+                print(f"[{self.__stream_id}] Source codec cannot be passed through, decoding instead")
+                self.__passthrough = False
+                cap.release()
+                cap = self.__create_capture()
+            else:
+                print(f"[{self.__stream_id}] Passthrough of {self.__codec} packets")
+        return cap
+
+    def __enable_passthrough(self, cap) -> Optional[str]:
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC)) & 0xFFFFFFFF
+        codec = _PASSTHROUGH_CODECS.get(fourcc.to_bytes(4, "little").decode("ascii", "replace").lower())
+        if codec is None or not cap.set(cv2.CAP_PROP_FORMAT, -1):
+            return None
+
+        self.__size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self.__extradata = None
+        if codec != JPEG_CODEC:
+            with self.__frame_cond:
+                self.__frame_queue = deque(maxlen=VIDEO_QUEUE_SIZE)
+        return codec
+
+    def __create_capture(self):
+        local = open_local_source(self.__url)
+        if local is not None:
+            return local
+
+        params = []
+        if self.__threads and hasattr(cv2, "CAP_PROP_N_THREADS"):
+            params += [cv2.CAP_PROP_N_THREADS, int(self.__threads)]
+
+        with _open_gate.use(self.__ffmpeg_options):
+            cap = cv2.VideoCapture(self.__url, cv2.CAP_FFMPEG, params)
+
+        if self.__buffer_size is not None and cap.isOpened():
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, int(self.__buffer_size))
+        return cap
+
+    def __grab_frame(self):
+        # grab() pulls every packet so the stream stays current and the decoder
+        # keeps its reference frames; retrieve() (YUV->BGR conversion and the
+        # frame copy) only runs for frames the publish schedule will use.
+        # The timestamp is taken at grab time, which is also what the worker's
+        # own pacer sees, so both schedules agree.
+        t0 = time.perf_counter()
+        if not self.__cap.grab():
+            self.__capture_failed("grab")
+            return
+
+        ts = time.time()
+        if not self.__pacer.due(ts):
+            return
+
+        ret, frame = self.__cap.retrieve()
+        if not ret or frame is None:
+            self.__capture_failed("retrieve", sleep=False)
+            return
+
+        self.__observe_capture(t0)
+        self.__push_frame(frame, ts)
+
+    def __read_packet(self):
+        t0 = time.perf_counter()
+        if not self.__cap.grab():
+            self.__capture_failed("grab")
+            return
+
+        ts = time.time()
+        # JPEG packets are independent and can be paced like decoded frames;
+        # H.264/H.265 access units depend on each other and are all kept.
+        if self.__codec == JPEG_CODEC and not self.__pacer.due(ts):
+            return
+
+        ret, data = self.__cap.retrieve()
+        if not ret or data is None:
+            self.__capture_failed("retrieve", sleep=False)
+            return
+
+        keyframe = True
+        if self.__codec != JPEG_CODEC and hasattr(cv2, "CAP_PROP_LRF_HAS_KEY_FRAME"):
+            keyframe = bool(self.__cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME))
+        if self.__codec != JPEG_CODEC and (keyframe or self.__extradata is None):
+            # Re-read on keyframes: a camera may send new parameter sets.
+            self.__extradata = self.__read_extradata() or self.__extradata
+
+        self.__observe_capture(t0)
+        self.__push_frame(
+            EncodedPacket(data.reshape(-1), self.__codec, keyframe, *self.__size, extradata=self.__extradata), ts
+        )
+
+    def __read_extradata(self) -> Optional[bytes]:
+        if not hasattr(cv2, "CAP_PROP_CODEC_EXTRADATA_INDEX"):
+            return None
+        index = int(self.__cap.get(cv2.CAP_PROP_CODEC_EXTRADATA_INDEX))
+        ret, data = self.__cap.retrieve(None, index)
+        if not ret or data is None or data.size == 0:
+            return None
+        return data.tobytes()
+
     def __read_frame(self):
         t0 = time.perf_counter()
         ret, frame = self.__cap.read()
-        read_ms = (time.perf_counter() - t0) * 1000
-        print(f"[Latency] cap.read() = {read_ms:.3f} ms")
 
         if not ret or frame is None:
-            print(f"[{self.__stream_id}] Failed to read frame. Retrying...")
-            time.sleep(0.3)
+            self.__capture_failed("read")
             return
-        
-        ts = time.time()
-        self.__frame_id += 1
-        self.__frame_queue.append((frame, self.__frame_id, ts))
+
+        self.__observe_capture(t0)
+        self.__push_frame(frame, time.time())
+
+    def __observe_capture(self, t0: float):
+        if self.__metrics:
+            self.__metrics.observe("capture", (time.perf_counter() - t0) * 1000)
+
+    def __capture_failed(self, op: str, sleep: bool = True):
+        print(f"[{self.__stream_id}] Failed to {op} frame. Retrying...")
+        if self.__metrics:
+            self.__metrics.inc("capture_failures")
+        if sleep:
+            time.sleep(0.3)
+
+    def __push_frame(self, frame, ts: float):
+        with self.__frame_cond:
+            self.__frame_id += 1
+            self.__frame_queue.append((frame, self.__frame_id, ts))
+            self.__frame_cond.notify_all()
 
     def __del__(self):
         try:
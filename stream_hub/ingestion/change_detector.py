@@ -0,0 +1,56 @@
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+
+class ChangeDetector:
+    """Cheap scene-change test against the last published frame.
+
+    Frames are reduced to a small grayscale thumbnail; a frame counts as
+    changed when enough thumbnail pixels moved by more than
+    ``pixel_threshold`` grey levels.
+    """
+
+    def __init__(self, cfg: Optional[Dict[str, Any]]):
+        cfg = cfg or {}
+        self.enabled = bool(cfg.get("enabled", False))
+        self.__width = int(cfg.get("thumbnail_width", 64))
+        self.__pixel_threshold = int(cfg.get("pixel_threshold", 12))
+        self.__min_changed = float(cfg.get("min_changed", 0.005))
+        self.__keepalive = float(cfg.get("keepalive_sec", 1.0))
+
+        self.__reference: Optional[np.ndarray] = None
+        self.__last_published = 0.0
+
+    def reset(self):
+        self.__reference = None
+
+    def check(self, frame: np.ndarray, ts: float) -> Optional[str]:
+        """Return why the frame should be published ("changed"/"keepalive"), or None to skip it."""
+        thumb = self.__thumbnail(frame)
+        reference = self.__reference
+
+        if reference is None or reference.shape != thumb.shape or self.__changed(reference, thumb):
+            reason = "changed"
+        elif self.__keepalive > 0 and ts - self.__last_published >= self.__keepalive:
+            reason = "keepalive"
+        else:
+            return None
+
+        self.__reference = thumb
+        self.__last_published = ts
+        return reason
+
+    def __thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        width = min(w, self.__width)
+        height = max(1, round(h * width / w))
+        small = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def __changed(self, reference: np.ndarray, thumb: np.ndarray) -> bool:
+        moved = cv2.absdiff(reference, thumb) > self.__pixel_threshold
+        return np.count_nonzero(moved) > self.__min_changed * moved.size
@@ -0,0 +1,207 @@
+import zmq
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from stream_hub.network.wire import (
+    DEFAULT_RENDITION,
+    clip_topic,
+    decode_bundle,
+    decode_header,
+    decode_message,
+    encode_bundle,
+    encode_header,
+    frame_topic,
+)
+from stream_hub.utils.utils import endpoint_list
+
+# Request (one frame, wire header encoding):
+#   {"op": "clip", "stream_id": "cam1", "start": <epoch s>, "end": <epoch s>}
+#   {"op": "info"}
+# Reply: a bundle on clip/<stream_id> whose header lists one metadata entry
+# per JPEG payload frame, oldest first ("info" replies have no payloads).
+
+
+class ClipBuffer:
+    """Bounded history of one stream's encoded frames, by age and by bytes."""
+
+    def __init__(self, stream_id: str, seconds: float, max_bytes: int):
+        self.stream_id = stream_id
+        self.seconds = float(seconds)
+        self.max_bytes = int(max_bytes)
+        self.__frames: deque = deque()
+        self.__bytes = 0
+
+    def add(self, ts: float, metadata: Dict[str, Any], payload: memoryview):
+        # range() and __trim rely on timestamp order; a frame that is not
+        # newer than the tail (e.g. a last-value-cache repeat) is skipped.
+        if self.__frames and ts <= self.__frames[-1][0]:
+            return
+        self.__frames.append((ts, metadata, payload))
+        self.__bytes += len(payload)
+        self.__trim(ts)
+
+    def range(self, start: float, end: float) -> List[Tuple[float, Dict[str, Any], memoryview]]:
+        return [item for item in self.__frames if start <= item[0] <= end]
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "frames": len(self.__frames),
+            "bytes": self.__bytes,
+            "start": self.__frames[0][0] if self.__frames else None,
+            "end": self.__frames[-1][0] if self.__frames else None,
+        }
+
+    def __trim(self, now: float):
+        frames = self.__frames
+        while frames and (now - frames[0][0] > self.seconds or self.__bytes > self.max_bytes):
+            _, _, payload = frames.popleft()
+            self.__bytes -= len(payload)
+
+
+class ClipServer:
+    """Keeps the last N seconds of JPEGs per stream and serves time ranges on a ROUTER socket.
+
+    Payloads are the memoryviews of the received ZMQ frames: buffering and
+    replying never copy the JPEG bytes.
+    """
+
+    def __init__(self, clips_cfg: Dict[str, Any], streams_cfg: List[Dict[str, Any]], hub_endpoint: str):
+        self.__logger = logging.getLogger(__name__)
+        clips_cfg = clips_cfg or {}
+        self.enabled = bool(clips_cfg.get("enabled", False))
+        self.__endpoint = clips_cfg.get("endpoint", "tcp://0.0.0.0:7503")
+        self.__hub_endpoint = hub_endpoint
+        self.__max_frames = int(clips_cfg.get("max_frames", 1000))
+
+        seconds = float(clips_cfg.get("seconds", 10))
+        max_bytes = int(float(clips_cfg.get("max_mb", 64)) * 1024 * 1024)
+        rendition = clips_cfg.get("rendition", DEFAULT_RENDITION)
+        only = set(clips_cfg.get("streams") or [])
+
+        self.__buffers: Dict[str, ClipBuffer] = {}
+        for cfg in streams_cfg or []:
+            if not cfg.get("enabled", True) or (only and cfg["id"] not in only):
+                continue
+            self.__buffers[frame_topic(cfg["id"], rendition)] = ClipBuffer(cfg["id"], seconds, max_bytes)
+        self.__by_stream = {buffer.stream_id: buffer for buffer in self.__buffers.values()}
+
+        self.__stop_event = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if not self.enabled or not self.__buffers:
+            return
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout=2)
+
+    def __run(self):
+        ctx = zmq.Context.instance()
+        # Buffered streams stay subscribed on purpose: the seconds *before*
+        # an event are only available if they were encoded at the time.
+        sub = ctx.socket(zmq.SUB)
+        sub.setsockopt(zmq.RCVHWM, 256)
+        for topic in self.__buffers:
+            sub.setsockopt_string(zmq.SUBSCRIBE, topic)
+        for endpoint in endpoint_list(self.__hub_endpoint):
+            sub.connect(endpoint)
+
+        router = ctx.socket(zmq.ROUTER)
+        router.setsockopt(zmq.LINGER, 0)
+        router.bind(self.__endpoint)
+        print(f"[Clips] Buffering {len(self.__buffers)} stream(s), serving clips at {self.__endpoint}")
+
+        poller = zmq.Poller()
+        poller.register(sub, zmq.POLLIN)
+        poller.register(router, zmq.POLLIN)
+        try:
+            while not self.__stop_event.is_set():
+                events = dict(poller.poll(200))
+                if sub in events:
+                    self.__drain(sub)
+                if router in events:
+                    self.__serve(router)
+        except Exception as e:
+            print(f"[Clips] Error: {e}")
+        finally:
+            sub.close()
+            router.close()
+
+    def __drain(self, sub):
+        while True:
+            try:
+                frames = sub.recv_multipart(zmq.NOBLOCK, copy=False)
+            except zmq.Again:
+                return
+            try:
+                topic, metadata, payload = decode_message(frames)
+                buffer = self.__buffers.get(topic)
+                if buffer is not None and not metadata.get("replayed"):
+                    buffer.add(float(metadata["timestamp"]), metadata, payload)
+            except (TypeError, ValueError, KeyError):
+                continue
+
+    def __serve(self, router):
+        frames = router.recv_multipart()
+        # Works for REQ (identity, empty delimiter, request) and DEALER clients.
+        split = frames.index(b"") + 1 if b"" in frames else 1
+        route, body = frames[:split], frames[split:]
+        try:
+            request = decode_header(body[0]) if body else {}
+            reply = self.__handle(request)
+        except (TypeError, ValueError, KeyError, AttributeError) as e:
+            # A bad request gets an error reply; buffering and serving go on.
+            reply = encode_bundle(clip_topic(""), {"error": f"Bad request: {e}"}, [])
+        router.send_multipart(route + reply, copy=False)
+
+    def __handle(self, request: Dict[str, Any]) -> List[Any]:
+        if not isinstance(request, dict):
+            raise ValueError(f"Expected a JSON object, got {type(request).__name__}")
+        op = request.get("op", "clip")
+        if op == "info":
+            info = {sid: buffer.info() for sid, buffer in self.__by_stream.items()}
+            return encode_bundle(clip_topic(""), {"streams": info}, [])
+        if op != "clip":
+            raise ValueError(f"Unknown op '{op}'")
+
+        stream_id = request.get("stream_id")
+        buffer = self.__by_stream.get(stream_id)
+        if buffer is None:
+            raise ValueError(f"Stream '{stream_id}' is not buffered")
+
+        end = float(request.get("end") or time.time())
+        start = float(request.get("start") or end - buffer.seconds)
+        items = buffer.range(start, end)[-self.__max_frames:]
+        header = {
+            "stream_id": stream_id,
+            "start": start,
+            "end": end,
+            "count": len(items),
+            "frames": [metadata for _, metadata, _ in items],
+        }
+        return encode_bundle(clip_topic(stream_id), header, [payload for _, _, payload in items])
+
+
+def fetch_clip(endpoint: str, stream_id: str, start: float = None, end: float = None,
+               timeout: float = 5.0) -> Tuple[Dict[str, Any], List[memoryview]]:
+    """Blocking helper: fetch ``[start, end]`` of a buffered stream from a ClipServer."""
+    sock = zmq.Context.instance().socket(zmq.REQ)
+    sock.setsockopt(zmq.LINGER, 0)
+    sock.RCVTIMEO = int(timeout * 1000)
+    sock.connect(endpoint)
+    try:
+        sock.send(encode_header({"op": "clip", "stream_id": stream_id, "start": start, "end": end}))
+        _, header, payloads = decode_bundle(sock.recv_multipart(copy=False))
+    finally:
+        sock.close()
+
+    if "error" in header:
+        raise ValueError(header["error"])
+    return header, payloads
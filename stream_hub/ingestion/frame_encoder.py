@@ -1,46 +1,94 @@
-import cv2
+import functools
 import numpy as np
 import logging
-from typing import Optional
-from stream_hub.utils.latency_logger import measure_latency 
+from typing import Any, Callable, Dict, Optional
+from stream_hub.ingestion.jpeg_backends import JpegBackend, create_backend
 logger = logging.getLogger(__name__)
 
+
+class _StaticCompat:
+    """Instance method that still works when called on the class.
+
+    ``FrameEncoder.encode(frame)`` / ``FrameEncoder.decode(data)`` were static
+    methods before backends existed; class-level calls go to a shared
+    default (OpenCV) encoder and return what they used to.
+    """
+
+    def __init__(self, func, legacy_result: Optional[Callable] = None):
+        self.__func = func
+        self.__legacy_result = legacy_result
+        functools.update_wrapper(self, func)
+
+    def __get__(self, instance, owner):
+        if instance is not None:
+            return self.__func.__get__(instance, owner)
+
+        def legacy(*args, **kwargs):
+            result = self.__func(owner.default(), *args, **kwargs)
+            if result is not None and self.__legacy_result is not None:
+                result = self.__legacy_result(result)
+            return result
+
+        return functools.update_wrapper(legacy, self.__func)
+
+
+def _static_compat(legacy_result: Optional[Callable] = None):
+    return lambda func: _StaticCompat(func, legacy_result)
+
+
 class FrameEncoder:
-    @staticmethod
-    @measure_latency
-    def encode(frame, quality: int = 85) -> Optional[bytes]:
+    _default: Optional["FrameEncoder"] = None
+
+    def __init__(self, backend: str = "opencv", **options):
+        self.__backend: JpegBackend = create_backend(backend, **options)
+
+    @classmethod
+    def from_config(cls, encoder_cfg: Optional[Dict[str, Any]] = None) -> "FrameEncoder":
+        options = dict(encoder_cfg or {})
+        return cls(options.pop("backend", "opencv"), **options)
+
+    @classmethod
+    def default(cls) -> "FrameEncoder":
+        # Shared OpenCV encoder behind the class-level (static) calls.
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @property
+    def backend(self) -> str:
+        return self.__backend.name
+
+    @_static_compat(bytes)
+    def encode(self, frame, quality: int = 85) -> Optional[memoryview]:
         if frame is None or frame.size == 0:
             print("Cannot encode empty frame")
             return None
-            
+
         try:
-            encode_params = [cv2.IMWRITE_JPEG_QUALITY, quality]
-            ok, buf = cv2.imencode(".jpg", frame, encode_params)
-            
-            if not ok:
+            buf = self.__backend.encode(frame, quality)
+
+            if buf is None:
                 print("JPEG encoding failed")
                 return None
-                
-            return buf.tobytes()
+
+            return buf if isinstance(buf, memoryview) else memoryview(buf)
         except Exception as e:
             print(f"Frame encoding error: {e}")
             return None
 
-    @staticmethod
-    @measure_latency
-    def decode(data: bytes) -> Optional[np.ndarray]:
-        if not data or len(data) == 0:
+    @_static_compat()
+    def decode(self, data, scale: int = 1) -> Optional[np.ndarray]:
+        if data is None or len(data) == 0:
             print("Cannot decode empty data")
             return None
-            
+
         try:
-            arr = np.frombuffer(data, np.uint8)
-            frame = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-            
+            frame = self.__backend.decode(data, scale)
+
             if frame is None:
                 print("Frame decoding failed")
             return frame
-        
+
         except Exception as e:
             print(f"Frame decoding error: {e}")
             return None
@@ -55,4 +103,4 @@ class FrameEncoder:
             return False
         if len(frame.shape) != 3:
             return False
-        return True
\ No newline at end of file
+        return True
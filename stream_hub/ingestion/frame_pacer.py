@@ -0,0 +1,33 @@
+class FramePacer:
+    """Decides which timestamped frames fit an output fps schedule."""
+
+    def __init__(self, fps: float):
+        self.__next_due = 0.0
+        self.set_fps(fps)
+
+    @property
+    def fps(self) -> float:
+        return self.__fps
+
+    def set_fps(self, fps: float):
+        if fps <= 0:
+            raise ValueError(f"fps must be positive, got {fps}")
+        self.__fps = fps
+        self.__interval = 1.0 / fps
+        # Frames closer than this to the schedule still count as on time, so
+        # capture jitter does not make a 30 fps camera publish at 15 fps.
+        self.__tolerance = self.__interval / 4
+
+    def reset(self):
+        self.__next_due = 0.0
+
+    def due(self, ts: float) -> bool:
+        if ts + self.__tolerance < self.__next_due:
+            return False
+
+        if ts - self.__next_due < self.__interval:
+            self.__next_due += self.__interval
+        else:
+            # First frame, or we fell behind (stall, reconnect): restart the grid.
+            self.__next_due = ts + self.__interval
+        return True
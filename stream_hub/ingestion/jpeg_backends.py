@@ -0,0 +1,163 @@
+import cv2
+import numpy as np
+from typing import Dict, Optional, Type
+
+# Scaled decode trades resolution for speed: the IDCT runs at 1/scale size,
+# so a 1/4 decode of a 1080p frame is several times cheaper than a full one.
+SCALES = (1, 2, 4, 8)
+SUBSAMPLINGS = ("444", "422", "420")
+
+
+def _check_options(subsampling: Optional[str], scale: int = 1):
+    if subsampling is not None and str(subsampling) not in SUBSAMPLINGS:
+        raise ValueError(f"Unsupported chroma subsampling '{subsampling}', expected one of {SUBSAMPLINGS}")
+    if scale not in SCALES:
+        raise ValueError(f"Unsupported decode scale 1/{scale}, expected one of {SCALES}")
+
+
+class JpegBackend:
+    name = ""
+
+    def encode(self, frame: np.ndarray, quality: int):
+        raise NotImplementedError
+
+    def decode(self, data, scale: int = 1) -> Optional[np.ndarray]:
+        raise NotImplementedError
+
+
+class OpenCVBackend(JpegBackend):
+    name = "opencv"
+
+    _SAMPLING = {
+        "444": "IMWRITE_JPEG_SAMPLING_FACTOR_444",
+        "422": "IMWRITE_JPEG_SAMPLING_FACTOR_422",
+        "420": "IMWRITE_JPEG_SAMPLING_FACTOR_420",
+    }
+    _REDUCED = {
+        1: cv2.IMREAD_COLOR,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        8: cv2.IMREAD_REDUCED_COLOR_8,
+    }
+
+    def __init__(self, subsampling: Optional[str] = None, **_):
+        _check_options(subsampling)
+        self.__extra_params = []
+        if subsampling is not None and hasattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR"):
+            self.__extra_params = [
+                cv2.IMWRITE_JPEG_SAMPLING_FACTOR,
+                getattr(cv2, self._SAMPLING[str(subsampling)]),
+            ]
+
+    def encode(self, frame: np.ndarray, quality: int):
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality, *self.__extra_params])
+        if not ok:
+            return None
+        # Flat view over the imencode buffer, handed to ZMQ without copying.
+        return memoryview(buf).cast("B")
+
+    def decode(self, data, scale: int = 1) -> Optional[np.ndarray]:
+        _check_options(None, scale)
+        return cv2.imdecode(np.frombuffer(data, np.uint8), self._REDUCED[scale])
+
+
+class TurboJpegBackend(JpegBackend):
+    name = "turbojpeg"
+
+    def __init__(self, subsampling: Optional[str] = "420", fast_dct: bool = False,
+                 fast_upsample: bool = False, lib_path: Optional[str] = None, **_):
+        _check_options(subsampling)
+        try:
+            import turbojpeg
+        except ImportError as e:
+            raise ImportError("The 'turbojpeg' JPEG backend requires PyTurboJPEG and libturbojpeg") from e
+
+        self.__tj = turbojpeg
+        # One handle per worker; PyTurboJPEG loads the library and resolves
+        # symbols in the constructor, which is far too slow to do per frame.
+        self.__jpeg = turbojpeg.TurboJPEG(lib_path)
+        self.__subsample = {
+            "444": turbojpeg.TJSAMP_444,
+            "422": turbojpeg.TJSAMP_422,
+            "420": turbojpeg.TJSAMP_420,
+        }[str(subsampling or "420")]
+
+        self.__flags = 0
+        if fast_dct:
+            self.__flags |= turbojpeg.TJFLAG_FASTDCT
+        if fast_upsample:
+            self.__flags |= turbojpeg.TJFLAG_FASTUPSAMPLE
+
+    def encode(self, frame: np.ndarray, quality: int):
+        return self.__jpeg.encode(
+            frame,
+            quality=quality,
+            pixel_format=self.__tj.TJPF_BGR,
+            jpeg_subsample=self.__subsample,
+            flags=self.__flags,
+        )
+
+    def decode(self, data, scale: int = 1) -> Optional[np.ndarray]:
+        _check_options(None, scale)
+        return self.__jpeg.decode(
+            data,
+            pixel_format=self.__tj.TJPF_BGR,
+            scaling_factor=None if scale == 1 else (1, scale),
+            flags=self.__flags,
+        )
+
+
+class SimpleJpegBackend(JpegBackend):
+    name = "simplejpeg"
+
+    def __init__(self, subsampling: Optional[str] = "420", fast_dct: bool = False,
+                 fast_upsample: bool = False, **_):
+        _check_options(subsampling)
+        try:
+            import simplejpeg
+        except ImportError as e:
+            raise ImportError("The 'simplejpeg' JPEG backend requires the simplejpeg package") from e
+
+        self.__sj = simplejpeg
+        self.__subsampling = str(subsampling or "420")
+        self.__fast_dct = bool(fast_dct)
+        self.__fast_upsample = bool(fast_upsample)
+
+    def encode(self, frame: np.ndarray, quality: int):
+        return self.__sj.encode_jpeg(
+            np.ascontiguousarray(frame),
+            quality=quality,
+            colorspace="BGR",
+            colorsubsampling=self.__subsampling,
+            fastdct=self.__fast_dct,
+        )
+
+    def decode(self, data, scale: int = 1) -> Optional[np.ndarray]:
+        _check_options(None, scale)
+        min_height = min_width = 0
+        if scale > 1:
+            # simplejpeg picks the smallest DCT scale that still covers the minimum size.
+            height, width, _, _ = self.__sj.decode_jpeg_header(data)
+            min_height, min_width = -(-height // scale), -(-width // scale)
+        return self.__sj.decode_jpeg(
+            data,
+            colorspace="BGR",
+            fastdct=self.__fast_dct,
+            fastupsample=self.__fast_upsample,
+            min_height=min_height,
+            min_width=min_width,
+        )
+
+
+BACKENDS: Dict[str, Type[JpegBackend]] = {
+    OpenCVBackend.name: OpenCVBackend,
+    TurboJpegBackend.name: TurboJpegBackend,
+    SimpleJpegBackend.name: SimpleJpegBackend,
+}
+
+
+def create_backend(name: str = "opencv", **options) -> JpegBackend:
+    backend_cls = BACKENDS.get(name)
+    if backend_cls is None:
+        raise ValueError(f"Unknown JPEG backend '{name}', expected one of {sorted(BACKENDS)}")
+    return backend_cls(**options)
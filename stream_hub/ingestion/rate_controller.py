@@ -0,0 +1,127 @@
+import time
+from typing import Any, Dict, Optional
+
+DEFAULTS = {
+    "enabled": False,
+    "bitrate_kbps": 4000,      # budget for all renditions of one stream
+    "min_quality": 40,
+    "quality_step": 10,
+    "min_scale": 0.5,
+    "scale_step": 0.25,
+    "min_fps": 5,
+    "window_sec": 1.0,
+    "headroom": 0.75,          # step back up only while below headroom × budget
+    "recover_windows": 3,      # consecutive good windows before stepping up
+}
+
+
+class RateController:
+    """Keeps one stream inside its bandwidth budget.
+
+    Once per window it looks at the encoded bytes, HWM drops and encode time
+    of the frames published in that window. Under pressure it degrades one
+    step at a time, first JPEG quality, then resolution, then fps. When the
+    pressure is gone it restores them in the reverse order.
+
+    HWM drops only see the worker → proxy queue. The proxy's XPUB drops for
+    a slow consumer silently, so that consumer's backlog is invisible here
+    (see the client's ``dropped``/``overflow`` counters instead).
+    """
+
+    def __init__(self, cfg: Optional[Dict[str, Any]], fps: float, max_quality: int = 100):
+        cfg = {**DEFAULTS, **(cfg or {})}
+        self.enabled = bool(cfg["enabled"])
+
+        self.__budget_kbps = float(cfg["bitrate_kbps"])
+        self.__max_quality = int(max_quality)
+        self.__min_quality = int(cfg["min_quality"])
+        self.__quality_step = int(cfg["quality_step"])
+        self.__min_scale = float(cfg["min_scale"])
+        self.__scale_step = float(cfg["scale_step"])
+        self.__max_fps = float(fps)
+        self.__min_fps = min(float(cfg["min_fps"]), self.__max_fps)
+        self.__window = float(cfg["window_sec"])
+        self.__headroom = float(cfg["headroom"])
+        self.__recover_windows = int(cfg["recover_windows"])
+
+        self.__quality_drop = 0
+        self.scale = 1.0
+        self.fps = self.__max_fps
+
+        self.__good_windows = 0
+        self.__window_start = time.monotonic()
+        self.__bytes = 0
+        self.__frames = 0
+        self.__drops = 0
+        self.__encode_ms = 0.0
+        self.kbps = 0.0
+
+    def quality(self, base_quality: int) -> int:
+        if self.__quality_drop == 0:
+            return base_quality
+        return max(min(base_quality, self.__min_quality), base_quality - self.__quality_drop)
+
+    def record(self, nbytes: int, encode_ms: float, sent: bool):
+        self.__bytes += nbytes
+        self.__encode_ms += encode_ms
+        if not sent:
+            self.__drops += 1
+
+    def frame_done(self):
+        self.__frames += 1
+
+    def update(self, now: Optional[float] = None) -> bool:
+        """Close the window if it is due; returns True when fps changed."""
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.__window_start
+        if elapsed < self.__window:
+            return False
+
+        frames, nbytes, drops, encode_ms = self.__frames, self.__bytes, self.__drops, self.__encode_ms
+        self.__window_start = now
+        self.__bytes = self.__frames = self.__drops = 0
+        self.__encode_ms = 0.0
+        if frames == 0:
+            # Nothing published (no subscribers): no signal either way.
+            return False
+
+        self.kbps = nbytes * 8 / elapsed / 1000
+        # Encoding busier than 80% of the frame interval will back up capture.
+        encode_load = (encode_ms / frames) * self.fps / 1000
+
+        old_fps = self.fps
+        if drops or self.kbps > self.__budget_kbps or encode_load > 0.8:
+            self.__good_windows = 0
+            self.__degrade()
+        elif self.kbps < self.__budget_kbps * self.__headroom and encode_load < 0.5:
+            self.__good_windows += 1
+            if self.__good_windows >= self.__recover_windows:
+                self.__good_windows = 0
+                self.__restore()
+        else:
+            self.__good_windows = 0
+        return self.fps != old_fps
+
+    def __degrade(self):
+        if self.__max_quality - self.__quality_drop > self.__min_quality:
+            self.__quality_drop += self.__quality_step
+        elif self.scale > self.__min_scale:
+            self.scale = max(self.__min_scale, round(self.scale - self.__scale_step, 3))
+        elif self.fps > self.__min_fps:
+            self.fps = max(self.__min_fps, round(self.fps * 0.75, 2))
+
+    def __restore(self):
+        if self.fps < self.__max_fps:
+            self.fps = min(self.__max_fps, round(self.fps / 0.75, 2))
+        elif self.scale < 1.0:
+            self.scale = min(1.0, round(self.scale + self.__scale_step, 3))
+        elif self.__quality_drop > 0:
+            self.__quality_drop = max(0, self.__quality_drop - self.__quality_step)
+
+    def state(self) -> Dict[str, float]:
+        return {
+            "adaptive_quality_drop": self.__quality_drop,
+            "adaptive_scale": self.scale,
+            "adaptive_fps": self.fps,
+            "bitrate_kbps": round(self.kbps, 1),
+        }
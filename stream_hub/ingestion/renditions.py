@@ -0,0 +1,88 @@
+import re
+import cv2
+from typing import Any, Iterable, List, Optional, Union
+
+from stream_hub.network.wire import DEFAULT_RENDITION
+
+DEFAULT_QUALITY = 85
+
+INTERPOLATIONS = {
+    "nearest": cv2.INTER_NEAREST,
+    "linear": cv2.INTER_LINEAR,
+    "area": cv2.INTER_AREA,
+}
+
+# "full@85", "320p@60", "720p"
+_SPEC = re.compile(r"^(?:(?P<full>full)|(?P<height>\d+)p)(?:@(?P<quality>\d+))?$")
+
+
+class Rendition:
+    def __init__(
+        self,
+        name: str,
+        quality: int = DEFAULT_QUALITY,
+        height: Optional[int] = None,
+        interpolation: str = "linear",
+    ):
+        if not 1 <= int(quality) <= 100:
+            raise ValueError(f"Rendition '{name}': JPEG quality must be in [1, 100], got {quality}")
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f"Rendition '{name}': unknown interpolation '{interpolation}'")
+
+        self.name = name
+        self.quality = int(quality)
+        self.height = int(height) if height else None
+        self.interpolation = interpolation
+
+    def apply(self, frame, scale: float = 1.0):
+        # `scale` is an extra downscale on top of the rendition height, set by
+        # the rate controller under congestion.
+        h, w = frame.shape[:2]
+        height = min(h, self.height) if self.height else h
+        if scale < 1.0:
+            height = max(1, round(height * scale))
+        if height >= h:
+            return frame
+
+        width = max(1, round(w * height / h))
+        return cv2.resize(frame, (width, height), interpolation=INTERPOLATIONS[self.interpolation])
+
+    def __repr__(self):
+        size = f"{self.height}p" if self.height else "full"
+        return f"Rendition({self.name}: {size}@{self.quality})"
+
+
+def parse_rendition(spec: Union[str, dict, Any]) -> Rendition:
+    if isinstance(spec, str):
+        match = _SPEC.match(spec.strip())
+        if match is None:
+            raise ValueError(f"Invalid rendition '{spec}', expected e.g. 'full@85' or '320p@60'")
+
+        quality = int(match["quality"] or DEFAULT_QUALITY)
+        if match["full"]:
+            return Rendition(DEFAULT_RENDITION, quality)
+        return Rendition(f"{match['height']}p", quality, height=int(match["height"]))
+
+    if isinstance(spec, dict):
+        height = spec.get("height")
+        name = spec.get("name") or (f"{height}p" if height else DEFAULT_RENDITION)
+        return Rendition(
+            name,
+            quality=spec.get("quality", DEFAULT_QUALITY),
+            height=height,
+            interpolation=spec.get("interpolation", "linear"),
+        )
+
+    raise ValueError(f"Invalid rendition {spec!r}")
+
+
+def parse_renditions(specs: Optional[Iterable[Any]]) -> List[Rendition]:
+    if not specs:
+        return [Rendition(DEFAULT_RENDITION)]
+
+    renditions = [parse_rendition(spec) for spec in specs]
+    names = [r.name for r in renditions]
+    duplicates = {n for n in names if names.count(n) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate rendition names: {sorted(duplicates)}")
+    return renditions
@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from stream_hub.ingestion.renditions import Rendition, parse_rendition
+
+Box = Tuple[int, int, int, int]
+
+
+def parse_box(target: Any, width: int, height: int) -> Optional[Box]:
+    """Read one feedback target as a pixel box ``(x1, y1, x2, y2)``.
+
+    Accepted forms: ``[x1, y1, x2, y2]``, ``{"x1", "y1", "x2", "y2"}``,
+    ``{"bbox": [...]}`` or ``{"x", "y", "w", "h"}``. If every coordinate is at
+    most 1, the box is taken as normalised to the frame size.
+    """
+    if isinstance(target, dict):
+        if "bbox" in target:
+            return parse_box(target["bbox"], width, height)
+        if all(k in target for k in ("x1", "y1", "x2", "y2")):
+            coords = [target["x1"], target["y1"], target["x2"], target["y2"]]
+        elif all(k in target for k in ("x", "y", "w", "h")):
+            coords = [target["x"], target["y"], target["x"] + target["w"], target["y"] + target["h"]]
+        else:
+            return None
+    elif isinstance(target, (list, tuple)) and len(target) == 4:
+        coords = list(target)
+    else:
+        return None
+
+    try:
+        x1, y1, x2, y2 = (float(c) for c in coords)
+    except (TypeError, ValueError):
+        return None
+    if max(x1, y1, x2, y2) <= 1.0:
+        x1, x2 = x1 * width, x2 * width
+        y1, y2 = y1 * height, y2 * height
+
+    x1, x2 = sorted((x1, x2))
+    y1, y2 = sorted((y1, y2))
+    box = (max(0, int(x1)), max(0, int(y1)), min(width, int(round(x2))), min(height, int(round(y2))))
+    if box[2] - box[0] < 2 or box[3] - box[1] < 2:
+        return None
+    return box
+
+
+class RoiExtractor:
+    """Turns a stream's latest feedback targets into padded crop boxes."""
+
+    def __init__(self, cfg: Optional[Dict[str, Any]]):
+        cfg = cfg or {}
+        self.enabled = bool(cfg.get("enabled", False))
+        self.feedback = cfg.get("feedback", "perception")
+        self.events = cfg.get("events") or None
+        self.quality = int(cfg.get("quality", 90))
+        self.padding = float(cfg.get("padding", 0.1))
+        self.max_age = float(cfg.get("max_age_ms", 500)) / 1000
+        self.max_regions = int(cfg.get("max_regions", 16))
+
+        background = cfg.get("background")
+        self.background: Optional[Rendition] = parse_rendition(background) if background else None
+
+        if not 1 <= self.quality <= 100:
+            raise ValueError(f"ROI quality must be in [1, 100], got {self.quality}")
+
+    def regions(self, events: Dict[str, Dict[str, Any]], frame_shape: Sequence[int], ts: float) -> List[Box]:
+        info = events.get(self.feedback)
+        if not info or info.get("timestamp") is None:
+            return []
+        if self.events and info.get("data") not in self.events:
+            return []
+        if ts - info["timestamp"] > self.max_age:
+            # Boxes from an old detection would point at the wrong pixels.
+            return []
+
+        height, width = frame_shape[:2]
+        boxes = []
+        for target in info.get("target") or []:
+            box = parse_box(target, width, height)
+            if box is not None:
+                boxes.append(self.__pad(box, width, height))
+            if len(boxes) >= self.max_regions:
+                break
+        return boxes
+
+    def __pad(self, box: Box, width: int, height: int) -> Box:
+        x1, y1, x2, y2 = box
+        dx = int((x2 - x1) * self.padding)
+        dy = int((y2 - y1) * self.padding)
+        return max(0, x1 - dx), max(0, y1 - dy), min(width, x2 + dx), min(height, y2 + dy)
@@ -0,0 +1,109 @@
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import zmq
+
+from stream_hub.network.wire import STATS_TOPIC, decode_message
+from stream_hub.utils.utils import endpoint_list
+
+
+def estimate_costs(streams_cfg: List[Dict], measured: Dict[str, float], default_fps: int) -> Dict[str, float]:
+    # Streams without a measurement are assumed to cost the average measured
+    # stream, scaled by their fps; with no measurements at all, fps alone is
+    # the (relative) cost.
+    known = [measured[cfg["id"]] for cfg in streams_cfg if cfg["id"] in measured]
+    per_fps = None
+    if known:
+        fps_known = [int(cfg.get("fps", default_fps)) for cfg in streams_cfg if cfg["id"] in measured]
+        per_fps = sum(known) / max(1, sum(fps_known))
+
+    costs = {}
+    for cfg in streams_cfg:
+        fps = int(cfg.get("fps", default_fps))
+        if cfg["id"] in measured:
+            costs[cfg["id"]] = measured[cfg["id"]]
+        elif per_fps is not None:
+            costs[cfg["id"]] = per_fps * fps * float(cfg.get("cost_weight", 1.0))
+        else:
+            costs[cfg["id"]] = fps * float(cfg.get("cost_weight", 1.0))
+    return costs
+
+
+def assign_streams(streams_cfg: List[Dict], n_workers: int, costs: Dict[str, float]) -> List[List[Dict]]:
+    """Longest-processing-time-first: heaviest stream goes to the least loaded worker."""
+    n_workers = max(1, min(n_workers, len(streams_cfg)))
+    bins: List[List[Dict]] = [[] for _ in range(n_workers)]
+    loads = [0.0] * n_workers
+
+    for cfg in sorted(streams_cfg, key=lambda c: costs.get(c["id"], 0.0), reverse=True):
+        target = loads.index(min(loads))
+        bins[target].append(cfg)
+        loads[target] += costs.get(cfg["id"], 0.0)
+    return [b for b in bins if b]
+
+
+class StreamCostTracker:
+    """Follows ``stats/`` snapshots and remembers each stream's measured cost."""
+
+    def __init__(self, stats_endpoint: str, cost_file: Optional[str] = None):
+        self.__stats_endpoint = stats_endpoint
+        self.__cost_file = Path(cost_file) if cost_file else None
+        self.__costs: Dict[str, float] = self.__load()
+        self.__lock = threading.Lock()
+        self.__stop_event = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def costs(self) -> Dict[str, float]:
+        with self.__lock:
+            return dict(self.__costs)
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout=2)
+        self.__save()
+
+    def __run(self):
+        sub = zmq.Context.instance().socket(zmq.SUB)
+        sub.setsockopt_string(zmq.SUBSCRIBE, f"{STATS_TOPIC}/")
+        for endpoint in endpoint_list(self.__stats_endpoint):
+            sub.connect(endpoint)
+        poller = zmq.Poller()
+        poller.register(sub, zmq.POLLIN)
+        try:
+            while not self.__stop_event.is_set():
+                if not poller.poll(200):
+                    continue
+                try:
+                    _, snapshot, _ = decode_message(sub.recv_multipart(copy=False))
+                except ValueError:
+                    continue
+                cost = snapshot.get("gauges", {}).get("cost_ms_per_sec")
+                if cost:
+                    with self.__lock:
+                        self.__costs[snapshot["stream_id"]] = float(cost)
+        finally:
+            sub.close()
+
+    def __load(self) -> Dict[str, float]:
+        if self.__cost_file is None or not self.__cost_file.exists():
+            return {}
+        try:
+            return {k: float(v) for k, v in json.loads(self.__cost_file.read_text()).items()}
+        except (ValueError, OSError) as e:
+            print(f"[Scheduler] Ignoring unreadable cost file {self.__cost_file}: {e}")
+            return {}
+
+    def __save(self):
+        if self.__cost_file is None:
+            return
+        try:
+            self.__cost_file.write_text(json.dumps(self.costs(), indent=2, sort_keys=True))
+        except OSError as e:
+            print(f"[Scheduler] Could not write cost file {self.__cost_file}: {e}")
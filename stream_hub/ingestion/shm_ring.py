@@ -0,0 +1,190 @@
+import struct
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Segment layout:
+#   [ring header][slot header x N][slot data x N]
+# Each slot header carries a seqlock generation: odd while the writer is
+# copying into the slot, even once the frame is complete.  Readers check the
+# generation before and after touching the pixels to detect overwrites.
+_MAGIC = b"SHR1"
+_RING_HEADER = struct.Struct("<4sIQ")          # magic, slots, slot_capacity
+_SLOT_HEADER = struct.Struct("<QqdIII")        # generation, frame_id, ts, shape (3 dims)
+_ALIGN = 64
+
+# Segments created by rings in this process; a reader attaching to one of
+# them must leave the writer's resource-tracker registration alone.
+_OWNED = set()
+
+
+def _align(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class _RingLayout:
+    def __init__(self, slots: int, slot_capacity: int):
+        self.slots = slots
+        self.slot_capacity = _align(slot_capacity)
+        self.slot_header_size = _align(_SLOT_HEADER.size)
+        self.headers_offset = _align(_RING_HEADER.size)
+        self.data_offset = self.headers_offset + self.slot_header_size * slots
+        self.total_size = self.data_offset + self.slot_capacity * slots
+
+    def header_offset(self, slot: int) -> int:
+        return self.headers_offset + self.slot_header_size * slot
+
+    def slot_offset(self, slot: int) -> int:
+        return self.data_offset + self.slot_capacity * slot
+
+
+class SharedFrameRing:
+    """Writer side of a fixed-slot ring of raw frames in shared memory.
+
+    Slots hold any 3-D array: HxWxC uint8 frames, or model-input tensors
+    (CHW/HWC, float) whose dtype the notification carries.
+    """
+
+    def __init__(self, name: str, slots: int, slot_capacity: int):
+        if slots < 2:
+            raise ValueError("SharedFrameRing needs at least 2 slots")
+
+        self.__layout = _RingLayout(slots, slot_capacity)
+        self.__shm = shared_memory.SharedMemory(name=name, create=True, size=self.__layout.total_size)
+        _OWNED.add(self.__shm._name)
+        self.__buf = self.__shm.buf
+        self.__next_slot = 0
+
+        _RING_HEADER.pack_into(self.__buf, 0, _MAGIC, slots, self.__layout.slot_capacity)
+        for slot in range(slots):
+            _SLOT_HEADER.pack_into(self.__buf, self.__layout.header_offset(slot), 0, -1, 0.0, 0, 0, 0)
+
+    @property
+    def name(self) -> str:
+        return self.__shm.name
+
+    @property
+    def slot_capacity(self) -> int:
+        return self.__layout.slot_capacity
+
+    def fits(self, frame: np.ndarray) -> bool:
+        return frame.nbytes <= self.__layout.slot_capacity
+
+    def write(self, frame: np.ndarray, frame_id: int, ts: float) -> Tuple[int, int]:
+        if frame.ndim != 3:
+            raise ValueError(f"Expected a 3-D array, got shape {frame.shape}")
+        if not self.fits(frame):
+            raise ValueError(f"Frame of {frame.nbytes} bytes exceeds slot capacity {self.slot_capacity}")
+
+        layout = self.__layout
+        slot = self.__next_slot
+        self.__next_slot = (slot + 1) % layout.slots
+
+        header_offset = layout.header_offset(slot)
+        (generation,) = struct.unpack_from("<Q", self.__buf, header_offset)
+
+        struct.pack_into("<Q", self.__buf, header_offset, generation + 1)
+        h, w, c = frame.shape
+        dst = np.ndarray((h, w, c), dtype=frame.dtype, buffer=self.__buf, offset=layout.slot_offset(slot))
+        np.copyto(dst, frame)
+        generation += 2
+        _SLOT_HEADER.pack_into(self.__buf, header_offset, generation, frame_id, ts, h, w, c)
+
+        return slot, generation
+
+    def close(self):
+        if self.__shm is None:
+            return
+        self.__buf = None
+        _OWNED.discard(self.__shm._name)
+        try:
+            self.__shm.close()
+            self.__shm.unlink()
+        except FileNotFoundError:
+            pass
+        self.__shm = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class SharedFrameReader:
+    """Consumer side: maps ring slots as NumPy arrays without copying.
+
+    ``read`` returns a view straight into shared memory.  The writer may reuse
+    the slot once the ring wraps, so call ``is_valid`` after processing (or copy
+    the frame) to make sure the pixels were not overwritten mid-use.
+    """
+
+    def __init__(self, name: str):
+        self.__shm = _attach(name)
+        self.__buf = self.__shm.buf
+
+        magic, slots, slot_capacity = _RING_HEADER.unpack_from(self.__buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Shared memory segment '{name}' is not a frame ring")
+        self.__layout = _RingLayout(slots, slot_capacity)
+
+    @property
+    def name(self) -> str:
+        return self.__shm.name
+
+    def read(self, slot: int, generation: int, dtype="uint8") -> Optional[np.ndarray]:
+        header = self.__read_header(slot)
+        if header is None or header[0] != generation:
+            return None
+
+        _, _, _, h, w, c = header
+        return np.ndarray((h, w, c), dtype=dtype, buffer=self.__buf, offset=self.__layout.slot_offset(slot))
+
+    def is_valid(self, slot: int, generation: int) -> bool:
+        header = self.__read_header(slot)
+        return header is not None and header[0] == generation
+
+    def __read_header(self, slot: int):
+        if not 0 <= slot < self.__layout.slots:
+            return None
+        header = _SLOT_HEADER.unpack_from(self.__buf, self.__layout.header_offset(slot))
+        if header[0] & 1:
+            return None
+        return header
+
+    def close(self):
+        if self.__shm is None:
+            return
+        self.__buf = None
+        try:
+            self.__shm.close()
+        except BufferError:
+            # A view returned by read() is still alive; the mapping goes away with it.
+            pass
+        self.__shm = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    # Python < 3.13 registers attached segments with the resource tracker,
+    # which would unlink the writer's ring when this consumer exits.
+    shm = shared_memory.SharedMemory(name=name)
+    if shm._name in _OWNED:
+        return shm
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
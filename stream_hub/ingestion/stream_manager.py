@@ -1,34 +1,320 @@
+import os
+import time
+import queue
 import logging
-from multiprocessing import Process
-from stream_hub.ingestion.stream_worker_process import stream_worker_entry
+import threading
+import multiprocessing
+from stream_hub.ingestion.scheduler import StreamCostTracker, assign_streams, estimate_costs
+from stream_hub.ingestion.stream_worker_process import stream_pool_entry, stream_worker_entry
+
+# Changing these means a new worker process: shm rings and the proxy
+# connection are set up once per process. Any other key is applied in place.
+RESTART_KEYS = ("proxy_endpoint", "shm")
+
+# Imported once by the forkserver; workers fork from it with these loaded
+# instead of each re-importing cv2/numpy/zmq.
+PRELOAD_MODULES = ["cv2", "numpy", "zmq", "stream_hub.ingestion.stream_worker_process"]
+
+
+def default_start_method() -> str:
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def plan_reload(old, new):
+    """Split a reload into ``(added, removed, updated, restart)`` stream ids.
+
+    ``old`` and ``new`` map stream ids to effective configs. Changed streams
+    are updated in place unless a RESTART_KEYS value differs.
+    """
+    added = [sid for sid in new if sid not in old]
+    removed = [sid for sid in old if sid not in new]
+    changed = [sid for sid in new if sid in old and new[sid] != old[sid]]
+    restart = [sid for sid in changed if any(old[sid].get(k) != new[sid].get(k) for k in RESTART_KEYS)]
+    updated = [sid for sid in changed if sid not in restart]
+    return added, removed, updated, restart
+
+
+def with_adaptive(cfg, adaptive_cfg, n_streams):
+    # hub.yaml `adaptive` is the default for every stream; a stream's own
+    # `adaptive` block overrides it. A hub-wide budget is split evenly.
+    if not adaptive_cfg and "adaptive" not in cfg:
+        return cfg
+
+    adaptive = {key: value for key, value in adaptive_cfg.items() if key != "hub_bitrate_kbps"}
+    hub_budget = float(adaptive_cfg.get("hub_bitrate_kbps") or 0)
+    if hub_budget > 0:
+        share = hub_budget / max(1, n_streams)
+        adaptive["bitrate_kbps"] = min(float(adaptive.get("bitrate_kbps", share)), share)
+    adaptive.update(cfg.get("adaptive") or {})
+    return {**cfg, "adaptive": adaptive}
+
 
 class StreamManager:
-    def __init__(self, streams_cfg, proxy, feedback, fps=15):
+    def __init__(self, streams_cfg, proxy, feedback, fps=15, encoder=None, metrics=None, pool=None,
+                 stats_endpoint=None, feedback_endpoint=None, adaptive=None, start_method=None,
+                 startup_timeout=30.0):
         self.__logger = logging.getLogger(__name__)
         self.__streams_cfg = streams_cfg
         self.__proxy = proxy
         self.__feedbacks = feedback
+        self.__feedback_endpoint = feedback_endpoint
         self.__fps = fps
+        self.__encoder_cfg = encoder or {}
+        self.__metrics_cfg = metrics or {}
+        self.__pool_cfg = pool or {}
+        self.__adaptive_cfg = adaptive or {}
         self.__processes = {}
+        # Effective config (adaptive defaults merged) of each running stream,
+        # and in pool mode the pool process hosting it.
+        self.__stream_cfgs = {}
+        self.__pool_of = {}
+        self.__controls = {}
+        # In-place updates sent but not yet acknowledged: {stream_id: {update_id: cfg}}.
+        # A config is only recorded in __stream_cfgs once its worker accepted it.
+        self.__requested = {}
+        self.__update_seq = 0
+        self.__pool_count = 0
+
+        self.__mp = multiprocessing.get_context(start_method or default_start_method())
+        if self.__mp.get_start_method() == "forkserver":
+            self.__mp.set_forkserver_preload(PRELOAD_MODULES)
+        self.__ready_queue = self.__mp.Queue()
+        self.__update_queue = self.__mp.Queue()
+        self.__startup_timeout = float(startup_timeout or 0)
+        self.__started_at = 0.0
+        self.__pending_live = {}
+        self.__live_lock = threading.Lock()
+        self.__all_live = threading.Event()
+        self.__stop_event = threading.Event()
+        self.__watcher = None
+
+        self.__cost_tracker = None
+        if self.__pool_cfg.get("enabled", False) and stats_endpoint:
+            self.__cost_tracker = StreamCostTracker(stats_endpoint, self.__pool_cfg.get("cost_file"))
+
+    def start(self, started_at=None):
+        # started_at (time.monotonic()) lets the caller include its own
+        # startup, e.g. binding the proxies, in the time-to-live figures.
+        started_at = started_at or time.monotonic()
+        enabled = self.__enabled(self.__streams_cfg)
+        print(f"[StreamManager] Starting workers with the '{self.__mp.get_start_method()}' start method")
+        self.__start_streams(list(enabled.values()), started_at)
+        if self.__cost_tracker:
+            self.__cost_tracker.start()
+
+    def reload(self, streams_cfg):
+        """Apply a new ``streams`` list: start added streams, stop removed ones,
+        update changed ones in place. Untouched streams keep running."""
+        ids = [cfg.get("id") for cfg in streams_cfg]
+        if len(set(ids)) != len(ids) or not all(ids) or not all(cfg.get("source") for cfg in streams_cfg):
+            raise ValueError("Every stream needs a unique 'id' and a 'source'")
+
+        new = self.__enabled(streams_cfg, log=False)
+        self.__collect_updates()
+        # Compare with the latest config sent to each worker, accepted or not:
+        # a rejected update is resent on the next reload, a pending one is not.
+        old = {sid: self.__latest_requested(sid) for sid in self.__stream_cfgs}
+        added, removed, updated, restart = plan_reload(old, new)
+
+        if not (added or removed or updated or restart):
+            print("[StreamManager] Reload: no stream changes")
+            return
+        print(f"[StreamManager] Reload: added={added} removed={removed} updated={updated} restarted={restart}")
+
+        for sid in removed + restart:
+            self.__stop_stream(sid)
+        for sid in updated:
+            self.__update_seq += 1
+            self.__requested.setdefault(sid, {})[self.__update_seq] = new[sid]
+            self.__send(sid, ("update", sid, new[sid], self.__update_seq))
+        self.__streams_cfg = streams_cfg
+        self.__start_streams([new[sid] for sid in added + restart], time.monotonic())
+
+    def stream_configs(self):
+        """Effective config of every running stream, as accepted by its worker."""
+        self.__collect_updates()
+        return dict(self.__stream_cfgs)
+
+    def __latest_requested(self, stream_id):
+        requested = self.__requested.get(stream_id)
+        if requested:
+            return requested[max(requested)]
+        return self.__stream_cfgs[stream_id]
+
+    def __collect_updates(self):
+        # Workers answer each ("update", ...) with (stream_id, update_id, accepted).
+        while True:
+            try:
+                stream_id, update_id, accepted = self.__update_queue.get_nowait()
+            except queue.Empty:
+                return
+            except (EOFError, OSError):
+                return
 
-    def start(self):
-        for cfg in self.__streams_cfg:
+            requested = self.__requested.get(stream_id)
+            if not requested or update_id not in requested:
+                continue  # the stream was removed or restarted since
+            cfg = requested[update_id]
+            # Older updates were overwritten in the worker before it applied them.
+            for older in [uid for uid in requested if uid <= update_id]:
+                del requested[older]
+            if not requested:
+                del self.__requested[stream_id]
+
+            if accepted:
+                self.__stream_cfgs[stream_id] = cfg
+            else:
+                print(f"[{stream_id}] Config update rejected by the worker, keeping the previous one")
+
+    def __enabled(self, streams_cfg, log=True):
+        enabled = []
+        for cfg in streams_cfg:
             if not cfg.get("enabled", True):
-                print(f"[{cfg['id']}] Disabled stream skipped")
+                if log:
+                    print(f"[{cfg['id']}] Disabled stream skipped")
                 continue
+            enabled.append(cfg)
+        return {cfg["id"]: with_adaptive(cfg, self.__adaptive_cfg, len(enabled)) for cfg in enabled}
+
+    def __start_streams(self, cfgs, started_at):
+        if not cfgs:
+            return
+        self.__watch_startup([cfg["id"] for cfg in cfgs], started_at)
+        for cfg in cfgs:
+            self.__stream_cfgs[cfg["id"]] = cfg
 
-            p = Process(
+        if self.__pool_cfg.get("enabled", False):
+            self.__start_pool(cfgs)
+            return
+
+        for cfg in cfgs:
+            control = self.__mp.Queue()
+            p = self.__mp.Process(
                 target=stream_worker_entry,
-                args=(cfg, self.__proxy, self.__feedbacks, self.__fps),
+                args=(cfg, self.__proxy, self.__feedbacks, self.__fps, self.__encoder_cfg, self.__metrics_cfg,
+                      self.__feedback_endpoint, self.__ready_queue, control, self.__update_queue),
             )
             p.daemon = False
             p.start()
 
             self.__processes[cfg["id"]] = p
+            self.__controls[cfg["id"]] = control
             print(f"[{cfg['id']}] Started worker PID={p.pid}")
 
+    def __send(self, stream_id, message):
+        owner = self.__pool_of.get(stream_id, stream_id)
+        control = self.__controls.get(owner)
+        if control is not None:
+            control.put(message)
+
+    def __stop_stream(self, stream_id):
+        self.__stream_cfgs.pop(stream_id, None)
+        self.__requested.pop(stream_id, None)
+        with self.__live_lock:
+            self.__pending_live.pop(stream_id, None)
+        pool = self.__pool_of.pop(stream_id, None)
+        if pool is not None:
+            # The other cameras of that pool process keep running.
+            self.__controls[pool].put(("remove", stream_id))
+            return
+
+        proc = self.__processes.pop(stream_id, None)
+        self.__controls.pop(stream_id, None)
+        if proc is not None and proc.is_alive():
+            print(f"[{stream_id}] Terminating process {proc.pid}")
+            proc.terminate()
+            proc.join(timeout=3)
+
+    def __start_pool(self, enabled):
+        # At startup the streams are balanced over `workers` processes;
+        # streams added by a reload get one extra process so running pools
+        # are left alone (the next restart rebalances everything).
+        n_workers = int(self.__pool_cfg.get("workers", 0)) or os.cpu_count() or 1
+        if self.__pool_count:
+            n_workers = 1
+        measured = self.__cost_tracker.costs() if self.__cost_tracker else {}
+        costs = estimate_costs(enabled, measured, self.__fps)
+        assignment = assign_streams(enabled, n_workers, costs)
+
+        for stream_cfgs in assignment:
+            name = f"pool-{self.__pool_count}"
+            self.__pool_count += 1
+            control = self.__mp.Queue()
+            p = self.__mp.Process(
+                target=stream_pool_entry,
+                args=(name, stream_cfgs, self.__proxy, self.__feedbacks, self.__fps,
+                      self.__encoder_cfg, self.__metrics_cfg, self.__feedback_endpoint, self.__ready_queue,
+                      control, self.__update_queue),
+            )
+            p.daemon = False
+            p.start()
+
+            self.__processes[name] = p
+            self.__controls[name] = control
+            for cfg in stream_cfgs:
+                self.__pool_of[cfg["id"]] = name
+            load = sum(costs[cfg["id"]] for cfg in stream_cfgs)
+            print(f"[{name}] Started pool worker PID={p.pid} streams={[c['id'] for c in stream_cfgs]} load={load:.1f}")
+
+    def wait_live(self, timeout=None) -> bool:
+        """Block until every enabled stream has delivered its first frame."""
+        return self.__all_live.wait(timeout)
+
+    def __watch_startup(self, stream_ids, started_at):
+        with self.__live_lock:
+            for sid in stream_ids:
+                self.__pending_live[sid] = started_at
+            self.__all_live.clear()
+            if self.__watcher is None:
+                self.__watcher = threading.Thread(target=self.__watch_loop, name="startup-watch", daemon=True)
+                self.__watcher.start()
+
+    def __watch_loop(self):
+        # Workers put their stream id on the first captured frame; the time is
+        # taken here so every figure shares the manager's clock.
+        with self.__live_lock:
+            batch_start = min(self.__pending_live.values(), default=time.monotonic())
+        live = 0
+        slowest = None
+        warned = set()
+        while not self.__stop_event.is_set():
+            try:
+                stream_id = self.__ready_queue.get(timeout=0.5)
+            except queue.Empty:
+                stream_id = None
+            except (EOFError, OSError):
+                return
+
+            now = time.monotonic()
+            with self.__live_lock:
+                started = self.__pending_live.pop(stream_id, None)
+                if started is not None:
+                    live += 1
+                    slowest = stream_id
+                    print(f"[{stream_id}] Live after {now - started:.2f}s")
+
+                late = sorted(sid for sid, t in self.__pending_live.items()
+                              if self.__startup_timeout and now - t > self.__startup_timeout and sid not in warned)
+                if late:
+                    warned.update(late)
+                    print(f"[StreamManager] Still waiting after {self.__startup_timeout:.0f}s for: {late}")
+
+                if not self.__pending_live:
+                    print(f"[StreamManager] All {live} stream(s) live in {now - batch_start:.2f}s (slowest: {slowest})")
+                    self.__all_live.set()
+                    # A later reload starts a new watcher.
+                    self.__watcher = None
+                    return
+
+    def get_pids(self):
+        return {name: proc.pid for name, proc in self.__processes.items() if proc.is_alive()}
+
     def stop(self):
         print("Stopping StreamManager...")
+        self.__stop_event.set()
+        watcher = self.__watcher
+        if watcher is not None:
+            watcher.join(timeout=1)
 
         for sid, proc in self.__processes.items():
             if proc.is_alive():
@@ -36,4 +322,7 @@ class StreamManager:
                 proc.terminate()
                 proc.join(timeout=3)
 
+        if self.__cost_tracker:
+            self.__cost_tracker.stop()
+
         print("All workers stopped")
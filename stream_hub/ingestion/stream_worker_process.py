@@ -1,21 +1,130 @@
 # stream_hub/ingestion/stream_worker_process.py
-from datetime import datetime
-from typing import Dict
+from threading import Event, Thread
+from typing import Any, Dict, List, Optional, Tuple
 import logging
 import os
 import ctypes
+import queue
+import signal
 import time
 
-from stream_hub.ingestion.capture_worker import CaptureWorker
+from stream_hub.ingestion.capture_worker import CaptureWorker, EncodedPacket
+from stream_hub.ingestion.change_detector import ChangeDetector
 from stream_hub.ingestion.frame_encoder import FrameEncoder
+from stream_hub.ingestion.frame_pacer import FramePacer
+from stream_hub.ingestion.jpeg_backends import SCALES
+from stream_hub.ingestion.rate_controller import RateController
+from stream_hub.ingestion.roi import RoiExtractor
 from stream_hub.network.zmq_handler import ZmqHandler
+from stream_hub.ingestion.renditions import parse_renditions
+from stream_hub.ingestion.shm_ring import SharedFrameRing
+from stream_hub.ingestion.tensor_stage import TensorSpec, parse_tensors
+from stream_hub.network.wire import (
+    encode_trace, frame_topic, roi_topic, shm_topic, stats_topic, tensor_topic, video_topic,
+)
 from stream_hub.utils.logger import setup_logger
+from stream_hub.utils.metrics import StreamMetrics
 
 
-def stream_worker_entry(stream_cfg, proxy_endpoint: str, feedbacks: Dict, default_fps: int):
+# Config keys whose change needs the capture reopened (still in the same process).
+REOPEN_KEYS = ("source", "capture", "passthrough")
+
+
+def _control_loop(control_queue, workers: Dict, stop_event: Event):
+    # StreamManager → process messages: ("update", stream_id, cfg, update_id) and ("remove", stream_id).
+    while not stop_event.is_set():
+        try:
+            message = control_queue.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        except (EOFError, OSError):
+            return
+
+        op, stream_id = message[0], message[1]
+        worker = workers.get(stream_id)
+        if worker is None:
+            print(f"[control] Unknown stream '{stream_id}' for '{op}'")
+        elif op == "update":
+            worker.update_config(message[2], message[3])
+        elif op == "remove":
+            print(f"[{stream_id}] Removed by config reload")
+            worker.stop()
+
+
+def stream_worker_entry(stream_cfg, proxy_endpoint: str, feedbacks: Dict, default_fps: int,
+                        encoder_cfg: Dict = None, metrics_cfg: Dict = None, feedback_endpoint: str = None,
+                        ready_queue=None, control_queue=None, update_queue=None):
     setup_logger(f"worker-{stream_cfg['id']}", level=logging.INFO)
-    worker = StreamProcessWorker(stream_cfg, proxy_endpoint, feedbacks, default_fps)
-    worker.run()
+    worker = StreamProcessWorker(
+        stream_cfg, proxy_endpoint, feedbacks, default_fps, encoder_cfg=encoder_cfg, metrics_cfg=metrics_cfg,
+        feedback_endpoint=feedback_endpoint, ready_queue=ready_queue, update_queue=update_queue,
+    )
+    # StreamManager.stop() terminates workers; leave the loop through `finally`
+    # so shared-memory rings are unlinked instead of leaked.
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    stop_event = Event()
+    if control_queue is not None:
+        Thread(target=_control_loop, args=(control_queue, {stream_cfg["id"]: worker}, stop_event),
+               name="control", daemon=True).start()
+    try:
+        worker.run()
+    finally:
+        stop_event.set()
+
+
+def stream_pool_entry(pool_name: str, stream_cfgs: List[Dict], proxy_endpoint: str, feedbacks: Dict,
+                      default_fps: int, encoder_cfg: Dict = None, metrics_cfg: Dict = None,
+                      feedback_endpoint: str = None, ready_queue=None, control_queue=None, update_queue=None):
+    # Several cameras in one process: one interpreter, one ZMQ context, one
+    # XPUB and one feedback SUB connection shared by all capture threads
+    # (one handler per proxy shard the hosted streams publish through).
+    setup_logger(pool_name, level=logging.INFO)
+    by_proxy: Dict[str, List[Dict]] = {}
+    for cfg in stream_cfgs:
+        by_proxy.setdefault(cfg.get("proxy_endpoint", proxy_endpoint), []).append(cfg)
+
+    handlers = {}
+    for endpoint, cfgs in by_proxy.items():
+        handlers[endpoint] = ZmqHandler(endpoint, feedbacks or {}, feedback_endpoint)
+        handlers[endpoint].initialize_runtime([cfg["id"] for cfg in cfgs])
+
+    workers = [
+        StreamProcessWorker(
+            cfg, proxy_endpoint, feedbacks, default_fps,
+            encoder_cfg=encoder_cfg, metrics_cfg=metrics_cfg,
+            zmq_handler=handlers[cfg.get("proxy_endpoint", proxy_endpoint)],
+            ready_queue=ready_queue,
+            update_queue=update_queue,
+        )
+        for cfg in stream_cfgs
+    ]
+    stop_event = Event()
+
+    def handle_sig(signum, frame):
+        for worker in workers:
+            worker.stop()
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, handle_sig)
+    threads = [Thread(target=w.run, name=f"stream-{cfg['id']}", daemon=True) for w, cfg in zip(workers, stream_cfgs)]
+    for t in threads:
+        t.start()
+    if control_queue is not None:
+        by_id = {cfg["id"]: worker for cfg, worker in zip(stream_cfgs, workers)}
+        Thread(target=_control_loop, args=(control_queue, by_id, stop_event), name="control", daemon=True).start()
+    print(f"[{pool_name}] Hosting {len(workers)} stream(s): {[cfg['id'] for cfg in stream_cfgs]}")
+
+    try:
+        while not stop_event.is_set() and any(t.is_alive() for t in threads):
+            stop_event.wait(0.5)
+    except KeyboardInterrupt:
+        handle_sig(None, None)
+    finally:
+        stop_event.set()
+        for t in threads:
+            t.join(timeout=3)
+        for handler in handlers.values():
+            handler.close()
 
 
 class StreamProcessWorker:
@@ -26,23 +135,57 @@ class StreamProcessWorker:
         feedbacks: Dict,
         default_fps: int = 15,
         reconnect_delay: int = 5,
+        encoder_cfg: Dict = None,
+        metrics_cfg: Dict = None,
+        zmq_handler: Optional[ZmqHandler] = None,
+        feedback_endpoint: Optional[str] = None,
+        ready_queue=None,
+        update_queue=None,
     ):
         self.__logger = logging.getLogger(__name__)
-        self.__proxy_endpoint = proxy_endpoint
+        # Streams assigned to a proxy shard carry that shard's endpoint.
+        self.__proxy_endpoint = stream_cfg.get("proxy_endpoint", proxy_endpoint)
         self.__feedbacks_cfg = feedbacks or {}
+        self.__feedback_endpoint = feedback_endpoint
+        # StreamManager's readiness queue: the stream id is put once, on the first frame.
+        self.__ready_queue = ready_queue
+        # StreamManager's update queue: (stream_id, update_id, accepted) for each applied config update.
+        self.__update_queue = update_queue
 
         self.__reconnect_delay = reconnect_delay
-        self.__fps = int(stream_cfg.get("fps", default_fps))
+        self.__default_fps = default_fps
         self.__stream_id = stream_cfg["id"]
-        self.__source = stream_cfg["source"]
-        self.__zmq_handler: ZmqHandler | None = None
+        self.__video_topic = video_topic(self.__stream_id)
+        self.__video_sent_id = -1
+        self.__video_warned = False
+        self.__zmq_handler: Optional[ZmqHandler] = zmq_handler
+        self.__stop_event = Event()
+        self.__events_version = -1
+        self.__events: Dict = {}
+        self.__encoder = FrameEncoder.from_config(encoder_cfg)
 
-        self.__stats = {
-            "frames_processed": 0,
-            "frames_failed": 0,
-            "reconnects": 0,
-            "start_time": datetime.now(),
-        }
+        shm_cfg = stream_cfg.get("shm") or {}
+        self.__shm_enabled = bool(shm_cfg.get("enabled", False))
+        self.__shm_slots = int(shm_cfg.get("slots", 4))
+        self.__shm_topic = shm_topic(self.__stream_id)
+        self.__shm_ring: Optional[SharedFrameRing] = None
+        self.__shm_generation = 0
+        # One ring per shared-memory tensor, created on first use.
+        self.__tensor_rings: Dict[str, SharedFrameRing] = {}
+
+        self.__roi_topic = roi_topic(self.__stream_id)
+        self.__stream_cfg: Dict = {}
+        self.__pending_cfg: Optional[Tuple[Dict, Optional[int]]] = None
+        self.__configure(stream_cfg)
+
+        metrics_cfg = metrics_cfg or {}
+        self.__metrics = StreamMetrics(self.__stream_id, sample_every=metrics_cfg.get("sample_every", 1))
+        self.__stats_interval = float(metrics_cfg.get("interval_sec", 5))
+        self.__stats_topic = stats_topic(self.__stream_id)
+        self.__next_stats = 0.0
+        # End-to-end tracing: 1 in trace_every published frames carries trace points.
+        self.__trace_every = int(metrics_cfg.get("trace_every", 0) or 0)
+        self.__trace_ticks = 0
 
     def run(self):
         print(f"[{self.__stream_id}] Worker started")
@@ -50,96 +193,483 @@ class StreamProcessWorker:
         if os.name == "nt":  # Windows
             ctypes.WinDLL("winmm").timeBeginPeriod(1)
 
-        self.__init_zmq_handler()
+        if self.__zmq_handler is None:
+            self.__init_zmq_handler()
 
         worker = None
-        frame_interval = 1.0 / self.__fps
+        pacer = FramePacer(self.__fps)
+        last_frame_id = 0
 
         try:
-            while True:
+            while not self.__stop_event.is_set():
                 try:
+                    if self.__pending_cfg is not None:
+                        worker = self.__reconfigure(worker, pacer)
+
                     if worker is None:
                         worker = CaptureWorker(
                             self.__stream_id,
                             self.__source,
-                            fps=self.__fps,
+                            fps=self.__rate.fps,
+                            capture_cfg=self.__capture_cfg,
+                            metrics=self.__metrics,
+                            passthrough=self.__passthrough,
                         )
+                        last_frame_id = 0
+                        self.__video_sent_id = -1
+                        self.__video_warned = False
+                        pacer.reset()
+                        self.__change.reset()
                         print(f"[{self.__stream_id}] CaptureWorker started")
 
-                    t0 = time.perf_counter()
-
-                    frame, frame_id, ts = worker.get_frame()
+                    frame, frame_id, ts = worker.wait_frame(last_frame_id, timeout=1.0)
+                    self.__publish_stats()
 
                     if frame is None:
-                        self.__stats["frames_failed"] += 1
-                        time.sleep(0.02)
+                        self.__metrics.inc("capture_timeouts")
                         continue
+                    if self.__ready_queue is not None:
+                        self.__report_live()
 
-                    jpeg = FrameEncoder.encode(frame, 85)
-                    if jpeg is None:
-                        self.__stats["frames_failed"] += 1
+                    if isinstance(frame, EncodedPacket) and not frame.is_jpeg:
+                        # H.264/H.265: every access unit is forwarded, unpaced.
+                        if not self.__video_warned:
+                            self.__warn_video_only(frame.codec)
+                        last_frame_id = self.__publish_video(worker.packets_since(last_frame_id), last_frame_id)
                         continue
+                    last_frame_id = frame_id
 
-                    events = self.__get_events_feedback(self.__stream_id)
-
-                    metadata = {
-                        "stream_id": self.__stream_id,
-                        "frame_id": frame_id,
-                        "timestamp": ts,
-                        "source": self.__source,
-                        "events": events,
-                        "frame_size": len(jpeg),
-                    }
+                    # Pace on capture timestamps: a camera faster than the
+                    # output fps has its surplus frames dropped here.
+                    if not pacer.due(ts):
+                        self.__metrics.inc("frames_paced_out")
+                        continue
 
-                    self.__zmq_handler.publish(metadata, jpeg)
-                    self.__stats["frames_processed"] += 1
+                    self.__process_frame(frame, frame_id, ts)
 
-                    elapsed = time.perf_counter() - t0
-                    remain = frame_interval - elapsed
-                    if remain > 0:
-                        time.sleep(remain)
+                    if self.__rate.enabled and self.__rate.update():
+                        print(f"[{self.__stream_id}] Adaptive fps → {self.__rate.fps}")
+                        pacer.set_fps(self.__rate.fps)
+                        worker.set_fps(self.__rate.fps)
 
                 except Exception as e:
                     print(f"[{self.__stream_id}] Worker loop error: {e}")
 
-                    self.__stats["frames_failed"] += 1
+                    self.__metrics.inc("frames_failed")
+                    self.__metrics.inc("reconnects")
                     if worker:
                         worker.close()
                         worker = None
-                    time.sleep(self.__reconnect_delay)
+                    self.__stop_event.wait(self.__reconnect_delay)
 
         finally:
             if worker:
                 worker.close()
-            print(f"[{self.__stream_id}] Worker shutting down → {self.__stats}")
+            if self.__shm_ring:
+                self.__shm_ring.close()
+            for ring in self.__tensor_rings.values():
+                ring.close()
+            print(f"[{self.__stream_id}] Worker shutting down → {self.__metrics.counters}")
             
             if os.name == "nt":
                 ctypes.WinDLL("winmm").timeEndPeriod(1)
 
 
-    def __get_events_feedback(self, stream_id: str) -> Dict:
-        packet = self.__zmq_handler.get_feedback(stream_id)
-        result = {}
-        for name in self.__feedbacks_cfg.keys():
-            info = packet.get(name, {}) or {}
-            if not info:
-                result[name] = {
-                    "data": None,
-                    "target": None,
-                    "timestamp": None,
-                }
-                continue
-            elif info["ts"] is None:
+    def stop(self):
+        self.__stop_event.set()
+
+    def update_config(self, stream_cfg: Dict, update_id: Optional[int] = None):
+        # Called from the control thread; applied by run() between two frames.
+        self.__pending_cfg = (stream_cfg, update_id)
+
+    def __configure(self, stream_cfg: Dict):
+        # Everything here can change while the worker runs (see update_config);
+        # identity, shm and the proxy endpoint are fixed for the worker's lifetime.
+        self.__stream_cfg = stream_cfg
+        self.__fps = int(stream_cfg.get("fps", self.__default_fps))
+        self.__source = stream_cfg["source"]
+        self.__capture_cfg = stream_cfg.get("capture") or {}
+        # Forward the camera's compressed packets instead of decoding them.
+        self.__passthrough = bool(stream_cfg.get("passthrough", False))
+        # Outputs that need decoded pixels; an H.264/H.265 passthrough source
+        # cannot produce them (see __warn_video_only).
+        self.__raw_outputs = [
+            key for key, configured in (
+                ("renditions", "renditions" in stream_cfg),
+                ("shm", self.__shm_enabled),
+                ("roi", bool((stream_cfg.get("roi") or {}).get("enabled", False))),
+                ("tensors", bool(stream_cfg.get("tensors"))),
+                ("change_detection", bool((stream_cfg.get("change_detection") or {}).get("enabled", False))),
+            ) if configured
+        ]
+        if self.__passthrough and self.__raw_outputs:
+            print(f"[{self.__stream_id}] passthrough with {self.__raw_outputs}: these work for MJPEG "
+                  f"sources only; H.264/H.265 sources publish video/{self.__stream_id}/ alone")
+        self.__renditions = [
+            (rendition, frame_topic(self.__stream_id, rendition.name))
+            for rendition in parse_renditions(stream_cfg.get("renditions"))
+        ]
+        self.__change = ChangeDetector(stream_cfg.get("change_detection"))
+        self.__roi = RoiExtractor(stream_cfg.get("roi"))
+        # Model inputs (resize/letterbox, colour, dtype, normalisation) built
+        # once here instead of in every consumer.
+        self.__tensors = [
+            (spec, tensor_topic(self.__stream_id, spec.name))
+            for spec in parse_tensors(stream_cfg.get("tensors"))
+        ]
+        self.__rate = RateController(
+            stream_cfg.get("adaptive"), self.__fps, max_quality=max(r.quality for r, _ in self.__renditions)
+        )
+
+    def __reconfigure(self, worker, pacer):
+        (stream_cfg, update_id), self.__pending_cfg = self.__pending_cfg, None
+        previous = self.__stream_cfg
+        try:
+            self.__configure(stream_cfg)
+        except Exception as e:
+            print(f"[{self.__stream_id}] Rejected config update: {e}")
+            self.__configure(previous)
+            self.__report_update(update_id, False)
+            return worker
+        self.__report_update(update_id, True)
+
+        changed = sorted(key for key in set(previous) | set(stream_cfg) if previous.get(key) != stream_cfg.get(key))
+        print(f"[{self.__stream_id}] Config updated in place: {changed}")
+        pacer.set_fps(self.__rate.fps)
+        if worker is not None and any(key in changed for key in REOPEN_KEYS):
+            # A new source or capture setup needs a fresh capture; the
+            # process, its sockets and its subscribers stay.
+            worker.close()
+            return None
+        if worker is not None:
+            worker.set_fps(self.__rate.fps)
+        return worker
+
+    def __process_frame(self, frame, frame_id, ts):
+        # A passthrough JPEG is only decoded for the outputs that need pixels,
+        # at the smallest libjpeg scale that still covers them.
+        packet = frame if isinstance(frame, EncodedPacket) else None
+        decoded: Dict[int, Any] = {}
+
+        wanted = [
+            (rendition, topic)
+            for rendition, topic in self.__renditions
+            if self.__zmq_handler.has_subscribers(topic)
+        ]
+        want_shm = self.__shm_enabled and self.__zmq_handler.has_subscribers(self.__shm_topic)
+        want_roi = self.__roi.enabled and self.__zmq_handler.has_subscribers(self.__roi_topic)
+        want_tensors = [
+            (spec, topic)
+            for spec, topic in self.__tensors
+            if self.__zmq_handler.has_subscribers(topic)
+        ]
+
+        # Nobody listens to this stream: skip the encode entirely.
+        if not (wanted or want_shm or want_roi or want_tensors):
+            self.__metrics.inc("frames_unsubscribed")
+            return
+
+        # Static scene: skip encode and publish, apart from a periodic keep-alive.
+        scene = None
+        if self.__change.enabled:
+            probe = frame if packet is None else self.__decode_packet(packet, decoded, 0)
+            scene = self.__change.check(probe, ts) if probe is not None else "changed"
+        if self.__change.enabled and scene is None:
+            self.__metrics.inc("frames_unchanged")
+            return
+
+        traced = False
+        if self.__trace_every:
+            self.__trace_ticks += 1
+            traced = self.__trace_ticks % self.__trace_every == 0
+        if traced:
+            # Anchor in-process points on the monotonic clock; only the
+            # capture → dequeue wait is measured in wall time.
+            trace_mono = time.perf_counter()
+            dequeue_ms = (time.time() - ts) * 1000
+
+        sampled = self.__metrics.sample()
+        t0 = time.perf_counter() if sampled else 0.0
+        events = self.__get_events_feedback(self.__stream_id)
+        if sampled:
+            self.__metrics.observe("feedback_merge", (time.perf_counter() - t0) * 1000)
+        metadata = {
+            "stream_id": self.__stream_id,
+            "frame_id": frame_id,
+            "timestamp": ts,
+            "source": self.__source,
+            "events": events,
+        }
+        if scene is not None:
+            metadata["keepalive"] = scene == "keepalive"
+
+        if packet is not None and (want_shm or want_roi):
+            frame = self.__decode_packet(packet, decoded, None)
+            if frame is None:
+                self.__metrics.inc("frames_failed")
+                want_shm = want_roi = False
+        if want_shm:
+            self.__publish_shm(frame, metadata)
+        if want_roi:
+            self.__publish_roi(frame, metadata)
+        for spec, topic in want_tensors:
+            # A passthrough JPEG only needs decoding down to the tensor's height.
+            source = frame if packet is None else self.__decode_packet(packet, decoded, spec.height)
+            if source is None:
+                self.__metrics.inc("frames_failed")
                 continue
-            
-            ts = info.get("ts")
-            result[name] = {
-                "data": info.get("data"),          
-                "target": info.get("target", []),   
+            self.__publish_tensor(spec, topic, source, metadata, sampled)
+
+        # The rate controller needs encode time on every frame, not just sampled ones.
+        timed = sampled or self.__rate.enabled or traced
+        for rendition, topic in wanted:
+            t0 = time.perf_counter() if timed else 0.0
+            if packet is not None and rendition.height is None and self.__rate.scale >= 1.0:
+                # The camera's own JPEG: no decode, no re-encode.
+                width, height, quality, jpeg = packet.width, packet.height, None, packet.data
+            else:
+                source = frame
+                if packet is not None:
+                    target = rendition.height or packet.height
+                    source = self.__decode_packet(packet, decoded, round(target * self.__rate.scale))
+                image = rendition.apply(source, self.__rate.scale) if source is not None else None
+                quality = self.__rate.quality(rendition.quality)
+                jpeg = self.__encoder.encode(image, quality) if image is not None else None
+                if jpeg is None:
+                    self.__metrics.inc("frames_failed")
+                    continue
+                height, width = image.shape[:2]
+
+            if timed:
+                t1 = time.perf_counter()
+            if sampled:
+                self.__metrics.observe("encode", (t1 - t0) * 1000)
+
+            trace = None
+            if traced:
+                trace = encode_trace(ts, (
+                    ("dequeue", dequeue_ms),
+                    ("encode_start", dequeue_ms + (t0 - trace_mono) * 1000),
+                    ("encode_end", dequeue_ms + (t1 - trace_mono) * 1000),
+                    ("publish", dequeue_ms + (time.perf_counter() - trace_mono) * 1000),
+                ))
+
+            sent = self.__zmq_handler.publish(
+                {
+                    **metadata,
+                    "rendition": rendition.name,
+                    "width": width,
+                    "height": height,
+                    "quality": quality,
+                    "frame_size": len(jpeg),
+                },
+                jpeg,
+                topic,
+                trace,
+            )
+            if sampled:
+                self.__metrics.observe("publish", (time.perf_counter() - t1) * 1000)
+            if not sent:
+                self.__metrics.inc("hwm_drops")
+            if self.__rate.enabled:
+                self.__rate.record(len(jpeg), (t1 - t0) * 1000, sent)
+
+        if self.__rate.enabled:
+            self.__rate.frame_done()
+        self.__metrics.inc("frames_published")
+        if traced:
+            self.__metrics.inc("frames_traced")
+
+    def __decode_packet(self, packet: EncodedPacket, decoded: Dict, height: Optional[int]):
+        # height None: full size; otherwise the largest scale whose output
+        # is still at least `height` rows tall (0 → smallest thumbnail).
+        scale = 1
+        if height is not None and packet.height:
+            scale = max((s for s in SCALES if packet.height // s >= height), default=1)
+        if scale not in decoded:
+            decoded[scale] = self.__encoder.decode(packet.data, scale)
+            self.__metrics.inc("passthrough_decodes")
+        return decoded[scale]
+
+    def __warn_video_only(self, codec: str):
+        # Known only once the capture is open: the codec decides what passthrough can serve.
+        self.__video_warned = True
+        ignored = self.__raw_outputs or ["renditions"]
+        print(f"[{self.__stream_id}] {codec} passthrough: no frame/ topics and no {ignored} for this stream, "
+              f"so sync groups and clips get no frames from it. Set passthrough: false to decode instead.")
+
+    def __publish_video(self, packets, last_frame_id: int) -> int:
+        # Returns the newest frame_id consumed; a packet that fails to send is
+        # dropped, not retried.
+        if not packets:
+            return last_frame_id
+        if not self.__zmq_handler.has_subscribers(self.__video_topic):
+            self.__metrics.inc("frames_unsubscribed", len(packets))
+            return packets[-1][1]
+
+        events = self.__get_events_feedback(self.__stream_id)
+        for packet, frame_id, ts in packets:
+            discontinuity = frame_id != self.__video_sent_id + 1
+            metadata = {
+                "stream_id": self.__stream_id,
+                "frame_id": frame_id,
                 "timestamp": ts,
+                "source": self.__source,
+                "events": events,
+                "codec": packet.codec,
+                "keyframe": packet.keyframe,
+                "width": packet.width,
+                "height": packet.height,
+                "frame_size": len(packet.data),
+                # Packets were lost before this one (queue overflow, HWM drop,
+                # no subscriber): decoders should wait for the next keyframe.
+                "discontinuity": discontinuity,
             }
-        return result
+            if packet.extradata and (packet.keyframe or discontinuity):
+                # SPS/PPS (hex) so a consumer joining mid-stream can set up its decoder.
+                metadata["extradata"] = packet.extradata.hex()
+            if self.__zmq_handler.publish(metadata, packet.data, self.__video_topic):
+                self.__video_sent_id = frame_id
+                self.__metrics.inc("frames_published")
+            else:
+                self.__metrics.inc("hwm_drops")
+        return packets[-1][1]
+
+    def __publish_shm(self, frame, metadata: Dict):
+        if self.__shm_ring is None or not self.__shm_ring.fits(frame):
+            # First frame or the camera changed resolution: size a fresh ring.
+            if self.__shm_ring is not None:
+                self.__shm_ring.close()
+            self.__shm_generation += 1
+            name = f"stream_hub_{self.__stream_id}_{os.getpid()}_{self.__shm_generation}"
+            self.__shm_ring = SharedFrameRing(name, self.__shm_slots, frame.nbytes)
+            print(f"[{self.__stream_id}] Shared-memory ring '{name}' ({self.__shm_slots} slots)")
+
+        slot, generation = self.__shm_ring.write(frame, metadata["frame_id"], metadata["timestamp"])
+        notification = {
+            **metadata,
+            "shm_name": self.__shm_ring.name,
+            "slot": slot,
+            "generation": generation,
+            "shape": list(frame.shape),
+            "dtype": str(frame.dtype),
+        }
+        if not self.__zmq_handler.publish(notification, b"", self.__shm_topic):
+            self.__metrics.inc("hwm_drops")
+
+    def __publish_tensor(self, spec: TensorSpec, topic: str, frame, metadata: Dict, sampled: bool):
+        t0 = time.perf_counter() if sampled else 0.0
+        tensor, transform = spec.apply(frame)
+        if sampled:
+            self.__metrics.observe("tensor", (time.perf_counter() - t0) * 1000)
+
+        header = {
+            **metadata,
+            "tensor": spec.name,
+            "shape": list(tensor.shape),
+            "dtype": tensor.dtype.name,
+            "layout": spec.layout,
+            "color": "rgb" if spec.rgb else "bgr",
+            "source_width": frame.shape[1],
+            "source_height": frame.shape[0],
+            "transform": transform,
+        }
+        payload = tensor
+        if spec.shm:
+            ring = self.__tensor_rings.get(spec.name)
+            if ring is None or not ring.fits(tensor):
+                if ring is not None:
+                    ring.close()
+                self.__shm_generation += 1
+                name = f"stream_hub_{self.__stream_id}_{spec.name}_{os.getpid()}_{self.__shm_generation}"
+                ring = self.__tensor_rings[spec.name] = SharedFrameRing(name, spec.slots, tensor.nbytes)
+                print(f"[{self.__stream_id}] Tensor ring '{name}' ({spec.slots} slots)")
+            slot, generation = ring.write(tensor, metadata["frame_id"], metadata["timestamp"])
+            header.update(shm_name=ring.name, slot=slot, generation=generation)
+            payload = b""
+
+        # The array itself is the payload frame: ZMQ sends it zero-copy.
+        if self.__zmq_handler.publish(header, payload, topic):
+            self.__metrics.inc("tensors_published")
+        else:
+            self.__metrics.inc("hwm_drops")
+
+    def __publish_roi(self, frame, metadata: Dict):
+        boxes = self.__roi.regions(metadata["events"], frame.shape, metadata["timestamp"])
+        background = self.__roi.background
+        if not boxes and background is None:
+            return
+
+        regions, payloads = [], []
+        for x1, y1, x2, y2 in boxes:
+            # Crops are views into the captured frame: no copy before encoding.
+            jpeg = self.__encoder.encode(frame[y1:y2, x1:x2], self.__roi.quality)
+            if jpeg is None:
+                continue
+            regions.append({"x": x1, "y": y1, "w": x2 - x1, "h": y2 - y1, "frame_size": len(jpeg)})
+            payloads.append(jpeg)
+
+        header = {
+            **metadata,
+            "width": frame.shape[1],
+            "height": frame.shape[0],
+            "quality": self.__roi.quality,
+            "regions": regions,
+            "background": None,
+        }
+        if background is not None:
+            image = background.apply(frame)
+            jpeg = self.__encoder.encode(image, background.quality)
+            if jpeg is not None:
+                header["background"] = {
+                    "width": image.shape[1],
+                    "height": image.shape[0],
+                    "quality": background.quality,
+                    "frame_size": len(jpeg),
+                }
+                payloads.append(jpeg)
+
+        if not self.__zmq_handler.publish_bundle(header, payloads, self.__roi_topic):
+            self.__metrics.inc("hwm_drops")
+        self.__metrics.inc("roi_regions", len(regions))
+
+    def __publish_stats(self):
+        now = time.monotonic()
+        if now < self.__next_stats:
+            return
+        self.__next_stats = now + self.__stats_interval
+
+        if self.__rate.enabled:
+            for name, value in self.__rate.state().items():
+                self.__metrics.set_gauge(name, value)
+        if self.__zmq_handler.has_subscribers(self.__stats_topic):
+            self.__zmq_handler.publish(self.__metrics.snapshot(), b"", self.__stats_topic)
+
+    def __get_events_feedback(self, stream_id: str) -> Dict:
+        # The handler hands out immutable snapshots; only look at the version
+        # so an unchanged feedback state costs nothing per frame.
+        version, events = self.__zmq_handler.get_feedback(stream_id)
+        if version != self.__events_version:
+            self.__events_version = version
+            self.__events = events
+        return self.__events
+
+    def __report_live(self):
+        try:
+            self.__ready_queue.put_nowait(self.__stream_id)
+        except Exception as e:
+            print(f"[{self.__stream_id}] Could not report readiness: {e}")
+        self.__ready_queue = None
+
+    def __report_update(self, update_id: Optional[int], accepted: bool):
+        # StreamManager only records a config once its worker has accepted it.
+        if self.__update_queue is None or update_id is None:
+            return
+        try:
+            self.__update_queue.put_nowait((self.__stream_id, update_id, accepted))
+        except Exception as e:
+            print(f"[{self.__stream_id}] Could not report config update: {e}")
 
     def __init_zmq_handler(self):
-        self.__zmq_handler = ZmqHandler(self.__proxy_endpoint, self.__feedbacks_cfg)
-        self.__zmq_handler.initialize_runtime()
+        self.__zmq_handler = ZmqHandler(self.__proxy_endpoint, self.__feedbacks_cfg, self.__feedback_endpoint)
+        self.__zmq_handler.initialize_runtime([self.__stream_id])
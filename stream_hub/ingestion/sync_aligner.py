@@ -0,0 +1,309 @@
+import zmq
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from stream_hub.ingestion.tensor_stage import tensor_from_message
+from stream_hub.network.wire import (
+    DEFAULT_RENDITION, batch_topic, bundle_topic, decode_message, frame_topic, tensor_topic,
+)
+from stream_hub.network.zmq_handler import ZmqHandler
+from stream_hub.utils.utils import endpoint_list
+
+LATE_POLICIES = ("drop", "partial")
+
+
+class SyncGroup:
+    def __init__(self, cfg: Dict[str, Any]):
+        self.group_id = cfg["id"]
+        self.members: List[str] = list(cfg.get("streams") or [])
+        if len(self.members) < 2:
+            raise ValueError(f"[sync:{self.group_id}] a sync group needs at least 2 streams")
+
+        self.rendition = cfg.get("rendition", DEFAULT_RENDITION)
+        self.tolerance = float(cfg.get("tolerance_ms", 20)) / 1000
+        self.max_wait = float(cfg.get("max_wait_ms", 100)) / 1000
+        self.late_policy = cfg.get("late_policy", "drop")
+        if self.late_policy not in LATE_POLICIES:
+            raise ValueError(f"[sync:{self.group_id}] unknown late_policy '{self.late_policy}'")
+
+        # With `tensor`, the members' model inputs are stacked into one
+        # (N, ...) array on batch/<group_id> instead of a JPEG bundle.
+        self.tensor: Optional[str] = cfg.get("tensor")
+        if self.tensor:
+            self.topic = batch_topic(self.group_id)
+            self.member_topics = {tensor_topic(m, self.tensor): m for m in self.members}
+        else:
+            self.topic = bundle_topic(self.group_id)
+            self.member_topics = {frame_topic(m, self.rendition): m for m in self.members}
+
+        buffer_size = int(cfg.get("buffer_size", 8))
+        # Per member: (timestamp, metadata, payload frame) ordered by arrival.
+        self.pending: Dict[str, deque] = {m: deque(maxlen=buffer_size) for m in self.members}
+        self.bundle_id = 0
+        self.stats = {
+            "bundles": 0,
+            "partial_bundles": 0,
+            "frames_unmatched": 0,
+            "frames_late": 0,
+            "tensors_rejected": 0,
+        }
+
+    def add(self, stream_id: str, ts: float, metadata: Dict[str, Any], payload):
+        self.pending[stream_id].append((ts, metadata, payload))
+
+    def clear(self):
+        for queue in self.pending.values():
+            queue.clear()
+
+    def align(self):
+        """Return the nearest-timestamp set within tolerance, or None."""
+        while all(self.pending[m] for m in self.members):
+            # The slowest member's newest frame is the latest instant every
+            # member can possibly cover.
+            anchor = min(self.pending[m][-1][0] for m in self.members)
+            chosen = {m: self.__nearest(m, anchor) for m in self.members}
+
+            skews = {m: chosen[m][0] - anchor for m in self.members}
+            if all(abs(skew) <= self.tolerance for skew in skews.values()):
+                self.__consume(chosen)
+                return anchor, chosen, []
+
+            # The oldest pending frame cannot be matched any more; drop it and retry.
+            oldest = min(self.members, key=lambda m: self.pending[m][0][0])
+            self.pending[oldest].popleft()
+            self.stats["frames_unmatched"] += 1
+        return None
+
+    def expire(self, now: float):
+        """Apply late_policy to frames that waited longer than max_wait."""
+        waiting = [m for m in self.members if self.pending[m]]
+        if not waiting or len(waiting) == len(self.members):
+            return None
+
+        oldest = min(self.pending[m][0][0] for m in waiting)
+        if now - oldest <= self.max_wait:
+            return None
+
+        if self.late_policy == "partial":
+            # Bundle the expired instant itself so no waiting frame is skipped.
+            anchor = oldest
+            chosen = {m: self.__nearest(m, anchor) for m in waiting}
+            chosen = {m: item for m, item in chosen.items() if abs(item[0] - anchor) <= self.tolerance}
+            self.__consume(chosen)
+            self.stats["partial_bundles"] += 1
+            return anchor, chosen, [m for m in self.members if m not in chosen]
+
+        for m in waiting:
+            self.stats["frames_late"] += len(self.pending[m])
+            self.pending[m].clear()
+        return None
+
+    def __nearest(self, stream_id: str, anchor: float):
+        return min(self.pending[stream_id], key=lambda item: abs(item[0] - anchor))
+
+    def __consume(self, chosen):
+        for m, item in chosen.items():
+            queue = self.pending[m]
+            while queue and queue[0][0] <= item[0]:
+                queue.popleft()
+
+
+class SyncAligner:
+    """Hub-side aligner publishing one bundle per sync group on ``bundle/<group_id>``
+    (or one stacked tensor batch on ``batch/<group_id>`` for ``tensor`` groups).
+
+    Member frames are only subscribed while someone subscribes to the group's
+    bundle topic, so an unused group costs the workers no extra encodes.
+    """
+
+    def __init__(self, groups_cfg: List[Dict[str, Any]], hub_endpoint: str, proxy_endpoint: str,
+                 poll_interval: float = 0.02):
+        self.__logger = logging.getLogger(__name__)
+        self.__groups = [SyncGroup(cfg) for cfg in groups_cfg or []]
+        self.__hub_endpoint = hub_endpoint
+        self.__proxy_endpoint = proxy_endpoint
+        self.__poll_ms = int(poll_interval * 1000)
+
+        self.__routes: Dict[str, List[SyncGroup]] = {}
+        for group in self.__groups:
+            for topic in group.member_topics:
+                self.__routes.setdefault(topic, []).append(group)
+
+        self.__stop_event = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if not self.__groups:
+            return
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout=2)
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        return {group.group_id: dict(group.stats) for group in self.__groups}
+
+    def __run(self):
+        publisher = ZmqHandler(self.__proxy_endpoint, None)
+        publisher.initialize_runtime()
+
+        sub = zmq.Context.instance().socket(zmq.SUB)
+        sub.setsockopt(zmq.RCVHWM, 64)
+        for endpoint in endpoint_list(self.__hub_endpoint):
+            sub.connect(endpoint)
+        subscribed = set()
+
+        poller = zmq.Poller()
+        poller.register(sub, zmq.POLLIN)
+        print(f"[Sync] Aligning {len(self.__groups)} group(s) from {self.__hub_endpoint}")
+
+        try:
+            while not self.__stop_event.is_set():
+                subscribed = self.__update_subscriptions(publisher, sub, subscribed)
+
+                if poller.poll(self.__poll_ms):
+                    while True:
+                        try:
+                            frames = sub.recv_multipart(zmq.NOBLOCK, copy=False)
+                        except zmq.Again:
+                            break
+                        self.__on_frame(publisher, frames)
+
+                now = time.time()
+                for group in self.__groups:
+                    result = group.expire(now)
+                    while result is not None:
+                        self.__publish(publisher, group, *result)
+                        result = group.expire(now)
+        except Exception as e:
+            print(f"[Sync] Error: {e}")
+        finally:
+            sub.close()
+            publisher.close()
+            print(f"[Sync] Stopped → {self.get_stats()}")
+
+    def __update_subscriptions(self, publisher: ZmqHandler, sub, subscribed: set) -> set:
+        wanted = set()
+        for group in self.__groups:
+            if publisher.has_subscribers(group.topic):
+                wanted.update(group.member_topics)
+            elif any(group.pending.values()):
+                group.clear()
+
+        for topic in wanted - subscribed:
+            sub.setsockopt_string(zmq.SUBSCRIBE, topic)
+        for topic in subscribed - wanted:
+            sub.setsockopt_string(zmq.UNSUBSCRIBE, topic)
+        return wanted
+
+    def __on_frame(self, publisher: ZmqHandler, frames):
+        try:
+            topic, metadata, _ = decode_message(frames)
+            ts = float(metadata["timestamp"])
+        except (TypeError, ValueError, KeyError) as e:
+            # One bad header must not stop the aligner thread.
+            print(f"[Sync] Dropping malformed frame: {e!r}")
+            return
+        if metadata.get("replayed"):
+            # A last-value-cache repeat, possibly seconds old.
+            return
+
+        for group in self.__routes.get(topic, []):
+            group.add(group.member_topics[topic], ts, metadata, frames[2])
+            result = group.align()
+            if result is not None:
+                self.__publish(publisher, group, *result)
+
+    def __publish(self, publisher: ZmqHandler, group: SyncGroup, anchor: float, chosen, missing):
+        if group.tensor:
+            self.__publish_batch(publisher, group, anchor, chosen, missing)
+            return
+
+        members = []
+        payloads = []
+        for stream_id in group.members:
+            if stream_id not in chosen:
+                continue
+            ts, metadata, payload = chosen[stream_id]
+            members.append({
+                "stream_id": stream_id,
+                "frame_id": metadata.get("frame_id"),
+                "timestamp": ts,
+                "skew_ms": round((ts - anchor) * 1000, 3),
+                "frame_size": metadata.get("frame_size"),
+                "events": metadata.get("events"),
+            })
+            payloads.append(payload)
+
+        group.bundle_id += 1
+        group.stats["bundles"] += 1
+        bundle = {
+            "group_id": group.group_id,
+            "bundle_id": group.bundle_id,
+            "timestamp": anchor,
+            "rendition": group.rendition,
+            "members": members,
+            "missing": missing,
+            "max_skew_ms": max(abs(m["skew_ms"]) for m in members),
+            "tolerance_ms": group.tolerance * 1000,
+        }
+        publisher.publish_bundle(bundle, payloads, group.topic)
+
+    def __publish_batch(self, publisher: ZmqHandler, group: SyncGroup, anchor: float, chosen, missing):
+        # The first member fixes shape and dtype; a member that differs (other
+        # tensor config) or went to shared memory (empty payload) counts as missing.
+        members, arrays = [], []
+        missing = list(missing)
+        for stream_id in group.members:
+            if stream_id not in chosen:
+                continue
+            ts, metadata, payload = chosen[stream_id]
+            expected = (members[0]["shape"], members[0]["dtype"]) if members else None
+            if len(payload) == 0 or (expected and (metadata.get("shape"), metadata.get("dtype")) != expected):
+                group.stats["tensors_rejected"] += 1
+                missing.append(stream_id)
+                continue
+            members.append({
+                "stream_id": stream_id,
+                "frame_id": metadata.get("frame_id"),
+                "timestamp": ts,
+                "skew_ms": round((ts - anchor) * 1000, 3),
+                "shape": metadata.get("shape"),
+                "dtype": metadata.get("dtype"),
+                "source_width": metadata.get("source_width"),
+                "source_height": metadata.get("source_height"),
+                "transform": metadata.get("transform"),
+                "events": metadata.get("events"),
+            })
+            arrays.append(tensor_from_message(metadata, payload))
+        if not arrays:
+            return
+
+        # One copy per member into a single contiguous buffer, sent zero-copy.
+        batch = np.empty((len(arrays), *arrays[0].shape), dtype=arrays[0].dtype)
+        for i, array in enumerate(arrays):
+            batch[i] = array
+
+        group.bundle_id += 1
+        group.stats["bundles"] += 1
+        header = {
+            "group_id": group.group_id,
+            "bundle_id": group.bundle_id,
+            "timestamp": anchor,
+            "tensor": group.tensor,
+            "shape": list(batch.shape),
+            "dtype": batch.dtype.name,
+            "members": [{k: v for k, v in m.items() if k not in ("shape", "dtype")} for m in members],
+            "missing": missing,
+            "max_skew_ms": max(abs(m["skew_ms"]) for m in members),
+            "tolerance_ms": group.tolerance * 1000,
+        }
+        publisher.publish(header, batch, group.topic)
@@ -0,0 +1,174 @@
+import re
+import time
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+
+# Local sources for benchmarks and tests, so the hub can be driven without
+# RTSP cameras:
+#   synthetic://1280x720@30              generated frames at a real-time pace
+#   synthetic://1920x1080@25?static=1    a still scene (no moving content)
+#   loop:///path/to/clip.mp4             a local file replayed forever at its own fps
+SYNTHETIC_SCHEME = "synthetic://"
+LOOP_SCHEME = "loop://"
+
+_SIZE = re.compile(r"^(?P<w>\d+)x(?P<h>\d+)(?:@(?P<fps>\d+(?:\.\d+)?))?$")
+
+
+class _RealtimeClock:
+    def __init__(self, fps: float):
+        self.__interval = 1.0 / fps if fps > 0 else 0.0
+        self.__next = None
+
+    def wait(self):
+        now = time.perf_counter()
+        if self.__next is None or now - self.__next > 1.0:
+            self.__next = now
+        delay = self.__next - now
+        if delay > 0:
+            time.sleep(delay)
+        self.__next += self.__interval
+
+
+class SyntheticCapture:
+    """Minimal ``cv2.VideoCapture`` look-alike producing generated frames."""
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        match = _SIZE.match(parsed.netloc or parsed.path.lstrip("/"))
+        if match is None:
+            raise ValueError(f"Invalid synthetic source '{url}', expected synthetic://WxH@FPS")
+
+        self.__width = int(match["w"])
+        self.__height = int(match["h"])
+        self.__fps = float(match["fps"] or 30)
+        self.__static = parse_qs(parsed.query).get("static", ["0"])[0] not in ("0", "false")
+
+        self.__clock = _RealtimeClock(self.__fps)
+        self.__index = 0
+        self.__grabbed = False
+        self.__opened = True
+
+        x = np.linspace(0, 255, self.__width, dtype=np.uint8)
+        y = np.linspace(0, 255, self.__height, dtype=np.uint8)[:, None]
+        self.__background = np.dstack([
+            np.broadcast_to(x, (self.__height, self.__width)),
+            np.broadcast_to(y, (self.__height, self.__width)),
+            np.full((self.__height, self.__width), 96, np.uint8),
+        ])
+
+    def isOpened(self) -> bool:
+        return self.__opened
+
+    def open(self, *_args, **_kwargs) -> bool:
+        self.__opened = True
+        return True
+
+    def release(self):
+        self.__opened = False
+
+    def set(self, _prop, _value) -> bool:
+        return True
+
+    def get(self, prop) -> float:
+        if prop == cv2.CAP_PROP_FPS:
+            return self.__fps
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.__width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.__height)
+        return 0.0
+
+    def grab(self) -> bool:
+        if not self.__opened:
+            return False
+        self.__clock.wait()
+        self.__index += 1
+        self.__grabbed = True
+        return True
+
+    def retrieve(self, image=None, flag: int = 0):
+        # Only the frame itself (flag 0) exists; there is no codec extradata.
+        if flag or not self.__grabbed:
+            return False, None
+        self.__grabbed = False
+        return True, self.__render()
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def __render(self) -> np.ndarray:
+        frame = self.__background.copy()
+        if not self.__static:
+            bar = max(8, self.__width // 32)
+            x = (self.__index * bar // 2) % max(1, self.__width - bar)
+            frame[:, x:x + bar] = 255
+            cv2.putText(frame, str(self.__index), (16, max(32, self.__height // 8)),
+                        cv2.FONT_HERSHEY_SIMPLEX, max(0.5, self.__height / 360), (0, 0, 0), 2)
+        return frame
+
+
+class LoopedFileCapture:
+    """Replays a local video file forever, paced at the file's own frame rate."""
+
+    def __init__(self, url: str):
+        self.__path = url[len(LOOP_SCHEME):]
+        self.__cap = cv2.VideoCapture(self.__path, cv2.CAP_FFMPEG)
+        fps = self.__cap.get(cv2.CAP_PROP_FPS) or 30
+        self.__clock = _RealtimeClock(fps)
+        # Properties set by the caller (e.g. CAP_PROP_FORMAT for passthrough),
+        # replayed when the file has to be reopened to loop.
+        self.__props = {}
+
+    def isOpened(self) -> bool:
+        return self.__cap.isOpened()
+
+    def open(self, *_args, **_kwargs) -> bool:
+        return self.__cap.open(self.__path, cv2.CAP_FFMPEG)
+
+    def release(self):
+        self.__cap.release()
+
+    def set(self, prop, value) -> bool:
+        ok = self.__cap.set(prop, value)
+        if ok:
+            self.__props[prop] = value
+        return ok
+
+    def get(self, prop) -> float:
+        return self.__cap.get(prop)
+
+    def grab(self) -> bool:
+        self.__clock.wait()
+        if self.__cap.grab():
+            return True
+        # End of file: rewind and keep going. Raw elementary streams (.h264,
+        # .hevc) cannot seek, so those are reopened with the same settings.
+        if self.__cap.set(cv2.CAP_PROP_POS_FRAMES, 0) and self.__cap.grab():
+            return True
+        self.__cap.release()
+        self.__cap = cv2.VideoCapture(self.__path, cv2.CAP_FFMPEG)
+        for prop, value in self.__props.items():
+            self.__cap.set(prop, value)
+        return self.__cap.grab()
+
+    def retrieve(self, image=None, flag: int = 0):
+        # flag selects a stream index, e.g. CAP_PROP_CODEC_EXTRADATA_INDEX in passthrough.
+        return self.__cap.retrieve(image, flag)
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+
+def open_local_source(url: str) -> Optional[object]:
+    if url.startswith(SYNTHETIC_SCHEME):
+        return SyntheticCapture(url)
+    if url.startswith(LOOP_SCHEME):
+        return LoopedFileCapture(url)
+    return None
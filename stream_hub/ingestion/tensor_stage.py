@@ -0,0 +1,109 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+RESIZE_MODES = ("stretch", "letterbox")
+LAYOUTS = ("hwc", "chw")
+DTYPES = ("uint8", "float16", "float32")
+
+
+class TensorSpec:
+    """One model input produced from every published frame.
+
+    ``resize`` → colour conversion → ``(pixel * scale - mean) / std`` in
+    ``dtype`` → ``layout``. The result is a C-contiguous array that can be
+    sent as a single zero-copy ZMQ frame or written to a shared-memory ring.
+    """
+
+    def __init__(self, cfg: Dict[str, Any]):
+        self.name = cfg.get("name") or f"{cfg.get('width')}x{cfg.get('height')}"
+        self.width = int(cfg["width"])
+        self.height = int(cfg["height"])
+        self.resize = cfg.get("resize", "letterbox")
+        self.pad_value = int(cfg.get("pad_value", 114))
+        self.rgb = cfg.get("color", "rgb") == "rgb"
+        self.dtype = np.dtype(cfg.get("dtype", "float32"))
+        self.layout = cfg.get("layout", "chw")
+        self.shm = bool(cfg.get("shm", False))
+        self.slots = int(cfg.get("slots", 4))
+
+        if self.resize not in RESIZE_MODES:
+            raise ValueError(f"Tensor '{self.name}': unknown resize '{self.resize}', expected one of {RESIZE_MODES}")
+        if self.layout not in LAYOUTS:
+            raise ValueError(f"Tensor '{self.name}': unknown layout '{self.layout}', expected one of {LAYOUTS}")
+        if self.dtype.name not in DTYPES:
+            raise ValueError(f"Tensor '{self.name}': unsupported dtype '{self.dtype}', expected one of {DTYPES}")
+        normalisation = [key for key in ("scale", "mean", "std") if key in cfg]
+        if self.dtype == np.uint8 and normalisation:
+            # uint8 tensors are raw pixels; normalising them would need a float dtype.
+            raise ValueError(f"Tensor '{self.name}': {normalisation} need a float dtype, not uint8")
+
+        # (x * scale - mean) / std folded into one multiply-add per channel.
+        scale = float(cfg.get("scale", 1 / 255 if self.dtype.kind == "f" else 1))
+        mean = np.asarray(cfg.get("mean", [0.0, 0.0, 0.0]), dtype=np.float32)
+        std = np.asarray(cfg.get("std", [1.0, 1.0, 1.0]), dtype=np.float32)
+        self.__gain = (scale / std).astype(np.float32)
+        self.__bias = (-mean / std).astype(np.float32)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        if self.layout == "chw":
+            return 3, self.height, self.width
+        return self.height, self.width, 3
+
+    def apply(self, frame: np.ndarray) -> Tuple[np.ndarray, Dict[str, float]]:
+        """Return the tensor and the transform mapping tensor pixels back to the frame:
+        ``x_frame = (x_tensor - pad_x) / scale_x`` (same for y)."""
+        image, transform = self.__resize(frame)
+        if self.rgb:
+            # After the resize: converts the model-sized image, not the camera frame.
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+        if self.layout == "chw":
+            image = image.transpose(2, 0, 1)
+            gain, bias = self.__gain[:, None, None], self.__bias[:, None, None]
+        else:
+            gain, bias = self.__gain, self.__bias
+
+        if self.dtype == np.uint8:
+            return np.ascontiguousarray(image), transform
+
+        # A fresh array per frame: the previous one may still be queued in ZMQ.
+        tensor = np.empty(image.shape, dtype=np.float32)
+        np.multiply(image, gain, out=tensor)
+        tensor += bias
+        if self.dtype != np.float32:
+            tensor = tensor.astype(self.dtype)
+        return tensor, transform
+
+    def __resize(self, frame: np.ndarray):
+        h, w = frame.shape[:2]
+        if self.resize == "stretch":
+            image = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_LINEAR)
+            return image, {"scale_x": self.width / w, "scale_y": self.height / h, "pad_x": 0, "pad_y": 0}
+
+        scale = min(self.width / w, self.height / h)
+        new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+        pad_x, pad_y = (self.width - new_w) // 2, (self.height - new_h) // 2
+        image = np.full((self.height, self.width, 3), self.pad_value, dtype=np.uint8)
+        image[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+            frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+        )
+        return image, {"scale_x": scale, "scale_y": scale, "pad_x": pad_x, "pad_y": pad_y}
+
+    def __repr__(self):
+        return f"TensorSpec({self.name}: {self.resize} {self.width}x{self.height} {self.dtype.name} {self.layout})"
+
+
+def parse_tensors(specs: Optional[Iterable[Dict[str, Any]]]) -> List[TensorSpec]:
+    tensors = [TensorSpec(spec) for spec in specs or []]
+    names = [tensor.name for tensor in tensors]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate tensor names: {names}")
+    return tensors
+
+
+def tensor_from_message(metadata: Dict[str, Any], payload) -> np.ndarray:
+    """View a ``tensor/`` or ``batch/`` payload as an array (no copy)."""
+    return np.frombuffer(payload, dtype=np.dtype(metadata["dtype"])).reshape(metadata["shape"])
@@ -2,15 +2,38 @@
 
 from argparse import ArgumentParser
 import multiprocessing
+import os
 import threading
 import logging
 import signal
 import time
 
+from stream_hub.ingestion.clip_buffer import ClipServer
 from stream_hub.ingestion.stream_manager import StreamManager
+from stream_hub.ingestion.sync_aligner import SyncAligner
 from stream_hub.utils.logger import setup_logger
-from stream_hub.network.proxy import ZmqHubProxy
-from stream_hub.utils.utils import load_yaml
+from stream_hub.network.feedback_router import FeedbackRouter
+from stream_hub.network.metrics_exporter import MetricsExporter
+from stream_hub.network.proxy import ZmqHubProxy, parse_shards
+from stream_hub.network.trace_collector import TraceCollector
+from stream_hub.utils.utils import load_yaml, local_endpoint
+
+
+def with_shards(streams_cfg, shards):
+    # Streams listed under a shard publish through that shard's proxy.
+    shard_of = {sid: shard for shard in shards[1:] for sid in shard["streams"]}
+    return [
+        {**cfg, "proxy_endpoint": shard_of[cfg["id"]]["proxy_endpoint"]} if cfg["id"] in shard_of else cfg
+        for cfg in streams_cfg
+    ]
+
+
+def config_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        return None
+
 
 def main():
     arg_parser = ArgumentParser(description="Stream Hub")
@@ -23,29 +46,90 @@ def main():
     args = arg_parser.parse_args()  
 
     logger = setup_logger("stream-hub", level=logging.INFO)
+    started_at = time.monotonic()
 
-    streams_cfg = load_yaml(args.stream_config).get("streams", [])
+    streams_file = load_yaml(args.stream_config) or {}
+    streams_cfg = streams_file.get("streams", [])
+    sync_groups_cfg = streams_file.get("sync_groups", [])
     hub_cfg = load_yaml(args.hub_config)
 
     zmq_cfg = hub_cfg.get("zmq", {})
     ingestion_cfg = hub_cfg.get("ingestion", {})
+    metrics_cfg = hub_cfg.get("metrics", {})
 
     feedbacks = hub_cfg.get("feedbacks")
-    hub_endpoint = zmq_cfg.get("hub_endpoint", "tcp://0.0.0.0:7500")
     proxy_endpoint = zmq_cfg.get("proxy_endpoint", "tcp://127.0.0.1:7501")
-
-    proxy = ZmqHubProxy(pub_port=hub_endpoint, sub_port=proxy_endpoint)
-    proxy.start()
-    time.sleep(1)
+    feedback_endpoint = zmq_cfg.get("feedback_endpoint", "tcp://127.0.0.1:7502")
+
+    # One proxy per shard, each with its own context and IO threads. Streams
+    # listed under a shard publish through it; consumers connect to its hub_endpoint.
+    shards = parse_shards(zmq_cfg, streams_cfg)
+    # The last-value cache forwards in a Python loop that holds the GIL, so
+    # every proxy thread would share one core. With shards it defaults to off
+    # and each proxy forwards in libzmq.
+    last_value_cache = zmq_cfg.get("last_value_cache")
+    if last_value_cache is None:
+        last_value_cache = len(shards) == 1
+    elif last_value_cache and len(shards) > 1:
+        logger.warning("last_value_cache is on with %d proxy shards: they forward in Python and share the GIL",
+                       len(shards))
+    proxies = []
+    for shard in shards:
+        proxy = ZmqHubProxy(
+            pub_port=shard["hub_endpoint"],
+            sub_port=shard["proxy_endpoint"],
+            last_value_cache=bool(last_value_cache),
+            lvc_max_age=float(zmq_cfg.get("lvc_max_age_sec", 5)),
+            io_threads=int(zmq_cfg.get("io_threads", 1)),
+            name=shard["name"],
+        )
+        proxy.start()
+        proxies.append(proxy)
+        if shard["name"] != "main":
+            logger.info("Proxy shard '%s' → %s (%s)", shard["name"], shard["hub_endpoint"], shard["streams"])
+    # Wait for the binds rather than a fixed sleep; a port already in use
+    # shows up here instead of as silent workers.
+    for proxy in proxies:
+        if not proxy.wait_ready(timeout=5):
+            logger.error("Proxy '%s' did not bind within 5s", proxy.name)
+    logger.info("Proxies ready in %.3fs", time.monotonic() - started_at)
+
+    streams_cfg = with_shards(streams_cfg, shards)
+    hub_endpoints = [local_endpoint(shard["hub_endpoint"]) for shard in shards]
     stop_event = threading.Event()
 
+    feedback_router = FeedbackRouter(feedbacks, feedback_endpoint)
+    feedback_router.start()
+
     manager = StreamManager(
         streams_cfg=streams_cfg,
         proxy=proxy_endpoint,
         feedback=feedbacks,
         fps=int(ingestion_cfg.get("fps", 30)),
+        encoder=hub_cfg.get("encoder", {}),
+        metrics=metrics_cfg,
+        pool=ingestion_cfg.get("pool", {}),
+        stats_endpoint=hub_endpoints,
+        feedback_endpoint=feedback_endpoint,
+        adaptive=hub_cfg.get("adaptive", {}),
+        start_method=ingestion_cfg.get("start_method"),
+        startup_timeout=float(ingestion_cfg.get("startup_timeout_sec", 30)),
     )
 
+    aligner = SyncAligner(sync_groups_cfg, hub_endpoints, proxy_endpoint)
+    clip_server = ClipServer(hub_cfg.get("clips", {}), streams_cfg, hub_endpoints)
+    traces = None
+    if int(metrics_cfg.get("trace_every", 0) or 0) > 0:
+        traces = TraceCollector(
+            metrics_cfg.get("trace_endpoint", "tcp://0.0.0.0:7504"),
+            log_interval=float(metrics_cfg.get("trace_log_interval_sec", 30)),
+        )
+    exporter = None
+    if metrics_cfg.get("enabled", False):
+        exporter = MetricsExporter(
+            hub_endpoints, http_port=int(metrics_cfg.get("http_port", 9100)), proxies=proxies, traces=traces
+        )
+
     def handle_sig(signum, frame):
         logger.info("Received signal %s → shutting down ...", signum)
         stop_event.set()
@@ -53,17 +137,55 @@ def main():
     signal.signal(signal.SIGINT, handle_sig)
     signal.signal(signal.SIGTERM, handle_sig)
 
+    reload_event = threading.Event()
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda signum, frame: reload_event.set())
+    watch_config = bool(ingestion_cfg.get("watch_config", True)) and args.stream_config is not None
+    last_mtime = seen_mtime = config_mtime(args.stream_config)
+
     logger.info("Starting stream manager with %d streams", len(streams_cfg))
-    manager.start()
+    manager.start(started_at=started_at)
+    aligner.start()
+    clip_server.start()
+    if traces:
+        traces.start()
+    if exporter:
+        exporter.start()
 
     try:
         while not stop_event.is_set():
             time.sleep(0.5)
+
+            # Reload on SIGHUP, or once the file's mtime has changed and then
+            # held still for a tick (editors may write it in several steps).
+            mtime = config_mtime(args.stream_config) if watch_config else last_mtime
+            changed = mtime != last_mtime and mtime == seen_mtime and mtime is not None
+            seen_mtime = mtime
+            if not (reload_event.is_set() or changed):
+                continue
+            reload_event.clear()
+            last_mtime = mtime
+
+            logger.info("Reloading %s", args.stream_config)
+            try:
+                new_streams = (load_yaml(args.stream_config) or {}).get("streams", [])
+                manager.reload(with_shards(new_streams, shards))
+            except Exception as e:
+                logger.error("Config reload failed, keeping the running streams: %s", e)
     except KeyboardInterrupt:
         stop_event.set()
 
     logger.info("Waiting for workers to close ...")
+    aligner.stop()
+    clip_server.stop()
+    if exporter:
+        exporter.stop()
+    if traces:
+        traces.stop()
     manager.stop()
+    feedback_router.stop()
+    for proxy in proxies:
+        proxy.stop()
 
     logger.info("Stream-hub stopped cleanly")
 
@@ -0,0 +1,427 @@
+import os
+import zmq
+import zmq.asyncio
+import time
+import socket
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from stream_hub.ingestion.frame_encoder import FrameEncoder
+from stream_hub.network.wire import (
+    DEFAULT_RENDITION,
+    STATS_TOPIC,
+    decode_message,
+    decode_trace,
+    encode_header,
+    frame_topic,
+)
+from stream_hub.utils.metrics import Histogram
+from stream_hub.utils.utils import endpoint_list
+
+# Per-stream subscription options; a plain list of stream ids uses the defaults.
+#   {"rendition": "full", "latest_only": True, "scale": 1}
+StreamsSpec = Union[None, Sequence[str], Dict[str, Optional[Dict[str, Any]]]]
+
+
+class ClientFrame:
+    """One received frame: header metadata, the JPEG bytes and, if decoding is on, the image."""
+
+    __slots__ = ("topic", "stream_id", "metadata", "jpeg", "image", "received_at", "decode_ms", "trace")
+
+    def __init__(self, topic: str, metadata: Dict[str, Any], jpeg, received_at: float):
+        self.topic = topic
+        self.stream_id = metadata.get("stream_id")
+        self.metadata = metadata
+        self.jpeg = jpeg
+        self.image = None
+        self.received_at = received_at
+        self.decode_ms = 0.0
+        # Sampled frames only: {point: ms since capture}, see wire.TRACE_POINTS.
+        self.trace: Optional[Dict[str, float]] = None
+
+    @property
+    def frame_id(self) -> int:
+        return self.metadata.get("frame_id", 0)
+
+    @property
+    def timestamp(self) -> float:
+        return self.metadata.get("timestamp", self.received_at)
+
+    @property
+    def latency_ms(self) -> float:
+        # Capture → receive; only meaningful with synchronised clocks across hosts.
+        return (self.received_at - self.timestamp) * 1000
+
+
+class ClientStreamStats:
+    """Receive-side counters and latency histograms for one stream."""
+
+    def __init__(self, stream_id: str):
+        self.stream_id = stream_id
+        self.counters = {
+            "received": 0,
+            "delivered": 0,
+            # Replaced by a newer frame before the consumer took it (latest_only).
+            "conflated": 0,
+            # Oldest frame pushed out of a full queue (latest_only off).
+            "overflow": 0,
+            # Same frame_id seen twice, e.g. a last-value-cache replay.
+            "repeats": 0,
+            "decode_failures": 0,
+        }
+        # latency: capture → receive, age: capture → handed to the consumer.
+        self.histograms = {"latency": Histogram(), "age": Histogram(), "decode": Histogram()}
+        self.last_frame_id = -1
+
+    @property
+    def dropped(self) -> int:
+        return self.counters["conflated"] + self.counters["overflow"]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "stream_id": self.stream_id,
+            "counters": {**self.counters, "dropped": self.dropped},
+            "histograms": {name: h.snapshot() for name, h in self.histograms.items() if h.count},
+        }
+
+
+class _Subscription:
+    __slots__ = ("stream_id", "topic", "latest_only", "scale", "pending")
+
+    def __init__(self, stream_id: str, topic: str, latest_only: bool, scale: int, max_queue: int):
+        self.stream_id = stream_id
+        self.topic = topic
+        self.latest_only = latest_only
+        self.scale = scale
+        self.pending: deque = deque(maxlen=1 if latest_only else max_queue)
+
+
+class _HubClientBase:
+    def __init__(
+        self,
+        endpoint: Union[str, Sequence[str]] = "tcp://127.0.0.1:7500",
+        streams: StreamsSpec = None,
+        rendition: str = DEFAULT_RENDITION,
+        latest_only: bool = True,
+        decode: bool = True,
+        scale: int = 1,
+        decoder: Optional[Dict[str, Any]] = None,
+        decode_threads: int = 2,
+        max_queue: int = 32,
+        rcvhwm: int = 64,
+        trace_endpoint: Optional[str] = None,
+        consumer: Optional[str] = None,
+    ):
+        self._logger = logging.getLogger(__name__)
+        self._endpoints = endpoint_list(endpoint)
+        self._rendition = rendition
+        self._latest_only = latest_only
+        self._scale = int(scale)
+        self._max_queue = int(max_queue)
+        self._rcvhwm = int(rcvhwm)
+
+        # Same backend options as the hub's `encoder` section, e.g. {"backend": "turbojpeg"}.
+        self._decoder = FrameEncoder.from_config(decoder) if decode else None
+        self._pool = ThreadPoolExecutor(max(1, int(decode_threads)), thread_name_prefix="hub-decode") \
+            if decode else None
+
+        self._subscriptions: Dict[str, _Subscription] = {}
+        # streams=None: streams are discovered from their stats/ messages and
+        # each one subscribed on its exact topic. A "frame/" prefix would make
+        # every worker encode every rendition for this one client.
+        self._wildcard = streams is None
+        self._unsubscribed: set = set()
+        self._stats: Dict[str, ClientStreamStats] = {}
+        self._arrivals: deque = deque()
+        self._ready: deque = deque()
+        self._socket = None
+        self._closed = False
+
+        # Trace acks go back to the hub's TraceCollector over PUSH; sends never
+        # block, so a missing collector just drops them.
+        self._consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self._trace_socket = None
+        if trace_endpoint:
+            self._trace_socket = zmq.Context.instance().socket(zmq.PUSH)
+            self._trace_socket.setsockopt(zmq.SNDHWM, 100)
+            self._trace_socket.setsockopt(zmq.LINGER, 0)
+            self._trace_socket.connect(trace_endpoint)
+
+        if isinstance(streams, dict):
+            self._initial = [(sid, options or {}) for sid, options in streams.items()]
+        else:
+            self._initial = [(sid, {}) for sid in streams or []]
+
+    # -- subscriptions -------------------------------------------------------
+
+    def subscribe(self, stream_id: str, rendition: Optional[str] = None, latest_only: Optional[bool] = None,
+                  scale: Optional[int] = None):
+        """Receive ``stream_id`` (call from the consuming thread or task)."""
+        if stream_id in self._subscriptions:
+            self.unsubscribe(stream_id)
+        self._unsubscribed.discard(stream_id)
+        topic = frame_topic(stream_id, rendition or self._rendition)
+        self._subscriptions[stream_id] = _Subscription(
+            stream_id,
+            topic,
+            self._latest_only if latest_only is None else bool(latest_only),
+            self._scale if scale is None else int(scale),
+            self._max_queue,
+        )
+        if self._socket is not None:
+            self._socket.setsockopt_string(zmq.SUBSCRIBE, topic)
+
+    def unsubscribe(self, stream_id: str):
+        subscription = self._subscriptions.pop(stream_id, None)
+        if self._wildcard:
+            # Keep discovery from subscribing it again.
+            self._unsubscribed.add(stream_id)
+        if subscription is not None and self._socket is not None:
+            self._socket.setsockopt_string(zmq.UNSUBSCRIBE, subscription.topic)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {sid: stats.snapshot() for sid, stats in sorted(self._stats.items())}
+
+    # -- shared receive path ---------------------------------------------------
+
+    def _open(self, ctx):
+        sub = ctx.socket(zmq.SUB)
+        # A short kernel-side queue: with latest_only the client keeps up by
+        # discarding, not by buffering seconds of video in ZMQ.
+        sub.setsockopt(zmq.RCVHWM, self._rcvhwm)
+        sub.setsockopt(zmq.LINGER, 0)
+        for endpoint in self._endpoints:
+            sub.connect(endpoint)
+        self._socket = sub
+
+        for stream_id, options in self._initial:
+            self.subscribe(stream_id, options.get("rendition"), options.get("latest_only"), options.get("scale"))
+        if self._wildcard:
+            # Workers publish stats every metrics.interval_sec while subscribed,
+            # so a stream shows up within one interval.
+            sub.setsockopt_string(zmq.SUBSCRIBE, f"{STATS_TOPIC}/")
+        return sub
+
+    def _accept(self, frames: List[zmq.Frame]):
+        received_at = time.time()
+        try:
+            topic, metadata, payload = decode_message(frames)
+        except ValueError as e:
+            self._logger.warning("Dropping malformed message: %s", e)
+            return
+
+        stream_id = metadata.get("stream_id")
+        if topic.startswith(f"{STATS_TOPIC}/"):
+            if self._wildcard and stream_id and stream_id not in self._subscriptions \
+                    and stream_id not in self._unsubscribed:
+                self.subscribe(stream_id)
+            return
+
+        subscription = self._subscriptions.get(stream_id)
+        if subscription is None or topic != subscription.topic:
+            return  # another rendition, or a stream unsubscribed a moment ago
+
+        stats = self._stats.get(stream_id)
+        if stats is None:
+            stats = self._stats[stream_id] = ClientStreamStats(stream_id)
+        frame_id = metadata.get("frame_id", 0)
+        if frame_id == stats.last_frame_id:
+            stats.counters["repeats"] += 1
+            return
+        stats.last_frame_id = frame_id
+        stats.counters["received"] += 1
+
+        frame = ClientFrame(topic, metadata, payload, received_at)
+        if not metadata.get("replayed"):
+            # A cached frame replayed on subscribe is old by design.
+            stats.histograms["latency"].observe(max(0.0, frame.latency_ms))
+        if len(frames) > 3:
+            try:
+                capture_ts, frame.trace = decode_trace(frames[3])
+                frame.trace["receive"] = (received_at - capture_ts) * 1000
+            except ValueError as e:
+                self._logger.warning("Ignoring trace of %s: %s", topic, e)
+
+        pending = subscription.pending
+        if len(pending) == pending.maxlen:
+            stats.counters["conflated" if subscription.latest_only else "overflow"] += 1
+        else:
+            self._arrivals.append(subscription)
+        pending.append(frame)
+
+    def _take(self) -> List[ClientFrame]:
+        # Every pending frame in arrival order; a latest_only stream
+        # contributes at most its newest one.
+        frames = []
+        while self._arrivals:
+            pending = self._arrivals.popleft().pending
+            if pending:
+                frames.append(pending.popleft())
+        return frames
+
+    def _decode(self, frame: ClientFrame) -> ClientFrame:
+        subscription = self._subscriptions.get(frame.stream_id)
+        scale = subscription.scale if subscription is not None else self._scale
+        t0 = time.perf_counter()
+        frame.image = self._decoder.decode(frame.jpeg, scale)
+        frame.decode_ms = (time.perf_counter() - t0) * 1000
+        return frame
+
+    def _delivered(self, frame: ClientFrame) -> ClientFrame:
+        # Runs on the consumer's thread, so the stats need no lock.
+        stats = self._stats[frame.stream_id]
+        stats.counters["delivered"] += 1
+        if frame.trace is not None:
+            frame.trace["deliver"] = (time.time() - frame.timestamp) * 1000
+            self._ack(frame)
+        if self._decoder is not None:
+            stats.histograms["decode"].observe(frame.decode_ms)
+            if frame.image is None:
+                stats.counters["decode_failures"] += 1
+        stats.histograms["age"].observe(max(0.0, (time.time() - frame.timestamp) * 1000))
+        return frame
+
+    def _ack(self, frame: ClientFrame):
+        if self._trace_socket is None:
+            return
+        ack = {
+            "stream_id": frame.stream_id,
+            "frame_id": frame.frame_id,
+            "rendition": frame.metadata.get("rendition"),
+            "consumer": self._consumer,
+            "points": frame.trace,
+        }
+        try:
+            self._trace_socket.send(encode_header(ack), zmq.NOBLOCK)
+        except zmq.Again:
+            pass
+
+    def _shutdown(self):
+        self._closed = True
+        if self._trace_socket is not None:
+            self._trace_socket.close()
+            self._trace_socket = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+
+class HubClient(_HubClientBase):
+    """Blocking consumer: ``for frame in HubClient(endpoint, ["cam1", "cam2"]): ...``
+
+    Frames are received on one SUB socket. Each drain of the socket is decoded
+    in parallel on the thread pool and then handed out in arrival order.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__sub = self._open(zmq.Context.instance())
+        self.__poller = zmq.Poller()
+        self.__poller.register(self.__sub, zmq.POLLIN)
+
+    def __iter__(self):
+        while not self._closed:
+            frame = self.recv(timeout=0.5)
+            if frame is not None:
+                yield frame
+
+    def recv(self, timeout: Optional[float] = None) -> Optional[ClientFrame]:
+        """Next frame, or None after ``timeout`` seconds (None blocks)."""
+        if not self._ready:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._ready:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not self.__poller.poll(None if remaining is None else int(remaining * 1000)):
+                    if deadline is not None:
+                        return None
+                    continue
+                self.__drain()
+                self.__schedule(self._take())
+
+        item = self._ready.popleft()
+        return self._delivered(item.result() if self._pool is not None else item)
+
+    def close(self):
+        self._shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __drain(self):
+        while True:
+            try:
+                self._accept(self.__sub.recv_multipart(zmq.NOBLOCK, copy=False))
+            except zmq.Again:
+                return
+
+    def __schedule(self, frames: Iterable[ClientFrame]):
+        for frame in frames:
+            self._ready.append(self._pool.submit(self._decode, frame) if self._pool is not None else frame)
+
+
+class AsyncHubClient(_HubClientBase):
+    """asyncio consumer on ``zmq.asyncio``: ``async for frame in AsyncHubClient(...): ...``
+
+    Decoding runs on the thread pool, so the event loop never blocks on JPEG work.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__sub = self._open(zmq.asyncio.Context.instance())
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ClientFrame:
+        frame = await self.recv()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+    async def recv(self, timeout: Optional[float] = None) -> Optional[ClientFrame]:
+        """Next frame, or None after ``timeout`` seconds or once closed."""
+        if not self._ready:
+            loop = asyncio.get_running_loop()
+            deadline = None if timeout is None else loop.time() + timeout
+            while not self._ready:
+                if self._closed:
+                    return None
+                remaining = 0.5 if deadline is None else min(0.5, max(0.0, deadline - loop.time()))
+                if not await self.__sub.poll(int(remaining * 1000)):
+                    if deadline is not None and loop.time() >= deadline:
+                        return None
+                    continue
+                await self.__drain()
+                for frame in self._take():
+                    if self._pool is not None:
+                        self._ready.append(loop.run_in_executor(self._pool, self._decode, frame))
+                    else:
+                        self._ready.append(frame)
+
+        item = self._ready.popleft()
+        return self._delivered(await item if self._pool is not None else item)
+
+    def close(self):
+        self._shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    async def __drain(self):
+        # With NOBLOCK the returned future is already resolved (or raises Again).
+        while True:
+            try:
+                self._accept(await self.__sub.recv_multipart(zmq.NOBLOCK, copy=False))
+            except zmq.Again:
+                return
@@ -0,0 +1,104 @@
+import zmq
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from stream_hub.network.wire import encode_message, feedback_topic
+
+
+class FeedbackRouter:
+    """Receives feedback once for the whole hub and forwards it per stream.
+
+    Feedback producers keep publishing pickled dicts on their own endpoints.
+    The router validates ``node_name``/``event`` against ``hub.yaml`` and
+    republishes each message on ``feedback/<stream_id>/`` of an internal PUB
+    socket, so a worker only receives the streams it owns.
+    """
+
+    def __init__(self, feedbacks_cfg: Dict[str, Dict[str, Any]], router_endpoint: str):
+        self.__logger = logging.getLogger(__name__)
+        self.__feedbacks_cfg = feedbacks_cfg or {}
+        self.__router_endpoint = router_endpoint
+
+        self.__stop_event = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if not self.__feedbacks_cfg:
+            return
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout=2)
+
+    def __run(self):
+        ctx = zmq.Context.instance()
+        sub = ctx.socket(zmq.SUB)
+        sub.setsockopt_string(zmq.SUBSCRIBE, "")
+        for name, cfg in self.__feedbacks_cfg.items():
+            endpoint = cfg.get("zmq") if isinstance(cfg, dict) else None
+            if endpoint:
+                sub.connect(endpoint)
+                print(f"[Feedback] Router connected to FEEDBACK '{name}' → {endpoint}")
+
+        pub = ctx.socket(zmq.PUB)
+        pub.setsockopt(zmq.SNDHWM, 1000)
+        pub.setsockopt(zmq.LINGER, 0)
+        pub.bind(self.__router_endpoint)
+        print(f"[Feedback] Router PUB bound at {self.__router_endpoint}")
+
+        poller = zmq.Poller()
+        poller.register(sub, zmq.POLLIN)
+        try:
+            while not self.__stop_event.is_set():
+                if not poller.poll(200):
+                    continue
+                try:
+                    msg = sub.recv_pyobj(zmq.NOBLOCK)
+                except zmq.Again:
+                    continue
+                except Exception as e:
+                    print(f"[Feedback] Recv error: {e}")
+                    continue
+
+                routed = self.__route(msg)
+                if routed is None:
+                    continue
+
+                stream_id, metadata = routed
+                try:
+                    pub.send_multipart(encode_message(feedback_topic(stream_id), metadata, b""), zmq.NOBLOCK)
+                except zmq.Again:
+                    pass
+        finally:
+            sub.close()
+            pub.close()
+
+    def __route(self, msg):
+        if not isinstance(msg, dict):
+            return None
+
+        stream_id = msg.get("stream_id")
+        node_name = msg.get("node_name") or msg.get("module")
+        event = msg.get("event")
+        if not stream_id or not node_name:
+            return None
+
+        # Only nodes declared in hub.yaml are forwarded; workers ignore the rest anyway.
+        cfg = self.__feedbacks_cfg.get(node_name)
+        if cfg is None:
+            return None
+        allowed_events = cfg.get("events") if isinstance(cfg, dict) else None
+        if allowed_events and event not in allowed_events:
+            return None
+
+        return str(stream_id), {
+            "node_name": node_name,
+            "data": event,
+            "target": msg.get("target", []),
+            "ts": msg.get("ts", time.time()),
+        }
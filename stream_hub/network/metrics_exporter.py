@@ -0,0 +1,101 @@
+import zmq
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from stream_hub.network.wire import STATS_TOPIC, decode_message
+from stream_hub.utils.metrics import render_prometheus, render_proxy_stats
+from stream_hub.utils.utils import endpoint_list
+
+
+class MetricsExporter:
+    """Collects ``stats/<stream_id>`` snapshots and serves them as Prometheus text."""
+
+    def __init__(self, hub_endpoint: Union[str, Sequence[str]], http_port: int = 9100, http_host: str = "0.0.0.0",
+                 proxies: Optional[List[Any]] = None, traces: Optional[Any] = None):
+        self.__logger = logging.getLogger(__name__)
+        self.__hub_endpoint = hub_endpoint
+        # ZmqHubProxy instances in this process, polled for traffic counters on each scrape.
+        self.__proxies = proxies or []
+        # TraceCollector with consumer-reported per-hop latencies, if tracing is on.
+        self.__traces = traces
+        self.__http_port = http_port
+        self.__http_host = http_host
+
+        self.__snapshots: Dict[str, Dict[str, Any]] = {}
+        self.__lock = threading.Lock()
+        self.__stop_event = threading.Event()
+        self.__server: Optional[ThreadingHTTPServer] = None
+        self.__collector: Optional[threading.Thread] = None
+
+    def start(self):
+        self.__collector = threading.Thread(target=self.__collect_loop, daemon=True)
+        self.__collector.start()
+
+        if self.__http_port:
+            self.__server = ThreadingHTTPServer((self.__http_host, self.__http_port), self.__make_handler())
+            threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+            print(f"[Metrics] Serving /metrics on {self.__http_host}:{self.__http_port}")
+
+    def stop(self):
+        self.__stop_event.set()
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+        if self.__collector is not None:
+            self.__collector.join(timeout=2)
+
+    def render(self) -> str:
+        with self.__lock:
+            snapshots = [self.__snapshots[sid] for sid in sorted(self.__snapshots)]
+        text = render_prometheus(snapshots)
+        if self.__proxies:
+            text += render_proxy_stats({proxy.name: proxy.statistics() for proxy in self.__proxies})
+        if self.__traces is not None:
+            text += render_prometheus(self.__traces.snapshots(), prefix="stream_hub_trace")
+        return text
+
+    def __collect_loop(self):
+        sub = zmq.Context.instance().socket(zmq.SUB)
+        sub.setsockopt_string(zmq.SUBSCRIBE, f"{STATS_TOPIC}/")
+        for endpoint in endpoint_list(self.__hub_endpoint):
+            sub.connect(endpoint)
+
+        poller = zmq.Poller()
+        poller.register(sub, zmq.POLLIN)
+        try:
+            while not self.__stop_event.is_set():
+                if not poller.poll(200):
+                    continue
+                try:
+                    _, snapshot, _ = decode_message(sub.recv_multipart(copy=False))
+                except ValueError as e:
+                    print(f"[Metrics] Dropping malformed stats message: {e}")
+                    continue
+
+                with self.__lock:
+                    self.__snapshots[snapshot["stream_id"]] = snapshot
+        finally:
+            sub.close()
+
+    def __make_handler(self):
+        exporter = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return _Handler
@@ -1,36 +1,276 @@
 import zmq
+import time
+import struct
 import threading
 import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from stream_hub.network.wire import (
+    BATCH_TOPIC, BUNDLE_TOPIC, FRAME_TOPIC, append_trace_point, decode_header, encode_header,
+)
+
+# Topics whose newest message is replayed to late joiners. shm/ notifications
+# (and tensor/ ones, which may be shm too) point at ring slots that are
+# overwritten quickly, so they are not cached.
+LVC_PREFIXES = (f"{FRAME_TOPIC}/", f"{BUNDLE_TOPIC}/", f"{BATCH_TOPIC}/")
+
+# Same order as the STATISTICS reply of zmq_proxy_steerable. Frontend is the
+# XSUB side (workers), backend the XPUB side (consumers); "in" counts received
+# message parts, "out" sent ones.
+PROXY_STATS = (
+    "frontend_messages_in",
+    "frontend_bytes_in",
+    "frontend_messages_out",
+    "frontend_bytes_out",
+    "backend_messages_in",
+    "backend_bytes_in",
+    "backend_messages_out",
+    "backend_bytes_out",
+)
+_STAT = struct.Struct("=Q")
+# Messages taken from one socket per poll wakeup before the others get a turn.
+_DRAIN_LIMIT = 1000
+
 
 class ZmqHubProxy:
-    def __init__(self, pub_port="tcp://*:7500", sub_port="tcp://*:7501"):
+    def __init__(self, pub_port="tcp://*:7500", sub_port="tcp://*:7501", last_value_cache=True,
+                 lvc_max_age=5.0, io_threads=1, name="main"):
         self.__logger = logging.getLogger(__name__)
         self.pub_port = pub_port
         self.sub_port = sub_port
+        self.name = name
         self.running = False
 
+        self.__lvc_enabled = last_value_cache
+        self.__lvc_max_age = lvc_max_age
+        self.__lvc_prefixes = tuple(p.encode("utf-8") for p in LVC_PREFIXES)
+        self.__frame_prefix = f"{FRAME_TOPIC}/".encode("utf-8")
+        # topic -> (received_at, frames); only touched by the proxy thread.
+        self.__lvc: Dict[bytes, Tuple[float, List[zmq.Frame]]] = {}
+
+        # A private context per proxy, so each shard gets its own IO threads.
+        self.__ctx = zmq.Context(io_threads=max(1, int(io_threads)))
+        self.__control_endpoint = f"inproc://proxy-control-{name}-{id(self)}"
+        self.__control: Optional[zmq.Socket] = None
+        self.__control_lock = threading.Lock()
+        self.__thread: Optional[threading.Thread] = None
+        self.__ready = threading.Event()
+
     def start(self):
         self.running = True
-        threading.Thread(target=self._run_proxy, daemon=True).start()
+        self.__control = self.__ctx.socket(zmq.PAIR)
+        self.__control.bind(self.__control_endpoint)
+        self.__thread = threading.Thread(target=self._run_proxy, name=f"proxy-{self.name}", daemon=True)
+        self.__thread.start()
 
-    def _run_proxy(self):
-        print(f"[Proxy] Starting ZeroMQ Proxy...")
-        context = zmq.Context.instance()
-        
-        xsub = context.socket(zmq.XSUB)
-        xpub = context.socket(zmq.XPUB)
+    def wait_ready(self, timeout=None) -> bool:
+        """Block until both sockets are bound (False on timeout or bind failure)."""
+        return self.__ready.wait(timeout)
+
+    def pause(self):
+        self.__command(b"PAUSE")
 
-        xsub.bind(self.sub_port)
-        print(f"[Proxy] XSUB bound at {self.sub_port}")
+    def resume(self):
+        self.__command(b"RESUME")
 
-        xpub.bind(self.pub_port)
-        print(f"[Proxy] XPUB bound at {self.pub_port}")
+    def stop(self):
+        if not self.running:
+            return
+        self.__command(b"TERMINATE")
+        if self.__thread is not None:
+            self.__thread.join(timeout=2)
+        self.running = False
+        with self.__control_lock:
+            self.__control.close()
+        self.__ctx.term()
+
+    def statistics(self) -> Dict[str, int]:
+        if not self.running or not self.__ready.is_set():
+            return {}
+        with self.__control_lock:
+            self.__control.send(b"STATISTICS")
+            if not self.__control.poll(1000):
+                return {}
+            frames = self.__control.recv_multipart()
+        return {name: _STAT.unpack(frame)[0] for name, frame in zip(PROXY_STATS, frames)}
+
+    def __command(self, command: bytes):
+        if self.__control is None:
+            return
+        with self.__control_lock:
+            self.__control.send(command)
+
+    def _run_proxy(self):
+        print(f"[Proxy:{self.name}] Starting ZeroMQ Proxy...")
+        xsub = self.__ctx.socket(zmq.XSUB)
+        xpub = self.__ctx.socket(zmq.XPUB)
+        control = self.__ctx.socket(zmq.PAIR)
+        control.connect(self.__control_endpoint)
+        if self.__lvc_enabled:
+            # Deliver every subscription, not only the first per topic, so a
+            # late joiner on an already-subscribed topic is still noticed.
+            # VERBOSER passes every unsubscribe too: XSUB counts the duplicate
+            # subscriptions, and would otherwise never forward the last one
+            # upstream, leaving workers encoding for nobody.
+            xpub.setsockopt(zmq.XPUB_VERBOSER, 1)
 
         try:
-            zmq.proxy(xsub, xpub)
+            xsub.bind(self.sub_port)
+            print(f"[Proxy:{self.name}] XSUB bound at {self.sub_port}")
+
+            xpub.bind(self.pub_port)
+            print(f"[Proxy:{self.name}] XPUB bound at {self.pub_port}")
+            self.__ready.set()
+
+            if self.__lvc_enabled:
+                print(f"[Proxy:{self.name}] Last-value cache enabled")
+                self.__run_lvc(xsub, xpub, control)
+            else:
+                # Runs in libzmq without the GIL. Note: libzmq 4.3.5 keeps
+                # forwarding while PAUSEd; TERMINATE and STATISTICS work.
+                zmq.proxy_steerable(xsub, xpub, None, control)
         except Exception as e:
-            print(f"[Proxy] Error: {e}")
+            print(f"[Proxy:{self.name}] Error: {e}")
+        finally:
+            self.__ready.clear()
+            print(f"[Proxy:{self.name}] Shutting down...")
+            xsub.close(linger=0)
+            xpub.close(linger=0)
+            control.close()
+
+    def __run_lvc(self, xsub, xpub, control):
+        # Same control protocol as zmq.proxy_steerable, plus the cache.
+        stats = [0] * len(PROXY_STATS)
+        paused = False
+
+        poller = zmq.Poller()
+        poller.register(control, zmq.POLLIN)
+        data_poller = zmq.Poller()
+        data_poller.register(xsub, zmq.POLLIN)
+        data_poller.register(xpub, zmq.POLLIN)
+        data_poller.register(control, zmq.POLLIN)
+
+        while True:
+            events = dict((poller if paused else data_poller).poll(500))
+
+            if control in events:
+                command = control.recv()
+                if command == b"TERMINATE":
+                    return
+                if command == b"PAUSE":
+                    paused = True
+                elif command == b"RESUME":
+                    paused = False
+                elif command == b"STATISTICS":
+                    control.send_multipart([_STAT.pack(value) for value in stats])
+                continue
+
+            # Drain each ready socket rather than one message per poll call.
+            if xsub in events:
+                for _ in range(_DRAIN_LIMIT):
+                    try:
+                        frames = xsub.recv_multipart(zmq.NOBLOCK, copy=False)
+                    except zmq.Again:
+                        break
+                    self.__forward(frames, xpub, stats)
+
+            if xpub in events:
+                for _ in range(_DRAIN_LIMIT):
+                    try:
+                        msg = xpub.recv(zmq.NOBLOCK, copy=False)
+                    except zmq.Again:
+                        break
+                    self.__forward_subscription(msg, xsub, xpub, stats)
+
+    def __forward(self, frames, xpub, stats):
+        topic = frames[0].bytes
+        if len(frames) == 4 and topic.startswith(self.__frame_prefix):
+            # Sampled trace frame: add the proxy hop.
+            frames[3] = zmq.Frame(append_trace_point(frames[3].bytes, "proxy", time.time()))
+        size = sum(len(frame) for frame in frames)
+        if topic.startswith(self.__lvc_prefixes):
+            self.__lvc[topic] = (time.monotonic(), frames)
+        xpub.send_multipart(frames, copy=False)
+        stats[0] += len(frames)
+        stats[1] += size
+        stats[6] += len(frames)
+        stats[7] += size
+
+    def __forward_subscription(self, msg, xsub, xpub, stats):
+        xsub.send(msg, copy=False)
+        stats[4] += 1
+        stats[5] += len(msg)
+        stats[2] += 1
+        stats[3] += len(msg)
+
+        data = msg.bytes
+        if data and data[0] == 1:
+            replayed = self.__replay(xpub, data[1:])
+            stats[6] += replayed[0]
+            stats[7] += replayed[1]
+
+    def __replay(self, xpub, prefix: bytes) -> Tuple[int, int]:
+        # PUB/SUB has no per-peer send, so subscribers already on this topic
+        # get the cached message again. It is flagged "replayed": true so they
+        # (and the clip buffer and aligner) can tell it from a live one.
+        now = time.monotonic()
+        parts = size = 0
+        for topic, (received_at, frames) in list(self.__lvc.items()):
+            if now - received_at > self.__lvc_max_age:
+                del self.__lvc[topic]
+            elif topic.startswith(prefix):
+                replay = self.__as_replay(frames)
+                xpub.send_multipart(replay, copy=False)
+                parts += len(replay)
+                size += sum(len(frame) for frame in replay)
+        return parts, size
+
+    def __as_replay(self, frames: List[zmq.Frame]) -> List[Any]:
+        payloads = frames[2:]
+        if len(frames) == 4 and frames[0].bytes.startswith(self.__frame_prefix):
+            # Drop the trace frame: a replay is up to lvc_max_age old and would
+            # skew the end_to_end and proxy_to_receive histograms.
+            payloads = frames[2:3]
+        try:
+            header = decode_header(frames[1].buffer)
+        except ValueError:
+            return [frames[0], frames[1], *payloads]
+        header["replayed"] = True
+        return [frames[0], encode_header(header), *payloads]
+
+
+def parse_shards(zmq_cfg: Dict[str, Any], streams_cfg: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Proxy layout from ``hub.yaml``: the main proxy plus optional ``shards``.
+
+    Streams listed under a shard publish through that shard's proxy; every
+    other stream uses the main one.
+    """
+    shards = [{
+        "name": "main",
+        "hub_endpoint": zmq_cfg.get("hub_endpoint", "tcp://0.0.0.0:7500"),
+        "proxy_endpoint": zmq_cfg.get("proxy_endpoint", "tcp://127.0.0.1:7501"),
+        "streams": [],
+    }]
+    known = {cfg["id"] for cfg in streams_cfg}
+    owner: Dict[str, str] = {}
+
+    for i, shard in enumerate(zmq_cfg.get("shards") or []):
+        name = shard.get("name", f"shard{i + 1}")
+        for key in ("hub_endpoint", "proxy_endpoint"):
+            if not shard.get(key):
+                raise ValueError(f"Proxy shard '{name}' needs a {key}")
+        for sid in shard.get("streams") or []:
+            if sid in owner:
+                raise ValueError(f"Stream '{sid}' is assigned to shards '{owner[sid]}' and '{name}'")
+            if sid not in known:
+                print(f"[Proxy] Shard '{name}' lists unknown stream '{sid}'")
+            owner[sid] = name
+        shards.append({
+            "name": name,
+            "hub_endpoint": shard["hub_endpoint"],
+            "proxy_endpoint": shard["proxy_endpoint"],
+            "streams": list(shard.get("streams") or []),
+        })
 
-        print("[Proxy] Shutting down...")
-        xsub.close()
-        xpub.close()
+    shards[0]["streams"] = [cfg["id"] for cfg in streams_cfg if cfg["id"] not in owner]
+    return shards
@@ -0,0 +1,101 @@
+import zmq
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from stream_hub.network.wire import decode_header, trace_stages
+from stream_hub.utils.metrics import Histogram
+
+
+class TraceCollector:
+    """Receives consumer trace acks and keeps per-stream stage latency histograms.
+
+    Consumers (``HubClient(trace_endpoint=...)``) PUSH one ack per traced
+    frame, holding every hop's offset from capture: worker dequeue, encode,
+    publish, proxy, consumer receive and delivery.
+    """
+
+    def __init__(self, endpoint: str = "tcp://0.0.0.0:7504", log_interval: float = 30.0):
+        self.__logger = logging.getLogger(__name__)
+        self.__endpoint = endpoint
+        self.__log_interval = float(log_interval)
+
+        # stream_id -> stage -> Histogram
+        self.__histograms: Dict[str, Dict[str, Histogram]] = {}
+        self.__counts: Dict[str, int] = {}
+        self.__lock = threading.Lock()
+        self.__stop_event = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout=2)
+
+    def add(self, ack: Dict[str, Any]):
+        stages = trace_stages(ack.get("points") or {})
+        if not stages:
+            return
+        stream_id = ack.get("stream_id", "unknown")
+        with self.__lock:
+            histograms = self.__histograms.setdefault(stream_id, {})
+            for stage, ms in stages.items():
+                histogram = histograms.get(stage)
+                if histogram is None:
+                    histogram = histograms[stage] = Histogram()
+                histogram.observe(max(0.0, ms))
+            self.__counts[stream_id] = self.__counts.get(stream_id, 0) + 1
+
+    def snapshots(self) -> List[Dict[str, Any]]:
+        # Same shape as StreamMetrics snapshots, so render_prometheus applies.
+        with self.__lock:
+            return [
+                {
+                    "stream_id": sid,
+                    "counters": {"traces": self.__counts.get(sid, 0)},
+                    "gauges": {},
+                    "histograms": {stage: h.snapshot() for stage, h in histograms.items()},
+                }
+                for sid, histograms in sorted(self.__histograms.items())
+            ]
+
+    def __run(self):
+        pull = zmq.Context.instance().socket(zmq.PULL)
+        pull.setsockopt(zmq.LINGER, 0)
+        pull.bind(self.__endpoint)
+        print(f"[Trace] Collecting consumer trace acks at {self.__endpoint}")
+
+        poller = zmq.Poller()
+        poller.register(pull, zmq.POLLIN)
+        next_log = time.monotonic() + self.__log_interval
+        try:
+            while not self.__stop_event.is_set():
+                if poller.poll(200):
+                    try:
+                        self.add(decode_header(pull.recv()))
+                    except ValueError as e:
+                        print(f"[Trace] Dropping malformed ack: {e}")
+                if self.__log_interval > 0 and time.monotonic() >= next_log:
+                    next_log = time.monotonic() + self.__log_interval
+                    self.__log_summary()
+        finally:
+            pull.close()
+
+    def __log_summary(self):
+        for snapshot in self.snapshots():
+            histograms = snapshot["histograms"]
+            total = histograms.get("end_to_end")
+            if not total:
+                continue
+            stages = {stage: h for stage, h in histograms.items() if stage != "end_to_end"}
+            slowest = max(stages, key=lambda stage: stages[stage]["p99"] or 0, default=None)
+            print(
+                f"[Trace] {snapshot['stream_id']}: end_to_end p50={total['p50']}ms p99={total['p99']}ms "
+                f"over {snapshot['counters']['traces']} frames, slowest hop {slowest} "
+                f"(p99={stages[slowest]['p99'] if slowest else None}ms)"
+            )
@@ -0,0 +1,195 @@
+import json
+import struct
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Multipart layout (version 1):
+#   frame 0: topic            (utf-8 "frame/<stream_id>/<rendition>", used for SUB prefix filtering)
+#   frame 1: header           (1 byte version + compact JSON metadata)
+#   frame 2: payload          (raw JPEG bytes, sent zero-copy)
+# Bundles (topic "bundle/<group_id>") carry one payload frame per member, in
+# the order of the header's "members" list.
+# Tensors (topic "tensor/<stream_id>/<name>") and batches ("batch/<group_id>")
+# carry one raw C-contiguous array; the header holds its "shape" and "dtype".
+# Traced frames (1 in metrics.trace_every) carry a 4th frame: the capture
+# timestamp (float64 epoch) followed by (point id, ms since capture) records,
+# appended hop by hop: worker, proxy, consumer.
+WIRE_VERSION = 1
+FRAME_TOPIC = "frame"
+SHM_TOPIC = "shm"
+BUNDLE_TOPIC = "bundle"
+STATS_TOPIC = "stats"
+FEEDBACK_TOPIC = "feedback"
+ROI_TOPIC = "roi"
+CLIP_TOPIC = "clip"
+VIDEO_TOPIC = "video"
+TENSOR_TOPIC = "tensor"
+BATCH_TOPIC = "batch"
+DEFAULT_RENDITION = "full"
+
+_VERSION = struct.Struct("!B")
+
+TRACE_POINTS = ("dequeue", "encode_start", "encode_end", "publish", "proxy", "receive", "deliver")
+_TRACE_ANCHOR = struct.Struct("!d")
+_TRACE_POINT = struct.Struct("!Bd")
+_TRACE_IDS = {name: i for i, name in enumerate(TRACE_POINTS)}
+
+
+def frame_topic(stream_id: str, rendition: str = DEFAULT_RENDITION) -> str:
+    return f"{FRAME_TOPIC}/{stream_id}/{rendition}"
+
+
+def stream_prefix(stream_id: str) -> str:
+    # Trailing slash keeps "cam1" from also matching "cam10".
+    return f"{FRAME_TOPIC}/{stream_id}/"
+
+
+def shm_topic(stream_id: str) -> str:
+    # Slot notifications for the shared-memory transport; payload frame is empty.
+    return f"{SHM_TOPIC}/{stream_id}/"
+
+
+def bundle_topic(group_id: str) -> str:
+    return f"{BUNDLE_TOPIC}/{group_id}"
+
+
+def tensor_topic(stream_id: str, name: str) -> str:
+    # Model inputs from the worker's tensor stage; the payload is empty when
+    # the tensor went to shared memory instead.
+    return f"{TENSOR_TOPIC}/{stream_id}/{name}"
+
+
+def batch_topic(group_id: str) -> str:
+    # One stacked (N, ...) tensor per sync group bundle.
+    return f"{BATCH_TOPIC}/{group_id}"
+
+
+def roi_topic(stream_id: str) -> str:
+    # Region-of-interest patches, sent as a bundle: one JPEG per region, then
+    # the optional background frame.
+    return f"{ROI_TOPIC}/{stream_id}/"
+
+
+def video_topic(stream_id: str) -> str:
+    # Compressed H.264/H.265 access units of a passthrough stream, in decode order.
+    return f"{VIDEO_TOPIC}/{stream_id}/"
+
+
+def clip_topic(stream_id: str) -> str:
+    # Topic frame of a clip reply from the ClipServer (not published on the hub).
+    return f"{CLIP_TOPIC}/{stream_id}"
+
+
+def stats_topic(stream_id: str) -> str:
+    # Periodic metrics snapshot for one stream; payload frame is empty.
+    return f"{STATS_TOPIC}/{stream_id}"
+
+
+def feedback_topic(stream_id: str) -> str:
+    # Router → worker channel for one stream's feedback; payload frame is empty.
+    return f"{FEEDBACK_TOPIC}/{stream_id}/"
+
+
+def encode_header(metadata: Dict[str, Any]) -> bytes:
+    body = json.dumps(metadata, separators=(",", ":"), default=str)
+    return _VERSION.pack(WIRE_VERSION) + body.encode("utf-8")
+
+
+def decode_header(header) -> Dict[str, Any]:
+    header = memoryview(header)
+    if len(header) < _VERSION.size:
+        raise ValueError("Wire header is empty")
+
+    (version,) = _VERSION.unpack_from(header)
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported wire version {version} (expected {WIRE_VERSION})")
+
+    return json.loads(header[_VERSION.size:].tobytes())
+
+
+def encode_message(topic: str, metadata: Dict[str, Any], payload) -> List[Any]:
+    return [topic.encode("utf-8"), encode_header(metadata), payload]
+
+
+def encode_bundle(topic: str, metadata: Dict[str, Any], payloads: Sequence[Any]) -> List[Any]:
+    return [topic.encode("utf-8"), encode_header(metadata), *payloads]
+
+
+def decode_bundle(frames: Sequence[Any]) -> Tuple[str, Dict[str, Any], List[memoryview]]:
+    if len(frames) < 2:
+        raise ValueError(f"Expected at least 2 message frames, got {len(frames)}")
+
+    topic, header = frames[0], frames[1]
+    return (
+        _as_bytes(topic).decode("utf-8"),
+        decode_header(_as_buffer(header)),
+        [_as_buffer(frame) for frame in frames[2:]],
+    )
+
+
+def decode_message(frames: Sequence[Any]) -> Tuple[str, Dict[str, Any], memoryview]:
+    """Decode a multipart message received with ``recv_multipart(copy=False)``.
+
+    The payload is returned as a memoryview over the received ZMQ frame, so
+    ``np.frombuffer(payload, np.uint8)`` can be fed to the decoder without copying.
+    """
+    if len(frames) < 3:
+        raise ValueError(f"Expected 3 message frames, got {len(frames)}")
+
+    topic, header, payload = frames[0], frames[1], frames[2]
+    return _as_bytes(topic).decode("utf-8"), decode_header(_as_buffer(header)), _as_buffer(payload)
+
+
+def encode_trace(capture_ts: float, points: Sequence[Tuple[str, float]]) -> bytes:
+    """Trace frame for a frame captured at ``capture_ts``; points are (name, ms since capture)."""
+    return _TRACE_ANCHOR.pack(capture_ts) + b"".join(_TRACE_POINT.pack(_TRACE_IDS[n], ms) for n, ms in points)
+
+
+def append_trace_point(trace, name: str, now: float) -> bytes:
+    # One unpack and one pack: cheap enough for the proxy's forwarding loop.
+    trace = _as_bytes(trace)
+    (capture_ts,) = _TRACE_ANCHOR.unpack_from(trace)
+    return trace + _TRACE_POINT.pack(_TRACE_IDS[name], (now - capture_ts) * 1000)
+
+
+def decode_trace(trace) -> Tuple[float, Dict[str, float]]:
+    trace = _as_bytes(trace)
+    if len(trace) < _TRACE_ANCHOR.size or (len(trace) - _TRACE_ANCHOR.size) % _TRACE_POINT.size:
+        raise ValueError(f"Malformed trace frame ({len(trace)} bytes)")
+
+    (capture_ts,) = _TRACE_ANCHOR.unpack_from(trace)
+    points = {}
+    for point_id, ms in _TRACE_POINT.iter_unpack(trace[_TRACE_ANCHOR.size:]):
+        if point_id < len(TRACE_POINTS):
+            points[TRACE_POINTS[point_id]] = ms
+    return capture_ts, points
+
+
+def trace_stages(points: Dict[str, float]) -> Dict[str, float]:
+    """Per-hop durations between consecutive recorded points, plus ``end_to_end``.
+
+    Missing points (e.g. no proxy stamp behind zmq.proxy_steerable) merge the
+    neighbouring hops into one stage, like ``publish_to_receive``.
+    """
+    stages = {}
+    previous, previous_ms = "capture", 0.0
+    for name in TRACE_POINTS:
+        if name in points:
+            stages[f"{previous}_to_{name}"] = points[name] - previous_ms
+            previous, previous_ms = name, points[name]
+    if stages:
+        stages["end_to_end"] = previous_ms
+    return stages
+
+
+def _as_buffer(frame) -> memoryview:
+    buffer = getattr(frame, "buffer", None)
+    if buffer is not None:
+        return buffer
+    return memoryview(frame)
+
+
+def _as_bytes(frame) -> bytes:
+    bytes_ = getattr(frame, "bytes", None)
+    if bytes_ is not None:
+        return bytes_
+    return bytes(frame)
@@ -2,47 +2,63 @@
 import zmq
 import logging
 import time
-from threading import Thread, Lock
-from typing import Any, Dict, Optional
+from threading import Event, Thread, Lock
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
 
-from stream_hub.utils.latency_logger import measure_latency
+from stream_hub.network.wire import decode_message, encode_bundle, encode_message, feedback_topic
 
 class ZmqHandler:
-    def __init__(self, proxy_endpoint: str, feedbacks_cfg: Dict[str, Dict[str, Any]]):
+    def __init__(self, proxy_endpoint: str, feedbacks_cfg: Dict[str, Dict[str, Any]],
+                 feedback_endpoint: Optional[str] = None):
         self.__logger = logging.getLogger(__name__)
         self.__proxy_endpoint = proxy_endpoint
         self.__feedbacks_cfg = feedbacks_cfg or {}
+        self.__feedback_endpoint = feedback_endpoint
 
         self.__ctx: Optional[zmq.Context] = None
         self.__pub_socket: Optional[zmq.Socket] = None
         self.__sub_socket: Optional[zmq.Socket] = None
-
-        self.__feedback_state: Dict[str, Dict[str, Dict[str, Any]]] = {}
-        self.__feedback_lock = Lock()
+        self.__subscriptions: Set[bytes] = set()
+        # ZMQ sockets are not thread-safe; pooled workers share one handler
+        # across camera threads, so every XPUB operation goes through this lock.
+        self.__pub_lock = Lock()
+
+        self.__feedback_snapshots: Dict[str, Tuple[int, Dict[str, Dict[str, Any]]]] = {}
+        # Every configured node is always present in ``events``; one that has
+        # not reported yet carries None values.
+        self.__empty_feedback: Tuple[int, Dict[str, Dict[str, Any]]] = (0, {
+            name: {"data": None, "target": None, "timestamp": None} for name in self.__feedbacks_cfg
+        })
         self.__feedback_thread: Optional[Thread] = None
+        self.__feedback_stop = Event()
 
 
-    def initialize_runtime(self):
+    def initialize_runtime(self, stream_ids: Iterable[str] = ()):
         self.__ctx = zmq.Context.instance()
-        self.__pub_socket = self.__ctx.socket(zmq.PUB)
+        # XPUB instead of PUB: the proxy's XSUB forwards consumer subscriptions
+        # upstream, so the worker can see which topics anyone is listening to.
+        self.__pub_socket = self.__ctx.socket(zmq.XPUB)
         self.__pub_socket.setsockopt(zmq.SNDHWM, 20)
         self.__pub_socket.setsockopt(zmq.LINGER, 50)
+        # Report HWM instead of dropping silently: a full queue raises
+        # zmq.Again on the non-blocking send below and is counted by the caller.
+        self.__pub_socket.setsockopt(zmq.XPUB_NODROP, 1)
 
         try:
             self.__pub_socket.connect(self.__proxy_endpoint)
-            print(f"[ZMQ] PUB connect at {self.__proxy_endpoint}")
+            print(f"[ZMQ] XPUB connect at {self.__proxy_endpoint}")
         except Exception as e:
             print(f"[ZMQ] connect failed: {e}")
 
-        if self.__feedbacks_cfg:
+        stream_ids = list(stream_ids)
+        if self.__feedbacks_cfg and self.__feedback_endpoint and stream_ids:
+            # The hub's FeedbackRouter has already validated each message; only
+            # the streams this process owns are subscribed.
             self.__sub_socket = self.__ctx.socket(zmq.SUB)
-            self.__sub_socket.setsockopt_string(zmq.SUBSCRIBE, "")
-
-            for name, cfg in self.__feedbacks_cfg.items():
-                endpoint = cfg.get("zmq") if isinstance(cfg, dict) else None
-                if endpoint:
-                    self.__sub_socket.connect(endpoint)
-                    print(f"[ZMQ] Worker connected to FEEDBACK '{name}' → {endpoint}")
+            for stream_id in stream_ids:
+                self.__sub_socket.setsockopt_string(zmq.SUBSCRIBE, feedback_topic(stream_id))
+            self.__sub_socket.connect(self.__feedback_endpoint)
+            print(f"[ZMQ] Worker connected to FEEDBACK router → {self.__feedback_endpoint} ({len(stream_ids)} stream(s))")
 
             self.__feedback_thread = Thread(
                 target=self.__feedback_receive_loop,
@@ -50,72 +66,117 @@ class ZmqHandler:
             )
             self.__feedback_thread.start()
 
-    @measure_latency
-    def publish(self, metadata: Dict[str, Any], jpeg_bytes: bytes) -> None:
+    def has_subscribers(self, topic: str) -> bool:
+        if self.__pub_socket is None:
+            return False
+
+        encoded = topic.encode("utf-8")
+        with self.__pub_lock:
+            self.__drain_subscriptions()
+            return any(encoded.startswith(prefix) for prefix in self.__subscriptions)
+
+    def __drain_subscriptions(self):
+        while True:
+            try:
+                msg = self.__pub_socket.recv(zmq.NOBLOCK)
+            except zmq.Again:
+                return
+
+            if not msg:
+                continue
+            if msg[0] == 1:
+                self.__subscriptions.add(msg[1:])
+            elif msg[0] == 0:
+                self.__subscriptions.discard(msg[1:])
+
+    def publish(self, metadata: Dict[str, Any], jpeg_bytes, topic: str, trace: Optional[bytes] = None) -> bool:
         if self.__pub_socket is None:
             raise RuntimeError("ZmqHandler.publish() called before initialize_runtime()")
 
-        msg = {"metadata": metadata, "jpeg_bytes": jpeg_bytes}
+        parts = encode_message(topic, metadata, jpeg_bytes)
+        if trace is not None:
+            parts.append(trace)
+        return self.__send(parts)
+
+    def publish_bundle(self, metadata: Dict[str, Any], payloads, topic: str) -> bool:
+        if self.__pub_socket is None:
+            raise RuntimeError("ZmqHandler.publish_bundle() called before initialize_runtime()")
+
+        return self.__send(encode_bundle(topic, metadata, payloads))
+
+    def __send(self, parts) -> bool:
         try:
-            self.__pub_socket.send_pyobj(msg)
+            with self.__pub_lock:
+                self.__pub_socket.send_multipart(parts, flags=zmq.NOBLOCK, copy=False)
+            return True
+        except zmq.Again:
+            return False
         except Exception as e:
             print(f"[ZMQ] Publish error on {self.__proxy_endpoint}: {e}")
+            return False
 
     def __feedback_receive_loop(self):
-        while True:
+        poller = zmq.Poller()
+        poller.register(self.__sub_socket, zmq.POLLIN)
+        # Poll with a timeout so close() can stop this thread before closing
+        # the socket it owns.
+        while not self.__feedback_stop.is_set():
             try:
-                msg = self.__sub_socket.recv_pyobj()
+                if not poller.poll(200):
+                    continue
+                frames = self.__sub_socket.recv_multipart(copy=False)
             except Exception as e:
                 print(f"[ZMQ] Feedback recv error: {e}")
                 time.sleep(0.1)
                 continue
 
-            if not isinstance(msg, dict):
+            try:
+                topic, msg, _ = decode_message(frames)
+            except ValueError:
                 continue
 
-            stream_id = msg.get("stream_id")
-            node_name = msg.get("node_name") or msg.get("module")
-            event = msg.get("event")
-            target = msg.get("target", [])
-            ts = msg.get("ts", time.time())
-
-            if not stream_id or not node_name:
+            stream_id = topic.split("/", 2)[1]
+            node_name = msg.get("node_name")
+            if not node_name:
                 continue
 
-            cfg = self.__feedbacks_cfg.get(node_name)
-            allowed_events = None
-            if isinstance(cfg, dict):
-                allowed_events = cfg.get("events")
-            if allowed_events and event not in allowed_events:
-                continue
-            
-            with self.__feedback_lock:
-                per_stream = self.__feedback_state.setdefault(stream_id, {})
-                per_stream[node_name] = {
-                    "data": event,
-                    "target": target,
-                    "ts": ts,
-                }
-
-    def get_feedback(self, stream_id: str) -> Dict[str, Dict[str, Any]]:
-        result: Dict[str, Dict[str, Any]] = {}
-
-        with self.__feedback_lock:
-            per_stream = self.__feedback_state.get(stream_id, {})
-
-            for name in self.__feedbacks_cfg.keys():
-                info = per_stream.get(name)
-                if info is None:
-                    result[name] = {"data": None, "target": None, "ts": None}
-                else:
-                    result[name] = {
-                        "data": info.get("data", None),
-                        "target": list(info.get("target", None)),
-                        "ts": float(info.get("ts", None)),
-                    }
-        return result
+            self.__update_feedback(stream_id, node_name, msg)
+
+    def __update_feedback(self, stream_id: str, node_name: str, msg: Dict[str, Any]):
+        target = msg.get("target")
+        if target is None:
+            target = []
+        elif not isinstance(target, list):
+            target = [target]
+        try:
+            ts = float(msg.get("ts"))
+        except (TypeError, ValueError):
+            ts = time.time()
+
+        # Copy-on-write: published snapshots are never mutated, a new dict
+        # replaces the old one and the version is bumped. Readers just load the
+        # (version, events) tuple, which is a single atomic reference swap.
+        if node_name not in self.__feedbacks_cfg:
+            return
+        version, events = self.__feedback_snapshots.get(stream_id, self.__empty_feedback)
+        updated = dict(events)
+        updated[node_name] = {"data": msg.get("data"), "target": target, "timestamp": ts}
+        self.__feedback_snapshots[stream_id] = (version + 1, updated)
+
+    def get_feedback(self, stream_id: str) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+        """Return ``(version, events)`` for a stream.
+
+        ``events`` is shared between callers and must be treated as read-only;
+        it only changes identity when ``version`` changes.
+        """
+        return self.__feedback_snapshots.get(stream_id, self.__empty_feedback)
 
     def close(self):
+        self.__feedback_stop.set()
+        if self.__feedback_thread is not None:
+            self.__feedback_thread.join(timeout=1)
+            self.__feedback_thread = None
+
         if self.__pub_socket:
             try:
                 self.__pub_socket.close()
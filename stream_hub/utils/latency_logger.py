@@ -2,17 +2,23 @@ import time
 import logging
 from functools import wraps
 
-logging.getLogger(__name__)
+logger = logging.getLogger(__name__)
 
+# Ad-hoc debugging aid only. Hot-path stages are timed through
+# stream_hub.utils.metrics; this decorator costs a single level check unless
+# DEBUG logging is enabled for this module.
 def measure_latency(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
+        if not logger.isEnabledFor(logging.DEBUG):
+            return func(*args, **kwargs)
+
         start = time.perf_counter()
         result = func(*args, **kwargs)
         end = time.perf_counter()
 
         latency_ms = (end - start) * 1000
-        print(f"[Latency] {func.__name__} executed in {latency_ms:.3f} ms")
+        logger.debug("%s executed in %.3f ms", func.__name__, latency_ms)
 
         return result
 
@@ -0,0 +1,167 @@
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional
+
+# Upper bounds (ms) shared by every latency histogram, so snapshots from
+# different workers can be summed bucket by bucket.
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+STAGES = ("capture", "encode", "feedback_merge", "publish")
+
+
+class Histogram:
+    # No lock: a worker records each stage from a single thread, and readers
+    # only take (slightly stale) snapshots.
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "sum": round(self.sum, 3),
+            "count": self.count,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class StreamMetrics:
+    def __init__(self, stream_id: str, sample_every: int = 1):
+        self.stream_id = stream_id
+        self.sample_every = max(1, int(sample_every))
+
+        self.__histograms: Dict[str, Histogram] = {stage: Histogram() for stage in STAGES}
+        self.__counters: Dict[str, int] = {}
+        self.__gauges: Dict[str, float] = {}
+        self.__ticks = 0
+
+        self.__last_snapshot = time.monotonic()
+        self.__last_published = 0
+        self.__last_busy_ms = 0.0
+
+    def sample(self) -> bool:
+        # Call once per frame; stage timings are only taken for sampled frames
+        # so the perf_counter calls themselves stay off most of the hot path.
+        self.__ticks += 1
+        return self.__ticks % self.sample_every == 0
+
+    def observe(self, stage: str, value_ms: float):
+        histogram = self.__histograms.get(stage)
+        if histogram is None:
+            histogram = self.__histograms[stage] = Histogram()
+        histogram.observe(value_ms)
+
+    def inc(self, name: str, value: int = 1):
+        self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        self.__gauges[name] = value
+
+    def counter(self, name: str) -> int:
+        return self.__counters.get(name, 0)
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return dict(self.__counters)
+
+    def __busy_ms(self) -> float:
+        # Capture time is mostly spent blocked waiting for the next packet, so
+        # only the processing stages (timed on sampled frames) count as cost.
+        total = 0.0
+        for stage, histogram in self.__histograms.items():
+            if stage != "capture":
+                total += histogram.sum * self.sample_every
+        return total
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        published = self.counter("frames_published")
+        elapsed = now - self.__last_snapshot
+        busy_ms = self.__busy_ms()
+        if elapsed > 0:
+            self.__gauges["fps"] = round((published - self.__last_published) / elapsed, 2)
+            # Measured cost of this stream, used by the pool scheduler.
+            self.__gauges["cost_ms_per_sec"] = round((busy_ms - self.__last_busy_ms) / elapsed, 3)
+        self.__last_snapshot = now
+        self.__last_published = published
+        self.__last_busy_ms = busy_ms
+
+        return {
+            "stream_id": self.stream_id,
+            "timestamp": time.time(),
+            "counters": dict(self.__counters),
+            "gauges": dict(self.__gauges),
+            "histograms": {stage: h.snapshot() for stage, h in self.__histograms.items() if h.count},
+        }
+
+
+def _labels(**labels) -> str:
+    inner = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    return "{" + inner + "}"
+
+
+def render_prometheus(snapshots: Iterable[Dict[str, Any]], prefix: str = "stream_hub") -> str:
+    snapshots = list(snapshots)
+    lines: List[str] = []
+
+    counter_names = sorted({name for s in snapshots for name in s.get("counters", {})})
+    for name in counter_names:
+        metric = f"{prefix}_{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        for s in snapshots:
+            if name in s.get("counters", {}):
+                lines.append(f"{metric}{_labels(stream=s['stream_id'])} {s['counters'][name]}")
+
+    gauge_names = sorted({name for s in snapshots for name in s.get("gauges", {})})
+    for name in gauge_names:
+        metric = f"{prefix}_{name}"
+        lines.append(f"# TYPE {metric} gauge")
+        for s in snapshots:
+            if name in s.get("gauges", {}):
+                lines.append(f"{metric}{_labels(stream=s['stream_id'])} {s['gauges'][name]}")
+
+    metric = f"{prefix}_stage_latency_ms"
+    if any(s.get("histograms") for s in snapshots):
+        lines.append(f"# TYPE {metric} histogram")
+    for s in snapshots:
+        for stage, h in sorted(s.get("histograms", {}).items()):
+            cumulative = 0
+            for bound, n in zip(list(h["buckets"]) + ["+Inf"], h["counts"]):
+                cumulative += n
+                lines.append(f"{metric}_bucket{_labels(stream=s['stream_id'], stage=stage, le=bound)} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(stream=s['stream_id'], stage=stage)} {h['sum']}")
+            lines.append(f"{metric}_count{_labels(stream=s['stream_id'], stage=stage)} {h['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def render_proxy_stats(stats: Dict[str, Dict[str, int]], prefix: str = "stream_hub") -> str:
+    lines: List[str] = []
+    names = sorted({name for counters in stats.values() for name in counters})
+    for name in names:
+        metric = f"{prefix}_proxy_{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        for proxy, counters in sorted(stats.items()):
+            if name in counters:
+                lines.append(f"{metric}{_labels(proxy=proxy)} {counters[name]}")
+    return "\n".join(lines) + "\n" if lines else ""
@@ -1,5 +1,6 @@
 import yaml
 from pathlib import Path
+from typing import List, Sequence, Union
 
 def load_yaml(path=None):
     if path is None:
@@ -10,4 +11,18 @@ def load_yaml(path=None):
         raise FileNotFoundError(f"YAML file not found: {path}")
 
     with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
\ No newline at end of file
+        return yaml.safe_load(f)
+
+def local_endpoint(endpoint: str) -> str:
+    # Bind addresses ("tcp://0.0.0.0:7500", "tcp://*:7500") are not valid
+    # connect targets; in-process clients reach them through loopback.
+    for wildcard in ("://0.0.0.0:", "://*:"):
+        if wildcard in endpoint:
+            return endpoint.replace(wildcard, "://127.0.0.1:")
+    return endpoint
+
+def endpoint_list(endpoints: Union[str, Sequence[str]]) -> List[str]:
+    # With proxy shards, hub-side subscribers connect to every shard's hub endpoint.
+    if isinstance(endpoints, str):
+        return [endpoints]
+    return list(endpoints)
@@ -0,0 +1,44 @@
+import numpy as np
+
+from stream_hub.ingestion.change_detector import ChangeDetector
+
+
+def scene(shift=0):
+    frame = np.full((120, 160, 3), 80, dtype=np.uint8)
+    frame[40:80, 20 + shift:60 + shift] = 255
+    return frame
+
+
+def test_changed_keepalive_changed_cycle():
+    detector = ChangeDetector({"enabled": True, "keepalive_sec": 1.0})
+
+    assert detector.check(scene(), 0.0) == "changed"
+    # A static scene is skipped until the keep-alive is due.
+    assert detector.check(scene(), 0.3) is None
+    assert detector.check(scene(), 0.9) is None
+    assert detector.check(scene(), 1.0) == "keepalive"
+    assert detector.check(scene(), 1.5) is None
+    # Motion publishes at once and restarts the keep-alive clock.
+    assert detector.check(scene(shift=40), 1.6) == "changed"
+    assert detector.check(scene(shift=40), 2.5) is None
+    assert detector.check(scene(shift=40), 2.6) == "keepalive"
+
+
+def test_sensor_noise_is_not_a_change():
+    detector = ChangeDetector({"enabled": True, "keepalive_sec": 0})
+    rng = np.random.default_rng(0)
+    base = scene()
+
+    assert detector.check(base, 0.0) == "changed"
+    for i in range(1, 10):
+        noisy = np.clip(base.astype(np.int16) + rng.integers(-4, 5, base.shape), 0, 255).astype(np.uint8)
+        assert detector.check(noisy, i * 0.1) is None
+
+
+def test_reset_and_resolution_change_publish_again():
+    detector = ChangeDetector({"enabled": True})
+    assert detector.check(scene(), 0.0) == "changed"
+
+    detector.reset()
+    assert detector.check(scene(), 0.1) == "changed"
+    assert detector.check(np.full((60, 80, 3), 80, dtype=np.uint8), 0.2) == "changed"
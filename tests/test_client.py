@@ -0,0 +1,84 @@
+import socket
+import time
+
+import pytest
+import zmq
+
+from stream_hub.network.client import HubClient
+from stream_hub.network.wire import encode_message, frame_topic
+
+
+def free_endpoint():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"tcp://127.0.0.1:{s.getsockname()[1]}"
+
+
+@pytest.fixture
+def hub():
+    """Yield ``(endpoint, send)``: a PUB socket standing in for the hub."""
+    endpoint = free_endpoint()
+    pub = zmq.Context.instance().socket(zmq.PUB)
+    pub.setsockopt(zmq.LINGER, 0)
+    pub.bind(endpoint)
+
+    def send(stream_id, frame_id, rendition="full"):
+        metadata = {"stream_id": stream_id, "frame_id": frame_id, "timestamp": time.time(), "rendition": rendition}
+        pub.send_multipart(encode_message(frame_topic(stream_id, rendition), metadata, b"jpeg"))
+
+    yield endpoint, send
+    pub.close()
+
+
+def connected(client, send):
+    # The "probe" stream is subscribed together with the others; once it
+    # arrives, every subscription has reached the publisher.
+    for _ in range(50):
+        send("probe", 1)
+        if client.recv(timeout=0.1) is not None:
+            return
+    raise AssertionError("subscription never propagated")
+
+
+def test_latest_only_conflates_and_queues_overflow(hub):
+    endpoint, send = hub
+    client = HubClient(endpoint, {"probe": None, "cam1": None, "cam2": {"latest_only": False}},
+                       decode=False, max_queue=3)
+    try:
+        connected(client, send)
+        for frame_id in range(1, 6):
+            send("cam1", frame_id)
+        for frame_id in range(1, 6):
+            send("cam2", frame_id)
+        send("cam2", 5)                   # a repeat, e.g. a cache replay
+        send("cam1", 9, rendition="360p")  # not the subscribed rendition
+        time.sleep(0.3)  # everything queued before the client drains once
+
+        delivered = [(frame.stream_id, frame.frame_id) for frame in iter(lambda: client.recv(timeout=0.3), None)]
+        stats = client.stats()
+    finally:
+        client.close()
+
+    # cam1 keeps only its newest frame; cam2 keeps the newest max_queue, in order.
+    assert delivered == [("cam1", 5), ("cam2", 3), ("cam2", 4), ("cam2", 5)]
+    cam1, cam2 = stats["cam1"]["counters"], stats["cam2"]["counters"]
+    assert (cam1["received"], cam1["delivered"], cam1["conflated"], cam1["dropped"]) == (5, 1, 4, 4)
+    assert (cam2["received"], cam2["delivered"], cam2["overflow"], cam2["dropped"]) == (5, 3, 2, 2)
+    assert cam2["repeats"] == 1
+    assert cam1["overflow"] == cam2["conflated"] == 0
+
+
+def test_unsubscribed_stream_is_no_longer_delivered(hub):
+    endpoint, send = hub
+    client = HubClient(endpoint, ["probe", "cam1"], decode=False)
+    try:
+        connected(client, send)
+        client.unsubscribe("cam1")
+        send("cam1", 1)
+        send("probe", 2)
+        frame = client.recv(timeout=1.0)
+    finally:
+        client.close()
+
+    assert (frame.stream_id, frame.frame_id) == ("probe", 2)
+    assert "cam1" not in client.stats()
@@ -0,0 +1,91 @@
+import socket
+
+import pytest
+import zmq
+
+from stream_hub.ingestion.clip_buffer import ClipBuffer, ClipServer, fetch_clip
+from stream_hub.network.wire import decode_bundle, encode_header
+
+
+def free_endpoint():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"tcp://127.0.0.1:{s.getsockname()[1]}"
+
+
+def test_buffer_trims_by_age():
+    buffer = ClipBuffer("cam1", seconds=1.0, max_bytes=1 << 20)
+    for i in range(5):
+        buffer.add(10.0 + i * 0.5, {"frame_id": i}, b"x" * 10)
+
+    assert buffer.info()["start"] == 11.0
+    assert [item[1]["frame_id"] for item in buffer.range(11.0, 11.5)] == [2, 3]
+
+
+def test_buffer_trims_by_bytes():
+    buffer = ClipBuffer("cam1", seconds=60, max_bytes=25)
+    for i in range(5):
+        buffer.add(10.0 + i, {"frame_id": i}, b"x" * 10)
+
+    assert buffer.info()["frames"] == 2
+    assert buffer.info()["bytes"] == 20
+
+
+@pytest.fixture
+def server():
+    endpoint = free_endpoint()
+    server = ClipServer(
+        {"enabled": True, "endpoint": endpoint, "seconds": 5},
+        [{"id": "cam1", "source": "synthetic://"}],
+        free_endpoint(),
+    )
+    server.start()
+    yield endpoint
+    server.stop()
+
+
+def request(endpoint, body: bytes):
+    sock = zmq.Context.instance().socket(zmq.REQ)
+    sock.setsockopt(zmq.LINGER, 0)
+    sock.RCVTIMEO = 2000
+    sock.connect(endpoint)
+    try:
+        sock.send(body)
+        _, header, _ = decode_bundle(sock.recv_multipart(copy=False))
+        return header
+    finally:
+        sock.close()
+
+
+@pytest.mark.parametrize("body", [
+    encode_header([1]),
+    encode_header("x"),
+    encode_header({"op": "clip", "stream_id": "cam1", "start": [1]}),
+    encode_header({"op": "clip", "stream_id": "cam1", "end": {"t": 1}}),
+    b"\x01not json",
+    b"",
+])
+def test_malformed_request_keeps_server_running(server, body):
+    assert "error" in request(server, body)
+
+    # The next, valid request is still served.
+    header = request(server, encode_header({"op": "info"}))
+    assert header["streams"]["cam1"]["frames"] == 0
+    clip, payloads = fetch_clip(server, "cam1", timeout=2)
+    assert clip["count"] == 0 and payloads == []
+
+
+def test_unknown_stream_is_an_error(server):
+    with pytest.raises(ValueError):
+        fetch_clip(server, "cam9", timeout=2)
+
+
+def test_buffer_skips_frames_not_newer_than_tail():
+    buffer = ClipBuffer("cam1", seconds=1.0, max_bytes=1 << 20)
+    buffer.add(10.0, {"frame_id": 1}, b"x")
+    buffer.add(10.5, {"frame_id": 2}, b"x")
+    buffer.add(7.0, {"frame_id": 0}, b"x")      # e.g. a replayed, older frame
+    buffer.add(10.5, {"frame_id": 2}, b"x")     # a repeat
+
+    assert [item[1]["frame_id"] for item in buffer.range(0, 20)] == [1, 2]
+    assert buffer.info()["start"] == 10.0
@@ -0,0 +1,30 @@
+import numpy as np
+
+from stream_hub.ingestion.frame_encoder import FrameEncoder
+
+
+def frame():
+    image = np.zeros((32, 48, 3), dtype=np.uint8)
+    image[8:24, 12:36] = (0, 128, 255)
+    return image
+
+
+def test_instance_round_trip():
+    encoder = FrameEncoder.from_config({"backend": "opencv"})
+    jpeg = encoder.encode(frame(), 90)
+
+    assert isinstance(jpeg, memoryview)
+    assert encoder.decode(jpeg).shape == (32, 48, 3)
+
+
+def test_static_calls_still_work():
+    jpeg = FrameEncoder.encode(frame())
+
+    assert isinstance(jpeg, bytes)
+    assert FrameEncoder.decode(jpeg).shape == (32, 48, 3)
+
+
+def test_empty_input():
+    encoder = FrameEncoder()
+    assert encoder.encode(np.zeros((0, 0, 3), dtype=np.uint8)) is None
+    assert FrameEncoder.decode(b"") is None
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from stream_hub.ingestion.frame_pacer import FramePacer
+
+
+class FakeClock:
+    """Capture timestamps of a camera running at ``fps`` with optional jitter."""
+
+    def __init__(self, fps, jitter=0.0, start=1000.0, seed=7):
+        self.interval = 1.0 / fps
+        self.jitter = jitter
+        self.now = start
+        self.random = random.Random(seed)
+
+    def tick(self):
+        self.now += self.interval
+        return self.now + self.random.uniform(-self.jitter, self.jitter)
+
+    def stall(self, seconds):
+        self.now += seconds
+
+
+def count_due(pacer, clock, frames):
+    return sum(pacer.due(clock.tick()) for _ in range(frames))
+
+
+def test_halves_a_faster_camera():
+    pacer, clock = FramePacer(15), FakeClock(30)
+    assert count_due(pacer, clock, 300) == 150
+
+
+def test_jitter_does_not_halve_a_matching_camera():
+    pacer, clock = FramePacer(30), FakeClock(30, jitter=0.004)
+    assert count_due(pacer, clock, 300) == 300
+
+
+def test_slower_camera_passes_every_frame():
+    pacer, clock = FramePacer(30), FakeClock(10)
+    assert count_due(pacer, clock, 50) == 50
+
+
+def test_stall_restarts_the_grid_without_a_burst():
+    pacer, clock = FramePacer(10), FakeClock(30)
+    count_due(pacer, clock, 30)
+    clock.stall(5.0)
+    # After the stall, the first frame is due and the next two are paced out.
+    assert [pacer.due(clock.tick()) for _ in range(6)] == [True, False, False, True, False, False]
+
+
+def test_set_fps_and_reset():
+    pacer, clock = FramePacer(30), FakeClock(30)
+    pacer.set_fps(10)
+    assert pacer.fps == 10
+    assert count_due(pacer, clock, 90) == 30
+
+    pacer.reset()
+    assert pacer.due(0.0)
+    with pytest.raises(ValueError):
+        pacer.set_fps(0)
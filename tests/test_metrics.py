@@ -0,0 +1,72 @@
+import re
+
+import pytest
+
+from stream_hub.utils.metrics import Histogram, StreamMetrics, render_prometheus
+
+_SAMPLE = re.compile(r'^(?P<name>[a-z_]+)(?:\{(?P<labels>[^}]*)\})? (?P<value>\S+)$')
+
+
+def parse_prometheus(text):
+    """``{(name, frozenset(labels)): value}`` plus ``{name: type}`` from exposition text."""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split()
+            types[name] = kind
+            continue
+        match = _SAMPLE.match(line)
+        assert match, f"unparseable line: {line!r}"
+        labels = frozenset(re.findall(r'(\w+)="([^"]*)"', match["labels"] or ""))
+        samples[match["name"], labels] = float(match["value"])
+    return samples, types
+
+
+def test_histogram_quantiles_report_bucket_upper_bounds():
+    histogram = Histogram(buckets=(1, 2, 5))
+    assert histogram.quantile(0.5) is None
+
+    for value in [0.5] * 50 + [1.5] * 49 + [10]:
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 1
+    assert histogram.quantile(0.99) == 2
+    assert histogram.quantile(1.0) == float("inf")
+    snapshot = histogram.snapshot()
+    assert snapshot["counts"] == [50, 49, 0, 1]
+    assert snapshot["count"] == 100 and snapshot["sum"] == pytest.approx(108.5)
+    assert (snapshot["p50"], snapshot["p99"]) == (1, 2)
+
+
+def test_histogram_bounds_are_inclusive():
+    histogram = Histogram(buckets=(1, 2))
+    histogram.observe(1)
+    histogram.observe(2)
+    assert histogram.counts == [1, 1, 0]
+
+
+def test_prometheus_text_round_trips_counter_gauge_and_histogram():
+    metrics = StreamMetrics("cam1")
+    metrics.inc("frames_published", 3)
+    metrics.set_gauge("quality", 72)
+    for value in (0.3, 4, 4, 700):
+        metrics.observe("encode", value)
+
+    samples, types = parse_prometheus(render_prometheus([metrics.snapshot()]))
+
+    stream = ("stream", "cam1")
+    assert types["stream_hub_frames_published_total"] == "counter"
+    assert samples["stream_hub_frames_published_total", frozenset({stream})] == 3
+
+    assert types["stream_hub_quality"] == "gauge"
+    assert samples["stream_hub_quality", frozenset({stream})] == 72
+
+    assert types["stream_hub_stage_latency_ms"] == "histogram"
+    encode = {stream, ("stage", "encode")}
+    bucket = "stream_hub_stage_latency_ms_bucket"
+    assert samples[bucket, frozenset(encode | {("le", "0.5")})] == 1
+    assert samples[bucket, frozenset(encode | {("le", "5")})] == 3
+    assert samples[bucket, frozenset(encode | {("le", "500")})] == 3
+    assert samples[bucket, frozenset(encode | {("le", "+Inf")})] == 4
+    assert samples["stream_hub_stage_latency_ms_count", frozenset(encode)] == 4
+    assert samples["stream_hub_stage_latency_ms_sum", frozenset(encode)] == pytest.approx(708.3)
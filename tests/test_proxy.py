@@ -0,0 +1,168 @@
+import socket
+import time
+
+import pytest
+import zmq
+
+from stream_hub.network.proxy import ZmqHubProxy, parse_shards
+from stream_hub.network.wire import decode_message, encode_message, frame_topic
+
+
+def free_endpoint():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"tcp://127.0.0.1:{s.getsockname()[1]}"
+
+
+@pytest.fixture
+def hub():
+    hub_endpoint, proxy_endpoint = free_endpoint(), free_endpoint()
+    proxy = ZmqHubProxy(hub_endpoint, proxy_endpoint, last_value_cache=True, name="test")
+    proxy.start()
+    assert proxy.wait_ready(2)
+
+    ctx = zmq.Context.instance()
+    pub = ctx.socket(zmq.PUB)
+    pub.setsockopt(zmq.LINGER, 0)
+    pub.connect(proxy_endpoint)
+    sockets = [pub]
+
+    def subscriber(topic):
+        sub = ctx.socket(zmq.SUB)
+        sub.setsockopt(zmq.LINGER, 0)
+        sub.setsockopt_string(zmq.SUBSCRIBE, topic)
+        sub.connect(hub_endpoint)
+        sockets.append(sub)
+        return sub
+
+    yield pub, subscriber
+    for sock in sockets:
+        sock.close()
+    proxy.stop()
+
+
+def receive(sub, timeout=2000):
+    if not sub.poll(timeout):
+        return None
+    return decode_message(sub.recv_multipart())
+
+
+def publish_until_received(pub, sub, topic, metadata):
+    # The first messages are lost until the subscription reaches the publisher.
+    for _ in range(50):
+        pub.send_multipart(encode_message(topic, metadata, b"jpeg"))
+        message = receive(sub, 100)
+        if message is not None:
+            return message
+    raise AssertionError("subscription never propagated")
+
+
+def test_late_joiner_gets_flagged_replay(hub):
+    pub, subscriber = hub
+    topic = frame_topic("cam1")
+    first = subscriber("frame/cam1/")
+    _, live, _ = publish_until_received(pub, first, topic, {"stream_id": "cam1", "frame_id": 7, "timestamp": 1.0})
+    assert "replayed" not in live
+    while receive(first, 200) is not None:
+        pass
+
+    late = subscriber("frame/cam1/")
+    _, replay, payload = receive(late)
+    assert replay["frame_id"] == 7
+    assert replay["replayed"] is True
+    assert bytes(payload) == b"jpeg"
+
+    # The existing subscriber sees the same replay, flagged, not as a live frame.
+    _, repeat, _ = receive(first)
+    assert repeat["replayed"] is True
+
+
+def test_parse_shards_assigns_streams():
+    shards = parse_shards(
+        {"shards": [{"name": "s1", "hub_endpoint": "tcp://*:1", "proxy_endpoint": "tcp://*:2", "streams": ["b"]}]},
+        [{"id": "a"}, {"id": "b"}],
+    )
+    assert [shard["streams"] for shard in shards] == [["a"], ["b"]]
+
+
+def test_parse_shards_rejects_double_assignment():
+    shard = {"hub_endpoint": "tcp://*:1", "proxy_endpoint": "tcp://*:2", "streams": ["a"]}
+    with pytest.raises(ValueError):
+        parse_shards({"shards": [dict(shard, name="s1"), dict(shard, name="s2")]}, [{"id": "a"}])
+
+
+def test_burst_is_forwarded_in_order(hub):
+    pub, subscriber = hub
+    topic = frame_topic("cam2")
+    sub = subscriber("frame/cam2/")
+    publish_until_received(pub, sub, topic, {"stream_id": "cam2", "frame_id": -1, "timestamp": 1.0})
+
+    for i in range(500):
+        pub.send_multipart(encode_message(topic, {"stream_id": "cam2", "frame_id": i, "timestamp": 1.0}, b"x"))
+    received = []
+    while len(received) < 500:
+        message = receive(sub)
+        assert message is not None, f"only {len(received)} of 500 forwarded"
+        if message[1]["frame_id"] >= 0:
+            received.append(message[1]["frame_id"])
+    assert received == list(range(500))
+
+
+def test_replay_drops_trace_frame(hub):
+    from stream_hub.network.wire import encode_trace
+
+    pub, subscriber = hub
+    topic = frame_topic("cam3")
+    first = subscriber("frame/cam3/")
+    trace = encode_trace(1.0, (("publish", 2.0),))
+    metadata = {"stream_id": "cam3", "frame_id": 1, "timestamp": 1.0}
+    for _ in range(50):
+        pub.send_multipart(encode_message(topic, metadata, b"jpeg") + [trace])
+        if first.poll(100):
+            live = first.recv_multipart()
+            break
+    assert len(live) == 4  # topic, header, payload, trace (+ proxy hop)
+
+    late = subscriber("frame/cam3/")
+    assert late.poll(2000)
+    replay = late.recv_multipart()
+    assert len(replay) == 3
+    assert decode_message(replay)[1]["replayed"] is True
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+@pytest.mark.parametrize("last_value_cache", [True, False])
+def test_last_unsubscribe_reaches_worker(last_value_cache):
+    from stream_hub.network.zmq_handler import ZmqHandler
+
+    hub_endpoint, proxy_endpoint = free_endpoint(), free_endpoint()
+    proxy = ZmqHubProxy(hub_endpoint, proxy_endpoint, last_value_cache=last_value_cache, name="unsub")
+    proxy.start()
+    assert proxy.wait_ready(2)
+    worker = ZmqHandler(proxy_endpoint, None)
+    worker.initialize_runtime()
+    topic = frame_topic("cam1")
+    try:
+        subs = []
+        for _ in range(2):
+            sub = zmq.Context.instance().socket(zmq.SUB)
+            sub.setsockopt(zmq.LINGER, 0)
+            sub.setsockopt_string(zmq.SUBSCRIBE, topic)
+            sub.connect(hub_endpoint)
+            subs.append(sub)
+        assert wait_for(lambda: worker.has_subscribers(topic))
+
+        for sub in subs:
+            sub.close()
+        assert wait_for(lambda: not worker.has_subscribers(topic))
+    finally:
+        worker.close()
+        proxy.stop()
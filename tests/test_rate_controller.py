@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from stream_hub.ingestion.rate_controller import RateController
+from stream_hub.ingestion.stream_manager import with_adaptive
+
+BUDGET_KBPS = 1000
+HEAVY = 200_000   # bytes per 1 s window: 1600 kbps, over budget
+LIGHT = 10_000    # 80 kbps, well under the 75% headroom
+
+
+class Windows:
+    """Drives a controller one 1 s window at a time on a fake clock."""
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.now = time.monotonic() + 0.01
+
+    def run(self, nbytes, frames=10, sent=True):
+        for i in range(frames):
+            self.controller.record(nbytes // frames, 1.0, sent or i > 0)
+            self.controller.frame_done()
+        self.now += 1.0
+        return self.controller.update(self.now)
+
+
+@pytest.fixture
+def controller():
+    return RateController(
+        {"enabled": True, "bitrate_kbps": BUDGET_KBPS, "recover_windows": 2}, fps=30, max_quality=90,
+    )
+
+
+def test_degrades_quality_then_scale_then_fps(controller):
+    windows = Windows(controller)
+
+    for _ in range(5):
+        assert not windows.run(HEAVY)
+    assert controller.quality(90) == 40
+    assert controller.scale == 1.0
+
+    for _ in range(2):
+        assert not windows.run(HEAVY)
+    assert controller.scale == 0.5
+    assert controller.fps == 30
+
+    assert windows.run(HEAVY)
+    assert controller.fps == 22.5
+
+    while windows.run(HEAVY):
+        pass
+    assert controller.fps == 5
+    assert controller.state()["adaptive_quality_drop"] == 50
+
+
+def test_restores_in_reverse_order(controller):
+    windows = Windows(controller)
+    for _ in range(20):
+        windows.run(HEAVY)
+    assert (controller.fps, controller.scale, controller.quality(90)) == (5, 0.5, 40)
+
+    # One step per `recover_windows` good windows, fps first.
+    assert not windows.run(LIGHT)
+    assert windows.run(LIGHT)
+    while controller.fps < 30:
+        windows.run(LIGHT)
+    assert (controller.scale, controller.quality(90)) == (0.5, 40)
+
+    while controller.scale < 1.0:
+        windows.run(LIGHT)
+    assert controller.quality(90) == 40
+
+    for _ in range(10):
+        windows.run(LIGHT)
+    assert controller.quality(90) == 90
+
+
+def test_hwm_drop_degrades_even_under_budget(controller):
+    windows = Windows(controller)
+    windows.run(LIGHT, sent=False)
+    assert controller.quality(90) == 80
+
+
+def test_empty_window_and_headroom_band_hold_state(controller):
+    windows = Windows(controller)
+    windows.run(HEAVY)
+    assert controller.quality(90) == 80
+
+    windows.run(0, frames=0)
+    # 800 kbps: under budget but above 75% headroom, so no recovery either.
+    for _ in range(5):
+        windows.run(100_000)
+    assert controller.quality(90) == 80
+
+
+def test_hub_budget_is_split_evenly_and_stream_overrides_win():
+    hub = {"enabled": True, "bitrate_kbps": 4000, "hub_bitrate_kbps": 6000}
+
+    split = with_adaptive({"id": "cam1"}, hub, 3)
+    assert split["adaptive"] == {"enabled": True, "bitrate_kbps": 2000}
+
+    # The per-stream default stays the cap when the share is larger.
+    assert with_adaptive({"id": "cam1"}, hub, 1)["adaptive"]["bitrate_kbps"] == 4000
+
+    override = with_adaptive({"id": "cam1", "adaptive": {"bitrate_kbps": 9000}}, hub, 3)
+    assert override["adaptive"]["bitrate_kbps"] == 9000
+
+
+def test_streams_without_adaptive_config_are_untouched():
+    cfg = {"id": "cam1"}
+    assert with_adaptive(cfg, {}, 4) is cfg
@@ -0,0 +1,52 @@
+import pytest
+
+from stream_hub.ingestion.roi import RoiExtractor, parse_box
+
+W, H = 640, 480
+
+
+@pytest.mark.parametrize("target, box", [
+    ([0.25, 0.5, 0.75, 1.0], (160, 240, 480, 480)),
+    ({"x1": 0.0, "y1": 0.0, "x2": 0.5, "y2": 0.5}, (0, 0, 320, 240)),
+    ({"x": 0.1, "y": 0.1, "w": 0.2, "h": 0.2}, (64, 48, 192, 144)),
+])
+def test_normalised_boxes_scale_to_the_frame(target, box):
+    assert parse_box(target, W, H) == box
+
+
+@pytest.mark.parametrize("target, box", [
+    ([10, 20, 110, 220], (10, 20, 110, 220)),
+    ({"bbox": [10, 20, 110, 220]}, (10, 20, 110, 220)),
+    ({"x": 10, "y": 20, "w": 100, "h": 200}, (10, 20, 110, 220)),
+    ((110, 220, 10, 20), (10, 20, 110, 220)),
+])
+def test_pixel_boxes_in_every_form(target, box):
+    assert parse_box(target, W, H) == box
+
+
+def test_boxes_are_clamped_to_the_frame():
+    assert parse_box([-50, -10, 700, 500], W, H) == (0, 0, W, H)
+    assert parse_box([-0.5, 0.5, 0.5, 1.0], W, H) == (0, 240, 320, 480)
+
+
+@pytest.mark.parametrize("target", [
+    None, "box", [1, 2, 3], {"x": 1}, ["a", 0, 1, 1],
+    [10, 10, 11, 50],       # narrower than 2 px
+    [700, 500, 800, 600],   # entirely outside the frame
+])
+def test_unusable_targets_are_skipped(target):
+    assert parse_box(target, W, H) is None
+
+
+def test_extractor_pads_filters_and_expires():
+    roi = RoiExtractor({"enabled": True, "feedback": "perception", "events": ["person"],
+                        "padding": 0.1, "max_age_ms": 500, "max_regions": 1})
+    events = {"perception": {"data": "person", "target": [[100, 100, 200, 200], [300, 300, 400, 400]],
+                             "timestamp": 10.0}}
+
+    assert roi.regions(events, (H, W, 3), 10.2) == [(90, 90, 210, 210)]
+    assert roi.regions(events, (H, W, 3), 10.6) == []
+
+    events["perception"]["data"] = "car"
+    assert roi.regions(events, (H, W, 3), 10.2) == []
+    assert roi.regions({"perception": {"data": None, "target": None, "timestamp": None}}, (H, W, 3), 10.2) == []
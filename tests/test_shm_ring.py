@@ -0,0 +1,98 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from stream_hub.ingestion.shm_ring import SharedFrameReader, SharedFrameRing
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing(f"stream_hub_test_{uuid.uuid4().hex[:8]}", slots=3, slot_capacity=4 * 6 * 3 * 4)
+    yield ring
+    ring.close()
+
+
+@pytest.fixture
+def reader(ring):
+    reader = SharedFrameReader(ring.name)
+    yield reader
+    reader.close()
+
+
+def frame(value, shape=(4, 6, 3), dtype=np.uint8):
+    return np.full(shape, value, dtype=dtype)
+
+
+def test_round_trip(ring, reader):
+    slot, generation = ring.write(frame(7), frame_id=1, ts=1.5)
+
+    out = reader.read(slot, generation)
+    assert out.shape == (4, 6, 3)
+    assert out.dtype == np.uint8
+    assert (out == 7).all()
+    assert reader.is_valid(slot, generation)
+
+
+@pytest.mark.parametrize("shape,dtype", [((3, 4, 6), np.float32), ((4, 6, 3), np.float16)])
+def test_round_trip_other_dtypes(ring, reader, shape, dtype):
+    tensor = np.arange(np.prod(shape), dtype=dtype).reshape(shape)
+    slot, generation = ring.write(tensor, frame_id=1, ts=0.0)
+
+    out = reader.read(slot, generation, tensor.dtype.name)
+    assert out.shape == shape
+    assert out.dtype == dtype
+    np.testing.assert_array_equal(out, tensor)
+
+
+def test_generation_is_even_and_grows_per_slot(ring):
+    first = [ring.write(frame(i), i, 0.0) for i in range(3)]
+    second = [ring.write(frame(i), i, 0.0) for i in range(3)]
+
+    assert [slot for slot, _ in first] == [0, 1, 2]
+    assert all(generation % 2 == 0 for _, generation in first + second)
+    assert all(g2 > g1 for (_, g1), (_, g2) in zip(first, second))
+
+
+def test_writer_wraps_around(ring, reader):
+    writes = [ring.write(frame(i), i, float(i)) for i in range(4)]
+
+    # The 4th write reused slot 0; slots 1 and 2 still hold frames 1 and 2.
+    assert writes[3][0] == writes[0][0] == 0
+    assert reader.read(*writes[0]) is None
+    assert (reader.read(*writes[3]) == 3).all()
+    assert (reader.read(*writes[1]) == 1).all()
+    assert (reader.read(*writes[2]) == 2).all()
+
+
+def test_is_valid_detects_overwrite_while_in_use(ring, reader):
+    slot, generation = ring.write(frame(1), 1, 0.0)
+    view = reader.read(slot, generation)
+    assert (view == 1).all()
+
+    for i in range(3):
+        ring.write(frame(10 + i), 10 + i, 0.0)
+
+    assert not reader.is_valid(slot, generation)
+    # The view aliases shared memory, so it now shows the newer frame.
+    assert (view == 12).all()
+    del view
+
+
+def test_reader_rejects_bad_slot(ring, reader):
+    ring.write(frame(1), 1, 0.0)
+    assert reader.read(5, 2) is None
+    assert not reader.is_valid(-1, 2)
+
+
+def test_write_validates_input(ring):
+    with pytest.raises(ValueError):
+        ring.write(np.zeros((4, 6), dtype=np.uint8), 1, 0.0)
+    with pytest.raises(ValueError):
+        ring.write(np.zeros((100, 100, 3), dtype=np.uint8), 1, 0.0)
+
+
+def test_ring_needs_two_slots():
+    with pytest.raises(ValueError):
+        SharedFrameRing(f"stream_hub_test_{uuid.uuid4().hex[:8]}", slots=1, slot_capacity=16)
+
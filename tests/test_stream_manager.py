@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from stream_hub.ingestion.stream_manager import StreamManager, plan_reload
+
+
+def test_plan_reload_splits_added_removed_updated_and_restarted():
+    old = {
+        "same": {"id": "same", "source": "a"},
+        "fps": {"id": "fps", "source": "b", "fps": 15},
+        "shm": {"id": "shm", "source": "c", "shm": {"enabled": False}},
+        "shard": {"id": "shard", "source": "d", "proxy_endpoint": "tcp://127.0.0.1:1"},
+        "gone": {"id": "gone", "source": "e"},
+    }
+    new = {
+        "same": {"id": "same", "source": "a"},
+        "fps": {"id": "fps", "source": "b", "fps": 10},
+        "shm": {"id": "shm", "source": "c", "shm": {"enabled": True}},
+        "shard": {"id": "shard", "source": "d", "proxy_endpoint": "tcp://127.0.0.1:2"},
+        "new": {"id": "new", "source": "f"},
+    }
+
+    added, removed, updated, restart = plan_reload(old, new)
+
+    assert added == ["new"]
+    assert removed == ["gone"]
+    assert updated == ["fps"]
+    assert restart == ["shm", "shard"]
+    assert plan_reload(old, old) == ([], [], [], [])
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+@pytest.fixture
+def manager():
+    stream = {"id": "cam1", "source": "synthetic://64x48@30", "fps": 15, "renditions": ["full@80"]}
+    manager = StreamManager([stream], proxy="tcp://127.0.0.1:1", feedback=None, startup_timeout=0)
+    manager.start()
+    assert manager.wait_live(timeout=30)
+    yield manager, stream
+    manager.stop()
+
+
+def test_reload_records_a_config_only_once_the_worker_accepts_it(manager):
+    manager, stream = manager
+    assert manager.stream_configs()["cam1"]["fps"] == 15
+
+    manager.reload([{**stream, "fps": 10}])
+    assert wait_for(lambda: manager.stream_configs()["cam1"]["fps"] == 10)
+
+    # Rejected by the worker (quality out of range): the accepted config stays.
+    manager.reload([{**stream, "fps": 11, "renditions": ["full@500"]}])
+    assert not wait_for(lambda: manager.stream_configs()["cam1"]["fps"] != 10, timeout=1.5)
+
+    # Updates are acknowledged in order; the next valid one is recorded.
+    manager.reload([{**stream, "fps": 12}])
+    assert wait_for(lambda: manager.stream_configs()["cam1"]["fps"] == 12)
+    assert manager.stream_configs()["cam1"]["renditions"] == ["full@80"]
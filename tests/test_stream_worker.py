@@ -0,0 +1,88 @@
+import socket
+import time
+from threading import Thread
+
+import pytest
+import zmq
+
+from stream_hub.ingestion.stream_worker_process import StreamProcessWorker
+from stream_hub.network.proxy import ZmqHubProxy
+from stream_hub.network.wire import decode_message, frame_topic, stats_topic
+
+
+def free_endpoint():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"tcp://127.0.0.1:{s.getsockname()[1]}"
+
+
+@pytest.fixture
+def running_worker():
+    hub_endpoint, proxy_endpoint = free_endpoint(), free_endpoint()
+    proxy = ZmqHubProxy(hub_endpoint, proxy_endpoint, last_value_cache=False, name="worker")
+    proxy.start()
+    assert proxy.wait_ready(2)
+
+    worker = StreamProcessWorker(
+        {"id": "cam1", "source": "synthetic://64x48@30", "fps": 30},
+        proxy_endpoint,
+        feedbacks={},
+        reconnect_delay=0,
+        metrics_cfg={"interval_sec": 0.1},
+    )
+    thread = Thread(target=worker.run, daemon=True)
+    thread.start()
+
+    ctx = zmq.Context.instance()
+    sockets = []
+
+    def subscriber(topic):
+        sub = ctx.socket(zmq.SUB)
+        sub.setsockopt(zmq.LINGER, 0)
+        sub.setsockopt_string(zmq.SUBSCRIBE, topic)
+        sub.connect(hub_endpoint)
+        sockets.append(sub)
+        return sub
+
+    yield subscriber
+    worker.stop()
+    thread.join(timeout=3)
+    for sock in sockets:
+        sock.close()
+    proxy.stop()
+
+
+def next_counters(stats_sub, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if stats_sub.poll(100):
+            _, snapshot, _ = decode_message(stats_sub.recv_multipart())
+            return snapshot["counters"]
+    raise AssertionError("no stats snapshot received")
+
+
+def wait_counters(stats_sub, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    counters = next_counters(stats_sub)
+    while not condition(counters):
+        if time.monotonic() > deadline:
+            raise AssertionError(f"counters never matched: {counters}")
+        counters = next_counters(stats_sub)
+    return counters
+
+
+def test_worker_encodes_only_while_subscribed(running_worker):
+    stats = running_worker(stats_topic("cam1"))
+    idle = wait_counters(stats, lambda c: c.get("frames_unsubscribed", 0) >= 3)
+    assert idle.get("frames_published", 0) == 0
+
+    frames = running_worker(frame_topic("cam1"))
+    assert frames.poll(3000), "no frame published after subscribing"
+    _, metadata, jpeg = decode_message(frames.recv_multipart())
+    assert metadata["stream_id"] == "cam1" and bytes(jpeg[:2]) == b"\xff\xd8"
+
+    frames.close()
+    # Once the unsubscribe has propagated, published stops and skipped grows.
+    settled = wait_counters(stats, lambda c: c.get("frames_unsubscribed", 0) > idle["frames_unsubscribed"] + 3)
+    later = wait_counters(stats, lambda c: c.get("frames_unsubscribed", 0) > settled["frames_unsubscribed"] + 3)
+    assert later["frames_published"] == settled["frames_published"] > 0
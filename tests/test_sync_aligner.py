@@ -0,0 +1,110 @@
+import pytest
+
+from stream_hub.ingestion.sync_aligner import SyncGroup
+
+
+def group(**cfg):
+    return SyncGroup({"id": "g", "streams": ["a", "b"], "tolerance_ms": 20, "max_wait_ms": 100, **cfg})
+
+
+def add(g, stream_id, ts, frame_id=0):
+    g.add(stream_id, ts, {"frame_id": frame_id, "timestamp": ts}, b"")
+
+
+def test_needs_two_streams():
+    with pytest.raises(ValueError):
+        SyncGroup({"id": "g", "streams": ["a"]})
+
+
+def test_rejects_unknown_late_policy():
+    with pytest.raises(ValueError):
+        group(late_policy="wait")
+
+
+def test_matches_within_tolerance():
+    g = group()
+    add(g, "a", 10.000)
+    assert g.align() is None
+
+    add(g, "b", 10.015)
+    anchor, chosen, missing = g.align()
+    assert anchor == 10.000
+    assert chosen["a"][0] == 10.000
+    assert chosen["b"][0] == 10.015
+    assert missing == []
+    assert not any(g.pending.values())
+
+
+def test_picks_nearest_frame_to_anchor():
+    g = group()
+    for ts in (10.000, 10.033, 10.066):
+        add(g, "a", ts)
+    add(g, "b", 10.040)
+
+    anchor, chosen, _ = g.align()
+    assert anchor == 10.040
+    assert chosen["a"][0] == 10.033
+    # Frames up to the chosen one are consumed; later ones stay for the next bundle.
+    assert [item[0] for item in g.pending["a"]] == [10.066]
+    assert not g.pending["b"]
+
+
+def test_drops_oldest_frame_on_skew():
+    g = group()
+    add(g, "a", 10.000)
+    add(g, "b", 10.100)
+    assert g.align() is None
+    assert g.stats["frames_unmatched"] == 1
+    assert not g.pending["a"]
+    assert [item[0] for item in g.pending["b"]] == [10.100]
+
+    add(g, "a", 10.110)
+    anchor, chosen, _ = g.align()
+    assert anchor == 10.100
+    assert chosen["a"][0] == 10.110
+
+
+def test_expire_waits_for_max_wait():
+    g = group(late_policy="partial")
+    add(g, "a", 10.000)
+    assert g.expire(10.050) is None
+    assert g.pending["a"]
+
+
+def test_expire_drop_policy_discards_waiting_frames():
+    g = group(late_policy="drop")
+    add(g, "a", 10.000)
+    add(g, "a", 10.033)
+
+    assert g.expire(10.200) is None
+    assert not g.pending["a"]
+    assert g.stats["frames_late"] == 2
+
+
+def test_expire_partial_policy_publishes_without_late_member():
+    g = group(late_policy="partial")
+    add(g, "a", 10.000, frame_id=1)
+    add(g, "a", 10.033, frame_id=2)
+
+    anchor, chosen, missing = g.expire(10.200)
+    assert anchor == 10.000
+    assert list(chosen) == ["a"]
+    assert chosen["a"][1]["frame_id"] == 1
+    assert missing == ["b"]
+    assert g.stats["partial_bundles"] == 1
+    # The next waiting frame expires on its own.
+    assert [item[0] for item in g.pending["a"]] == [10.033]
+
+
+def test_expire_ignores_complete_sets():
+    g = group(late_policy="partial")
+    add(g, "a", 10.000)
+    add(g, "b", 10.500)
+    # Every member has a frame: align() decides, not expire().
+    assert g.expire(20.0) is None
+
+
+def test_tensor_group_uses_tensor_topics():
+    g = group(tensor="yolo")
+    assert g.topic == "batch/g"
+    assert set(g.member_topics) == {"tensor/a/yolo", "tensor/b/yolo"}
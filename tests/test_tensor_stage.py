@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from stream_hub.ingestion.tensor_stage import TensorSpec, parse_tensors, tensor_from_message
+
+
+def frame(h=480, w=640):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def test_letterbox_chw_float():
+    image = frame()
+    tensor, transform = TensorSpec({"name": "yolo", "width": 640, "height": 640}).apply(image)
+
+    assert tensor.shape == (3, 640, 640)
+    assert tensor.dtype == np.float32
+    assert tensor.flags.c_contiguous
+    assert transform == {"scale_x": 1.0, "scale_y": 1.0, "pad_x": 0, "pad_y": 80}
+    expected = image[:, :, ::-1].transpose(2, 0, 1) / 255.0
+    np.testing.assert_allclose(tensor[:, 80:560], expected, atol=1e-6)
+    np.testing.assert_allclose(tensor[:, :80], 114 / 255.0, atol=1e-6)
+
+
+def test_stretch_hwc_mean_std():
+    spec = TensorSpec({
+        "width": 32, "height": 16, "resize": "stretch", "layout": "hwc", "dtype": "float16",
+        "mean": [0.5, 0.5, 0.5], "std": [0.25, 0.25, 0.25],
+    })
+    tensor, transform = spec.apply(np.full((64, 64, 3), 255, dtype=np.uint8))
+
+    assert tensor.shape == (16, 32, 3)
+    assert tensor.dtype == np.float16
+    assert transform["scale_x"] == 0.5 and transform["scale_y"] == 0.25
+    np.testing.assert_allclose(tensor, 2.0, atol=1e-3)
+
+
+def test_uint8_keeps_pixels():
+    image = frame(16, 16)
+    tensor, _ = TensorSpec({"width": 16, "height": 16, "dtype": "uint8", "color": "bgr", "layout": "hwc"}).apply(image)
+
+    assert tensor.dtype == np.uint8
+    np.testing.assert_array_equal(tensor, image)
+
+
+@pytest.mark.parametrize("key,value", [("scale", 0.5), ("mean", [1, 2, 3]), ("std", [2, 2, 2])])
+def test_uint8_rejects_normalisation(key, value):
+    with pytest.raises(ValueError):
+        TensorSpec({"width": 16, "height": 16, "dtype": "uint8", key: value})
+
+
+@pytest.mark.parametrize("cfg", [
+    {"width": 16, "height": 16, "resize": "crop"},
+    {"width": 16, "height": 16, "layout": "nchw"},
+    {"width": 16, "height": 16, "dtype": "int32"},
+])
+def test_rejects_unknown_options(cfg):
+    with pytest.raises(ValueError):
+        TensorSpec(cfg)
+
+
+def test_parse_rejects_duplicate_names():
+    with pytest.raises(ValueError):
+        parse_tensors([{"name": "a", "width": 8, "height": 8}, {"name": "a", "width": 16, "height": 16}])
+
+
+def test_tensor_from_message_is_a_view():
+    tensor = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+    payload = memoryview(tensor)
+
+    out = tensor_from_message({"shape": [2, 3, 4], "dtype": "float32"}, payload)
+    np.testing.assert_array_equal(out, tensor)
+    assert np.shares_memory(out, tensor)
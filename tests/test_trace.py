@@ -0,0 +1,66 @@
+import struct
+
+import pytest
+
+from stream_hub.network.trace_collector import TraceCollector
+from stream_hub.network.wire import append_trace_point, decode_trace, encode_trace, trace_stages
+
+WORKER_POINTS = (("dequeue", 1.5), ("encode_start", 2.0), ("encode_end", 6.0), ("publish", 6.5))
+
+
+def test_trace_round_trip_with_proxy_point():
+    trace = encode_trace(1000.0, WORKER_POINTS)
+    trace = append_trace_point(trace, "proxy", 1000.008)
+
+    capture_ts, points = decode_trace(memoryview(trace))
+
+    assert capture_ts == 1000.0
+    assert list(points) == ["dequeue", "encode_start", "encode_end", "publish", "proxy"]
+    assert points["encode_end"] == 6.0
+    assert points["proxy"] == pytest.approx(8.0, abs=1e-3)
+
+
+def test_unknown_points_are_skipped_and_malformed_frames_rejected():
+    trace = encode_trace(5.0, [("dequeue", 1.0)]) + struct.pack("!Bd", 200, 3.0)
+    assert decode_trace(trace) == (5.0, {"dequeue": 1.0})
+
+    with pytest.raises(ValueError):
+        decode_trace(b"\x00" * 4)
+    with pytest.raises(ValueError):
+        decode_trace(encode_trace(5.0, [("dequeue", 1.0)])[:-1])
+
+
+def test_stages_merge_around_a_missing_proxy_point():
+    points = dict(WORKER_POINTS, receive=9.0, deliver=12.0)
+
+    stages = trace_stages({**points, "proxy": 7.0})
+    assert stages["publish_to_proxy"] == 0.5
+    assert stages["proxy_to_receive"] == 2.0
+    assert stages["end_to_end"] == 12.0
+
+    # Sharded proxies (zmq.proxy_steerable) do not stamp the proxy hop.
+    stages = trace_stages(points)
+    assert "proxy_to_receive" not in stages
+    assert stages["publish_to_receive"] == 2.5
+    assert trace_stages({}) == {}
+
+
+def test_collector_percentiles_per_stream_and_stage():
+    collector = TraceCollector(log_interval=0)
+    for i in range(100):
+        # end_to_end: 90 frames at 8 ms, 10 at 80 ms.
+        deliver = 8.0 if i < 90 else 80.0
+        collector.add({"stream_id": "cam1", "points": {"publish": 2.0, "receive": 4.0, "deliver": deliver}})
+    collector.add({"stream_id": "cam2", "points": {"deliver": 3.0}})
+    collector.add({"stream_id": "cam2", "points": {}})  # nothing to record
+
+    snapshots = {s["stream_id"]: s for s in collector.snapshots()}
+
+    cam1 = snapshots["cam1"]
+    assert cam1["counters"] == {"traces": 100}
+    end_to_end = cam1["histograms"]["end_to_end"]
+    assert end_to_end["count"] == 100
+    # Histogram percentiles are bucket upper bounds.
+    assert (end_to_end["p50"], end_to_end["p99"]) == (10, 100)
+    assert cam1["histograms"]["publish_to_receive"]["p99"] == 2.5
+    assert snapshots["cam2"]["counters"] == {"traces": 1}
@@ -0,0 +1,80 @@
+import socket
+import time
+
+import pytest
+import zmq
+
+from stream_hub.network.wire import encode_message, feedback_topic
+from stream_hub.network.zmq_handler import ZmqHandler
+
+FEEDBACKS = {"perception": {"port": 7001}, "ui": {"port": 7002}}
+
+
+def free_endpoint():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"tcp://127.0.0.1:{s.getsockname()[1]}"
+
+
+@pytest.fixture
+def feedback():
+    """Yield ``(handler, send)``: a worker-side handler fed by a fake feedback router."""
+    router_endpoint = free_endpoint()
+    router = zmq.Context.instance().socket(zmq.PUB)
+    router.setsockopt(zmq.LINGER, 0)
+    router.bind(router_endpoint)
+
+    handler = ZmqHandler(free_endpoint(), FEEDBACKS, router_endpoint)
+    handler.initialize_runtime(["cam1"])
+
+    def send(message, stream_id="cam1"):
+        # Resend until the SUB side has joined and the version moves.
+        before = handler.get_feedback(stream_id)[0]
+        for _ in range(100):
+            router.send_multipart(encode_message(feedback_topic(stream_id), message, b""))
+            time.sleep(0.02)
+            if handler.get_feedback(stream_id)[0] != before:
+                return handler.get_feedback(stream_id)
+        raise AssertionError("feedback message never arrived")
+
+    yield handler, send
+    handler.close()
+    router.close()
+
+
+def test_every_configured_node_is_present_before_any_feedback(feedback):
+    handler, _ = feedback
+    version, events = handler.get_feedback("cam1")
+
+    assert version == 0
+    assert events == {
+        "perception": {"data": None, "target": None, "timestamp": None},
+        "ui": {"data": None, "target": None, "timestamp": None},
+    }
+
+
+def test_update_bumps_version_and_keeps_old_snapshot(feedback):
+    handler, send = feedback
+    _, before = handler.get_feedback("cam1")
+
+    version, events = send({"node_name": "perception", "data": "person", "target": [[1, 2, 3, 4]], "ts": 12.5})
+
+    assert version >= 1
+    assert events["perception"] == {"data": "person", "target": [[1, 2, 3, 4]], "timestamp": 12.5}
+    assert events["ui"]["data"] is None
+    # Copy-on-write: the snapshot handed out earlier is not mutated.
+    assert before["perception"]["data"] is None
+
+
+def test_message_without_target_or_ts(feedback):
+    handler, send = feedback
+    before = time.time()
+
+    _, events = send({"node_name": "ui", "data": "click"})
+
+    assert events["ui"]["target"] == []
+    assert before <= events["ui"]["timestamp"] <= time.time()
+
+    _, events = send({"node_name": "ui", "data": "box", "target": {"x": 1}, "ts": "bad"})
+    assert events["ui"]["target"] == [{"x": 1}]
+    assert isinstance(events["ui"]["timestamp"], float)